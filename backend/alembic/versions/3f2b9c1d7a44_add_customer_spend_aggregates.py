@@ -0,0 +1,44 @@
+"""Add customer_spend_aggregates for incremental insights
+
+Revision ID: 3f2b9c1d7a44
+Revises: dd76ebab9f55
+Create Date: 2026-10-18 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2b9c1d7a44'
+down_revision: Union[str, None] = 'dd76ebab9f55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'customer_spend_aggregates' not in inspector.get_table_names():
+        op.create_table(
+            'customer_spend_aggregates',
+            sa.Column('customer_id', sa.String(), nullable=False),
+            sa.Column('dimension', sa.String(), nullable=False),
+            sa.Column('key', sa.String(), nullable=False),
+            sa.Column('month', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('total', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('txn_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('customer_id', 'dimension', 'key', 'month')
+        )
+
+    # Existing rows are filled with: python -m app.rebuild_spend_aggregates --backfill
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'customer_spend_aggregates' in inspector.get_table_names():
+        op.drop_table('customer_spend_aggregates')
@@ -0,0 +1,34 @@
+"""Add transactions.details for ingest risk results
+
+Revision ID: 4d9b2e7c1a53
+Revises: e3a6c5f0d217
+Create Date: 2026-10-18 18:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = '4d9b2e7c1a53'
+down_revision: Union[str, None] = 'e3a6c5f0d217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    columns = {column['name'] for column in inspector.get_columns('transactions')}
+    if 'details' not in columns:
+        op.add_column('transactions', sa.Column('details', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    columns = {column['name'] for column in inspector.get_columns('transactions')}
+    if 'details' in columns:
+        op.drop_column('transactions', 'details')
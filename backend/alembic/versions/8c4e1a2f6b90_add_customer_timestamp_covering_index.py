@@ -0,0 +1,43 @@
+"""Add covering (customer_id, timestamp DESC, id DESC) index on transactions
+
+Revision ID: 8c4e1a2f6b90
+Revises: 3f2b9c1d7a44
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e1a2f6b90'
+down_revision: Union[str, None] = '3f2b9c1d7a44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'idx_transactions_customer_ts'
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    existing = [index['name'] for index in inspector.get_indexes('transactions')]
+    if INDEX_NAME not in existing:
+        # Created on the partitioned parent, so every existing and future
+        # monthly partition gets a matching local index
+        op.create_index(
+            INDEX_NAME,
+            'transactions',
+            ['customer_id', sa.text('timestamp DESC'), sa.text('id DESC')],
+            postgresql_include=['txn_id', 'merchant', 'category', 'amount', 'currency', 'mcc']
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    existing = [index['name'] for index in inspector.get_indexes('transactions')]
+    if INDEX_NAME in existing:
+        op.drop_index(INDEX_NAME, table_name='transactions')
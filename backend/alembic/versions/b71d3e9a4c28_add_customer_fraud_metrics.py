@@ -0,0 +1,45 @@
+"""Add customer_fraud_metrics rollup for /fraud/customer-metrics
+
+Revision ID: b71d3e9a4c28
+Revises: 8c4e1a2f6b90
+Create Date: 2026-10-18 14:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d3e9a4c28'
+down_revision: Union[str, None] = '8c4e1a2f6b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'customer_fraud_metrics' not in inspector.get_table_names():
+        op.create_table(
+            'customer_fraud_metrics',
+            sa.Column('customer_id', sa.String(), nullable=False),
+            sa.Column('total_spend', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('alert_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('high_risk_alerts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('pending_alerts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('dirty', sa.Boolean(), nullable=False, server_default=sa.true()),
+            sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('customer_id')
+        )
+
+    # No backfill needed: customers without a row are computed on first read
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'customer_fraud_metrics' in inspector.get_table_names():
+        op.drop_table('customer_fraud_metrics')
@@ -0,0 +1,53 @@
+"""Add fraud_reason_codes for interned alert reasons
+
+Revision ID: e3a6c5f0d217
+Revises: b71d3e9a4c28
+Create Date: 2026-10-18 16:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a6c5f0d217'
+down_revision: Union[str, None] = 'b71d3e9a4c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Built-in codes as of this revision (app.core.reasons.BUILTIN_REASONS)
+BUILTIN_REASONS = [
+    (1, "No specific reason provided"),
+    (2, "High transaction velocity detected"),
+    (3, "Suspicious device change"),
+    (4, "Unusual merchant category"),
+    (5, "Previous chargeback history"),
+    (6, "High-value cash withdrawal at unusual time/location"),
+    (7, "Negative amount transaction"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'fraud_reason_codes' not in inspector.get_table_names():
+        table = op.create_table(
+            'fraud_reason_codes',
+            # Codes below 100 are reserved for built-ins
+            sa.Column('code', sa.Integer(), sa.Identity(start=100), nullable=False),
+            sa.Column('text', sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint('code'),
+            sa.UniqueConstraint('text')
+        )
+        op.bulk_insert(table, [{"code": code, "text": text} for code, text in BUILTIN_REASONS])
+
+    # Existing alerts are converted to codes with: python -m app.backfill_alert_reasons
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'fraud_reason_codes' in inspector.get_table_names():
+        op.drop_table('fraud_reason_codes')
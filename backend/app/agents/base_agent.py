@@ -1,13 +1,10 @@
-import asyncio
 import time
 from typing import Any, Callable, Dict, List, Optional, TypeVar
 from pydantic import BaseModel
-from tenacity import (
-    retry, stop_after_attempt, wait_exponential, 
-    retry_if_exception_type, AsyncRetrying, RetryError
-)
-from app.core.circuit_breaker import CircuitBreaker
-from app.core.security import sanitize_input, detect_prompt_injection
+from app.core.circuit_breaker import circuit_breakers
+from app.core.config import settings
+from app.core.retry import call_with_retries, retry_budget
+from app.core.security import Trusted, sanitize_input, detect_prompt_injection
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,13 +18,16 @@ class AgentResponse(BaseModel):
     metadata: Dict[str, Any] = {}
 
 class BaseAgent:
-    def __init__(self, name: str):
+    # Read-only agents set this so slow attempts can be hedged
+    idempotent = False
+
+    def __init__(self, name: str, breaker_name: Optional[str] = None):
         self.name = name
-        self.circuit_breaker = CircuitBreaker(
-            failure_threshold=3,
-            recovery_timeout=30,
-            name=name
-        )
+        self.retry_budget = retry_budget(name)
+        # Shared by every instance guarding the same dependency
+        self.circuit_breaker = circuit_breakers.get(breaker_name or name)
+        # Guardrail overhead (sanitization + injection checks), per agent
+        self.guardrail_metrics = {"calls": 0, "trusted_args": 0, "blocked": 0, "total_ms": 0.0, "max_ms": 0.0}
     
     async def execute_with_guardrails(
         self,
@@ -45,96 +45,76 @@ class BaseAgent:
                 error=f"Circuit breaker open for {self.name}"
             )
         
-        # Input sanitization
-        sanitized_args = [sanitize_input(arg) for arg in args]
-        sanitized_kwargs = {k: sanitize_input(v) for k, v in kwargs.items()}
-        
-        # Prompt injection detection
-        for i, arg in enumerate(sanitized_args + list(sanitized_kwargs.values())):
-            if isinstance(arg, str) and detect_prompt_injection(arg):
-                logger.warning(f"Prompt injection detected in argument {i}")
-                return AgentResponse(
-                    success=False,
-                    error="Prompt injection detected in input"
-                )
+        # Input sanitization + prompt injection detection
+        started = time.perf_counter()
+        sanitized_args, sanitized_kwargs, injected = self._apply_guardrails(args, kwargs)
+        self._record_guardrail_time(time.perf_counter() - started)
+        if injected is not None:
+            self.guardrail_metrics["blocked"] += 1
+            logger.warning(f"Prompt injection detected in argument {injected}")
+            return AgentResponse(
+                success=False,
+                error="Prompt injection detected in input"
+            )
         
+        started = time.perf_counter()
         try:
             # Execute with timeout and retries
             result = await self._execute_with_retries(
                 tool_func, *sanitized_args, **sanitized_kwargs
             )
-            self.circuit_breaker.on_success()
+            self.circuit_breaker.on_success(time.perf_counter() - started)
             return AgentResponse(success=True, data=result)
             
         except Exception as e:
             logger.error(f"Agent {self.name} execution failed: {str(e)}")
-            self.circuit_breaker.on_failure()
+            self.circuit_breaker.on_failure(time.perf_counter() - started)
             return AgentResponse(success=False, error=str(e))
     
+    def _apply_guardrails(self, args: tuple, kwargs: Dict[str, Any]):
+        """(args, kwargs, index of the first injected argument or None); Trusted args are only unwrapped"""
+        sanitized_args = []
+        sanitized_kwargs = {}
+        injected = None
+        for i, (key, arg) in enumerate([(None, a) for a in args] + list(kwargs.items())):
+            if isinstance(arg, Trusted):
+                self.guardrail_metrics["trusted_args"] += 1
+                value = arg.value
+            else:
+                value = sanitize_input(arg)
+                if injected is None and isinstance(value, str) and detect_prompt_injection(value):
+                    injected = i
+            if key is None:
+                sanitized_args.append(value)
+            else:
+                sanitized_kwargs[key] = value
+        return sanitized_args, sanitized_kwargs, injected
+
+    def _record_guardrail_time(self, elapsed: float):
+        elapsed_ms = elapsed * 1000
+        self.guardrail_metrics["calls"] += 1
+        self.guardrail_metrics["total_ms"] += elapsed_ms
+        self.guardrail_metrics["max_ms"] = max(self.guardrail_metrics["max_ms"], elapsed_ms)
+
+    def get_guardrail_status(self) -> dict:
+        calls = self.guardrail_metrics["calls"]
+        return {
+            "name": self.name,
+            **self.guardrail_metrics,
+            "avg_ms": self.guardrail_metrics["total_ms"] / calls if calls else 0.0,
+        }
+
     async def _execute_with_retries(
         self,
         tool_func: Callable[..., Any],
         *args,
         **kwargs
     ) -> Any:
-        """Execute tool with retries and timeout using AsyncRetrying"""
-        retryer = AsyncRetrying(
-            stop=stop_after_attempt(2),
-            wait=wait_exponential(multiplier=1, min=0.15, max=0.4),
-            retry=retry_if_exception_type((TimeoutError, ConnectionError, asyncio.TimeoutError)),
-            reraise=True
+        """Execute tool with deadline-aware retries drawn from this agent's retry budget"""
+        return await call_with_retries(
+            lambda: tool_func(*args, **kwargs),
+            attempts=settings.retry_attempts,
+            attempt_timeout=settings.retry_attempt_timeout,
+            budget=self.retry_budget,
+            hedge_after=settings.retry_hedge_after if self.idempotent else None
         )
-        
-        async for attempt in retryer:
-            with attempt:
-                try:
-                    # Execute with timeout
-                    return await asyncio.wait_for(
-                        tool_func(*args, **kwargs),
-                        timeout=1.0  # 1 second timeout per tool
-                    )
-                except asyncio.TimeoutError:
-                    logger.warning(f"Timeout in attempt {attempt.retry_state.attempt_number}")
-                    raise TimeoutError(f"Operation timed out after 1 second")
-                except Exception as e:
-                    logger.error(f"Attempt {attempt.retry_state.attempt_number} failed: {str(e)}")
-                    raise
-    
-    # Alternative simpler retry implementation without tenacity
-    async def _execute_with_retries_simple(
-        self,
-        tool_func: Callable[..., Any],
-        *args,
-        **kwargs
-    ) -> Any:
-        """Simple retry implementation without external dependencies"""
-        max_attempts = 2
-        base_delay = 0.15
-        max_delay = 0.4
-        
-        last_exception = None
-        
-        for attempt in range(1, max_attempts + 1):
-            try:
-                return await asyncio.wait_for(
-                    tool_func(*args, **kwargs),
-                    timeout=1.0
-                )
-            except (TimeoutError, ConnectionError, asyncio.TimeoutError) as e:
-                last_exception = e
-                logger.warning(f"Attempt {attempt} failed: {str(e)}")
-                
-                if attempt == max_attempts:
-                    break
-                
-                # Exponential backoff with jitter
-                delay = min(base_delay * (2 ** (attempt - 1)), max_delay)
-                jitter = delay * 0.1
-                actual_delay = delay + (jitter * (time.time() % 1))
-                
-                await asyncio.sleep(actual_delay)
-            except Exception as e:
-                # Don't retry on other exceptions
-                raise e
-        
-        raise last_exception or TimeoutError("All retry attempts failed")
\ No newline at end of file
@@ -1,4 +1,5 @@
 from app.agents.base_agent import BaseAgent, AgentResponse
+from app.core.security import trusted
 from app.models.agent_models import ActionProposal
 from typing import Dict, Any
 
@@ -8,7 +9,7 @@ class ComplianceAgent(BaseAgent):
     
     async def check_action(self, action_proposal: ActionProposal) -> AgentResponse:
         """Check if action is compliant with policies"""
-        async def _check_compliance():
+        async def _check_compliance(action_proposal):
             if not action_proposal:
                 return ActionProposal(
                     action="block_transaction",
@@ -40,7 +41,7 @@ class ComplianceAgent(BaseAgent):
             
             return action_proposal
         
-        return await self.execute_with_guardrails(_check_compliance)
+        return await self.execute_with_guardrails(_check_compliance, trusted(action_proposal))
     
     def _is_blocking_justified(self, action: ActionProposal) -> bool:
         """Check if blocking action is compliant"""
@@ -1,6 +1,15 @@
 from app.agents.base_agent import BaseAgent, AgentResponse
-from app.models.agent_models import FraudAssessment, RiskDecision, ActionProposal
-from typing import Dict, List, Any
+from app.core.security import trusted
+from app.models.agent_models import CustomerProfile, FraudAssessment, RiskDecision, ActionProposal
+from app.core.velocity import velocity_engine, WINDOWS, epoch_seconds
+from app.core.reasons import CHARGEBACK_HISTORY, DEVICE_CHANGE, HIGH_VELOCITY, UNUSUAL_MCC
+from typing import Dict, List, Any, Optional
+import time
+
+# Transactions per window at which velocity risk saturates
+VELOCITY_LIMITS = {"1m": 3, "1h": 15, "24h": 50}
+MCC_MIN_HISTORY = 5            # recent transactions with an MCC before rarity means anything
+CHARGEBACKS_FOR_MAX_RISK = 2   # matches the "high" risk_level in the customer snapshot
 
 class FraudAgent(BaseAgent):
     def __init__(self):
@@ -10,67 +19,120 @@ class FraudAgent(BaseAgent):
         self,
         customer_id: str,
         transaction: Dict[str, Any],
-        recent_transactions: List[Dict[str, Any]]
+        recent_transactions: List[Dict[str, Any]],
+        profile: Optional[CustomerProfile] = None
     ) -> AgentResponse:
-        """Assess fraud risk with multiple signals"""
+        """
+        Assess fraud risk with multiple signals. A signal without data behind
+        it (no profile, too little history) is left out of the score instead
+        of counting as a fixed guess.
+        """
         
-        async def _assess():
+        async def _assess(customer_id, transaction, recent_transactions, profile):
             # Velocity check
             velocity_risk = self._check_velocity(recent_transactions, transaction)
             
             # Device change check
-            device_risk = self._check_device_change(customer_id, transaction)
+            device_risk = self._check_device_change(profile, transaction)
             
             # MCC rarity check
-            mcc_risk = self._check_mcc_rarity(customer_id, transaction)
+            mcc_risk = self._check_mcc_rarity(recent_transactions, transaction)
             
             # Chargeback history
-            cb_risk = self._check_chargeback_history(customer_id)
+            cb_risk = self._check_chargeback_history(profile)
             
+            signals = {
+                name: risk for name, risk in (
+                    ("velocity_risk", velocity_risk),
+                    ("device_risk", device_risk),
+                    ("mcc_risk", mcc_risk),
+                    ("chargeback_risk", cb_risk),
+                )
+                if risk is not None
+            }
+
             # Calculate composite risk score
-            risk_score = self._calculate_risk_score(
-                velocity_risk, device_risk, mcc_risk, cb_risk
-            )
+            risk_score = self._calculate_risk_score(*signals.values())
             
             reasons = []
             if velocity_risk > 0.7:
-                reasons.append("High transaction velocity detected")
-            if device_risk > 0.6:
-                reasons.append("Suspicious device change")
-            if mcc_risk > 0.5:
-                reasons.append("Unusual merchant category")
-            if cb_risk > 0.8:
-                reasons.append("Previous chargeback history")
+                reasons.append(HIGH_VELOCITY)
+            if signals.get("device_risk", 0.0) > 0.6:
+                reasons.append(DEVICE_CHANGE)
+            if signals.get("mcc_risk", 0.0) > 0.5:
+                reasons.append(UNUSUAL_MCC)
+            if signals.get("chargeback_risk", 0.0) > 0.8:
+                reasons.append(CHARGEBACK_HISTORY)
             
             return FraudAssessment(
                 risk_score=risk_score,
-                reasons=reasons,
-                signals={
-                    "velocity_risk": velocity_risk,
-                    "device_risk": device_risk,
-                    "mcc_risk": mcc_risk,
-                    "chargeback_risk": cb_risk
-                }
+                reason_codes=reasons,
+                signals=signals
             )
         
-        return await self.execute_with_guardrails(_assess)
+        return await self.execute_with_guardrails(
+            _assess, customer_id, transaction, trusted(recent_transactions), trusted(profile)
+        )
     
     def _check_velocity(self, recent_txns: List[Dict[str, Any]], current_txn: Dict[str, Any]) -> float:
-        """Check transaction velocity"""
-        # Implementation for velocity analysis
-        return 0.3  # Example value
+        """
+        Check transaction velocity from the sliding-window feature engine.
+        Takes the worst of customer, card and device counts over 1m/1h/24h;
+        customers unknown to the engine (cold start, evicted) fall back to
+        counting recent_txns.
+        """
+        entities = {
+            "customer": current_txn.get("customer_id") or current_txn.get("customerId"),
+            "card": current_txn.get("card_id") or current_txn.get("cardId"),
+            "device": current_txn.get("device_id") or current_txn.get("deviceId"),
+        }
+        counts = []
+        for kind, entity_id in entities.items():
+            features = velocity_engine.features(kind, entity_id)
+            if features:
+                counts.append({name: window["count"] for name, window in features.items()})
+
+        if not counts and recent_txns:
+            now = time.time()
+            ages = [now - epoch_seconds(txn.get("timestamp")) for txn in recent_txns]
+            counts.append({
+                name: sum(1 for age in ages if 0 <= age < width * size)
+                for name, (width, size) in WINDOWS.items()
+            })
+
+        if not counts:
+            return 0.0
+
+        return max(
+            min(1.0, entity_counts[name] / limit)
+            for entity_counts in counts
+            for name, limit in VELOCITY_LIMITS.items()
+        )
     
-    def _check_device_change(self, customer_id: str, transaction: Dict[str, Any]) -> float:
-        """Check if device change is suspicious"""
-        return 0.2  # Example value
+    def _check_device_change(self, profile: Optional[CustomerProfile], transaction: Dict[str, Any]) -> Optional[float]:
+        """
+        1.0 for a device the customer has not used before, 0.0 for a known one;
+        None when the transaction has no device or the profile knows no devices.
+        """
+        device_id = transaction.get("device_id") or transaction.get("deviceId")
+        if not device_id or profile is None or not profile.devices:
+            return None
+        return 0.0 if device_id in profile.devices else 1.0
     
-    def _check_mcc_rarity(self, customer_id: str, transaction: Dict[str, Any]) -> float:
-        """Check if MCC is unusual for customer"""
-        return 0.4  # Example value
+    def _check_mcc_rarity(self, recent_txns: List[Dict[str, Any]], transaction: Dict[str, Any]) -> Optional[float]:
+        """Share of the customer's recent transactions with a different MCC; None with too little history"""
+        mcc = transaction.get("mcc")
+        history = [txn["mcc"] for txn in recent_txns if txn.get("mcc")]
+        if not mcc or len(history) < MCC_MIN_HISTORY:
+            return None
+        return 1.0 - history.count(mcc) / len(history)
     
-    def _check_chargeback_history(self, customer_id: str) -> float:
-        """Check chargeback history"""
-        return 0.1  # Example value
+    def _check_chargeback_history(self, profile: Optional[CustomerProfile]) -> Optional[float]:
+        """Chargeback count from the customer snapshot; None when the profile lookup failed"""
+        # risk_level "unknown" marks the orchestrator's placeholder profile
+        if profile is None or profile.risk_level == "unknown":
+            return None
+        return min(1.0, profile.chargeback_count / CHARGEBACKS_FOR_MAX_RISK)
     
     def _calculate_risk_score(self, *risks: float) -> float:
         """Calculate composite risk score"""
@@ -83,7 +145,7 @@ class FraudAgent(BaseAgent):
     ) -> AgentResponse:
         """Make risk decision based on assessment and rules"""
         
-        async def _decide():
+        async def _decide(risk_assessment, kb_rules):
             score = risk_assessment.risk_score
             
             if score >= 0.8:
@@ -101,7 +163,7 @@ class FraudAgent(BaseAgent):
                 rules_applied=[rule["title"] for rule in kb_rules[:3]]
             )
         
-        return await self.execute_with_guardrails(_decide)
+        return await self.execute_with_guardrails(_decide, trusted(risk_assessment), trusted(kb_rules))
     
     async def propose_action(
         self,
@@ -110,7 +172,7 @@ class FraudAgent(BaseAgent):
     ) -> AgentResponse:
         """Propose specific action based on decision"""
         
-        async def _propose():
+        async def _propose(decision, transaction):
             if decision.decision == "block":
                 action = "block_transaction"
                 message = "Transaction blocked due to high fraud risk"
@@ -131,4 +193,4 @@ class FraudAgent(BaseAgent):
                 customer_id=transaction.get("customerId")
             )
         
-        return await self.execute_with_guardrails(_propose)
\ No newline at end of file
+        return await self.execute_with_guardrails(_propose, trusted(decision), transaction)
\ No newline at end of file
@@ -1,52 +1,38 @@
 from app.agents.base_agent import BaseAgent, AgentResponse
 from app.models.agent_models import CustomerProfile
+from app.services.customer_snapshot_service import CustomerSnapshotService
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
 class InsightsAgent(BaseAgent):
+    idempotent = True  # read-only lookups
+
     def __init__(self):
         super().__init__("insights_agent")
     
     async def get_customer_profile(self, customer_id: str) -> AgentResponse:
-        """Get customer profile with transaction insights"""
-        async def _get_profile():
-            # This would query your database
-            # For now, return mock data
-            return CustomerProfile(
-                customer_id=customer_id,
-                risk_level="medium",
-                total_transactions=45,
-                chargeback_count=2,
-                devices=["dev_45", "dev_12"],
-                avg_transaction_amount=2500.0
-            )
+        """Get customer profile with transaction insights (cached feature snapshot)"""
+        async def _get_profile(customer_id):
+            snapshot = await CustomerSnapshotService.get(customer_id)
+            return CustomerProfile(**snapshot["profile"])
         
-        return await self.execute_with_guardrails(_get_profile)
+        return await self.execute_with_guardrails(_get_profile, customer_id)
     
     async def get_recent_transactions(self, customer_id: str, hours: int = 24) -> AgentResponse:
-        """Get recent transactions for velocity analysis"""
-        async def _get_transactions():
-            # This would query your database
-            # Return mock data for now
+        """Get recent transactions for velocity analysis (cached feature snapshot)"""
+        async def _get_transactions(customer_id, hours):
+            snapshot = await CustomerSnapshotService.get(customer_id)
+            cutoff = datetime.utcnow() - timedelta(hours=hours)
             return [
-                {
-                    "id": "txn_00999",
-                    "amount": -1500,
-                    "merchant": "Restaurant",
-                    "timestamp": "2025-06-14T19:30:45Z"
-                },
-                {
-                    "id": "txn_00998", 
-                    "amount": -3000,
-                    "merchant": "Supermarket",
-                    "timestamp": "2025-06-14T10:15:22Z"
-                }
+                txn for txn in snapshot["recent_transactions"]
+                if datetime.fromisoformat(txn["timestamp"]) >= cutoff
             ]
         
-        return await self.execute_with_guardrails(_get_transactions)
+        return await self.execute_with_guardrails(_get_transactions, customer_id, hours)
     
     async def categorize_transaction(self, transaction: Dict[str, Any]) -> AgentResponse:
         """Categorize transaction using deterministic rules"""
-        async def _categorize():
+        async def _categorize(transaction):
             mcc = transaction.get('mcc', '')
             merchant = transaction.get('merchant', '').lower()
             
@@ -72,4 +58,4 @@ class InsightsAgent(BaseAgent):
                 "merchant": merchant
             }
         
-        return await self.execute_with_guardrails(_categorize)
\ No newline at end of file
+        return await self.execute_with_guardrails(_categorize, transaction)
\ No newline at end of file
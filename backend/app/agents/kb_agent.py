@@ -1,21 +1,86 @@
 import json
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.agents.base_agent import BaseAgent, AgentResponse
+from app.core.security import trusted
+
+# Keywords used by lookup_relevant_rules; indexed eagerly on every (re)load
+RULE_KEYWORDS = ["amount", "large", "atm", "withdrawal", "device", "suspicious"]
+
 
 class KBAgent(BaseAgent):
-    def __init__(self):
+    reload_check_interval = 1.0  # seconds between kb_docs.json mtime checks
+    idempotent = True  # read-only lookups
+
+    def __init__(self, kb_path: Optional[Path] = None):
         super().__init__("kb_agent")
-        self.kb_path = Path("fixtures/kb_docs.json")
+        self.kb_path = kb_path or Path("fixtures/kb_docs.json")
+        self._kb_mtime: Optional[float] = None
+        self._last_reload_check = 0.0
         self.kb_data = self._load_kb_data()
     
     def _load_kb_data(self) -> List[Dict[str, Any]]:
-        """Load knowledge base data"""
+        """
+        Load knowledge base data and rebuild the keyword index.
+
+        Raises OSError / ValueError for an unreadable or malformed file
+        without touching the current data, index or recorded mtime.
+        """
         try:
+            mtime = self.kb_path.stat().st_mtime
             with open(self.kb_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                kb_data = json.load(f)
         except FileNotFoundError:
-            return []
+            mtime, kb_data = None, []
+        if not isinstance(kb_data, list) or not all(isinstance(rule, dict) for rule in kb_data):
+            raise ValueError(f"{self.kb_path} must hold a list of rule objects")
+        self._build_index(kb_data)
+        self._kb_mtime = mtime
+        return kb_data
+
+    def _build_index(self, kb_data: List[Dict[str, Any]]):
+        """
+        Lowercase each rule's title and chunks once, then resolve the known
+        keywords up front so lookups are dictionary hits.
+        """
+        self._haystacks = [
+            (' '.join(rule.get('chunks', [])).lower(), rule.get('title', '').lower())
+            for rule in kb_data
+        ]
+        self._keyword_index: Dict[str, List[int]] = {}
+        self._rules_by_keywords: Dict[tuple, List[Dict[str, Any]]] = {}
+        for keyword in RULE_KEYWORDS:
+            self._rule_ids_for(keyword)
+
+    def _rule_ids_for(self, keyword: str) -> List[int]:
+        """Positions of the rules matching keyword, memoized per keyword"""
+        keyword = keyword.lower()
+        rule_ids = self._keyword_index.get(keyword)
+        if rule_ids is None:
+            rule_ids = [
+                i for i, (content, title) in enumerate(self._haystacks)
+                if keyword in content or keyword in title
+            ]
+            self._keyword_index[keyword] = rule_ids
+        return rule_ids
+
+    def _maybe_reload(self):
+        """Reload kb_docs.json when its mtime changes (checked at most once per interval)"""
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_check_interval:
+            return
+        self._last_reload_check = now
+        try:
+            mtime = self.kb_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._kb_mtime:
+            try:
+                self.kb_data = self._load_kb_data()
+            except (OSError, ValueError) as e:
+                # Keep serving the previous rules; the mtime still differs, so the next check retries
+                print(f"KB reload of {self.kb_path} failed, keeping previous rules: {e}")
     
     async def lookup_relevant_rules(
         self,
@@ -25,7 +90,8 @@ class KBAgent(BaseAgent):
     ) -> AgentResponse:
         """Lookup relevant KB rules with fallback templates"""
         
-        async def _lookup():
+        async def _lookup(transaction, risk_score):
+            self._maybe_reload()
             relevant_rules = []
             
             # Rule 1: Check transaction amount
@@ -47,21 +113,16 @@ class KBAgent(BaseAgent):
             
             return unique_rules[:5]  # Return top 5 most relevant rules
         
-        return await self.execute_with_guardrails(_lookup)
+        return await self.execute_with_guardrails(_lookup, transaction, trusted(risk_score))
     
     def _find_rules_by_keyword(self, keywords: List[str]) -> List[Dict[str, Any]]:
-        """Find rules containing any of the keywords"""
-        results = []
-        for rule in self.kb_data:
-            content = ' '.join(rule.get('chunks', [])).lower()
-            title = rule.get('title', '').lower()
-            
-            for keyword in keywords:
-                if keyword.lower() in content or keyword.lower() in title:
-                    results.append(rule)
-                    break
-        
-        return results
+        """Find rules containing any of the keywords, in KB order (treat result as read-only)"""
+        key = tuple(keyword.lower() for keyword in keywords)
+        rules = self._rules_by_keywords.get(key)
+        if rules is None:
+            rule_ids = sorted({i for keyword in key for i in self._rule_ids_for(keyword)})
+            rules = self._rules_by_keywords[key] = [self.kb_data[i] for i in rule_ids]
+        return rules
     
     def get_fallback_template(self, rule_type: str) -> Dict[str, Any]:
         """Get fallback template for when KB lookup fails"""
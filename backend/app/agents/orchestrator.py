@@ -130,32 +130,52 @@
 #             )
 
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+from pydantic_core import to_jsonable_python
 from app.agents.base_agent import BaseAgent, AgentResponse
 from app.agents.insights_agent import InsightsAgent
 from app.agents.fraud_agent import FraudAgent
 from app.agents.kb_agent import KBAgent
 from app.agents.compliance_agent import ComplianceAgent
 from app.models.agent_models import CustomerProfile, FraudAssessment, ActionProposal
-from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.retry import deadline, remaining
+
+# Steps a plan step needs results from; everything else runs concurrently
+STEP_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "fraud": (),
+    "insights": (),
+    "kb": ("fraud",),           # rule lookup uses the fraud risk score
+    "decide": ("fraud", "kb"),  # decision cites the KB rules it applied
+    "compliance": ("decide",),  # checks the proposed action
+}
+FRAUD_ASSESSMENT_PLAN = ["fraud", "kb", "decide", "compliance"]
 
 
 class Orchestrator(BaseAgent):
     def __init__(self):
-        super().__init__(name="Orchestrator")
+        super().__init__(name="Orchestrator", breaker_name="orchestrator")
         self.insights_agent = InsightsAgent()
         self.fraud_agent = FraudAgent()
         self.kb_agent = KBAgent()
         self.compliance_agent = ComplianceAgent()
-        self.circuit_breaker = CircuitBreaker(name="orchestrator")
+        self.step_timeout = settings.orchestrator_step_timeout
+        self.plan_timeout = settings.orchestrator_plan_timeout
 
-    async def run(self, query: str, customer: CustomerProfile) -> AgentResponse:
+    async def run(
+        self,
+        query: str,
+        customer: CustomerProfile,
+        transaction: Optional[Dict[str, Any]] = None
+    ) -> AgentResponse:
         if not self.circuit_breaker.allow_request():
             return AgentResponse(success=False, error="Orchestrator unavailable (circuit open)")
 
         context = {
             "query": query,
             "customer": customer,
+            "transaction": transaction or {},
             "results": {}
         }
 
@@ -163,15 +183,67 @@ class Orchestrator(BaseAgent):
             plan = await self._make_plan(query, customer)
             result = await self._execute_plan_steps(plan, context)
 
-            # If successful → reset circuit breaker
+            # If successful → record it with the breaker
             if result.get("success", False):
-                self.circuit_breaker.on_success()
+                self.circuit_breaker.on_success(result["total_ms"] / 1000)
 
             return AgentResponse(success=True, data=result)
         except Exception as e:
             self.circuit_breaker.on_failure()
             return AgentResponse(success=False, error=str(e))
 
+    async def load_customer_context(self, customer_id: str) -> Dict[str, Any]:
+        """Profile and recent transactions, fetched concurrently; shareable across a customer's transactions"""
+        profile, recent = await asyncio.gather(
+            self.insights_agent.get_customer_profile(customer_id),
+            self.insights_agent.get_recent_transactions(customer_id)
+        )
+        return {
+            "profile": profile.data if profile.success else CustomerProfile(
+                customer_id=customer_id,
+                risk_level="unknown",
+                total_transactions=0,
+                chargeback_count=0,
+                devices=[],
+                avg_transaction_amount=0.0
+            ),
+            "recent_transactions": recent.data if recent.success else []
+        }
+
+    async def execute_plan(
+        self,
+        customer_id: str,
+        transaction: Dict[str, Any],
+        customer_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Full fraud pipeline for one transaction (fraud → kb → decide → compliance).
+        Pass customer_context from load_customer_context to reuse lookups
+        across transactions of the same customer.
+        """
+        if not self.circuit_breaker.allow_request():
+            return {"success": False, "error": "Orchestrator unavailable (circuit open)"}
+
+        if customer_context is None:
+            customer_context = await self.load_customer_context(customer_id)
+
+        context = {
+            "query": "fraud assessment",
+            "customer": customer_context["profile"],
+            "transaction": transaction,
+            "recent_transactions": customer_context["recent_transactions"],
+            "results": {}
+        }
+        result = await self._execute_plan_steps(FRAUD_ASSESSMENT_PLAN, context)
+
+        final_action = {}
+        if result["success"]:
+            self.circuit_breaker.on_success(result["total_ms"] / 1000)
+            proposal = context["results"]["compliance"]
+            final_action = {"action": proposal.action, "reason": proposal.message}
+
+        return to_jsonable_python({**result, "final_action": final_action})
+
     async def _make_plan(self, query: str, customer: CustomerProfile) -> List[str]:
         """
         Very basic planner: decide which agents to call based on query keywords.
@@ -179,7 +251,7 @@ class Orchestrator(BaseAgent):
         """
         plan = []
         if "fraud" in query.lower() or "charge" in query.lower():
-            plan.append("fraud")
+            plan.append("decide")
         if "insight" in query.lower() or "spend" in query.lower():
             plan.append("insights")
         if "compliance" in query.lower() or "kyc" in query.lower():
@@ -188,52 +260,130 @@ class Orchestrator(BaseAgent):
             plan.append("kb")
         return plan
 
-    async def _execute_plan_steps(self, plan: List[str], context: Dict[str, Any]) -> Dict[str, Any]:
+    def _with_dependencies(self, plan: List[str]) -> List[str]:
+        """Plan steps plus their dependencies, dependencies first"""
+        ordered: List[str] = []
+
+        def visit(step: str):
+            if step in ordered:
+                return
+            for dependency in STEP_DEPENDENCIES.get(step, ()):
+                visit(dependency)
+            ordered.append(step)
+
         for step in plan:
+            visit(step)
+        return ordered
+
+    async def _execute_plan_steps(self, plan: List[str], context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the plan as a dependency graph: each step starts as soon as the
+        steps it depends on have succeeded, so independent steps overlap.
+        Every step gets step_timeout, capped by what is left of plan_timeout;
+        the step deadline propagates to agent retries via contextvars.
+        """
+        loop = asyncio.get_running_loop()
+        plan_start = loop.time()
+        steps = self._with_dependencies(plan)
+        tasks: Dict[str, asyncio.Task] = {}
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+
+        async def run_step(step: str) -> bool:
+            dependencies = [tasks[d] for d in STEP_DEPENDENCIES.get(step, ())]
+            if not all(await asyncio.gather(*dependencies)):
+                errors[step] = "skipped: dependency failed"
+                return False
+
+            start = loop.time()
             try:
-                step_result = await self._execute_with_retries(step, context)
+                with deadline(self.step_timeout):
+                    left = remaining()
+                    if left <= 0:
+                        raise asyncio.TimeoutError()
+                    step_result = await asyncio.wait_for(self._run_step(step, context), timeout=left)
+            except asyncio.TimeoutError:
+                errors[step] = "timed out"
+                return False
             except Exception as e:
-                context["failed_step"] = step
-                self.circuit_breaker.on_failure()
-                return {
-                    "success": False,
-                    "error": f"Step {step} failed: {str(e)}",
-                    "results": context["results"],
-                    "failed_step": step
-                }
+                errors[step] = str(e)
+                return False
+            finally:
+                timings[step] = round((loop.time() - start) * 1000, 2)
 
             if not step_result.success:
-                context["failed_step"] = step
-                self.circuit_breaker.on_failure()
-                return {
-                    "success": False,
-                    "error": f"Step {step} failed: {step_result.error}",
-                    "results": context["results"],
-                    "failed_step": step
-                }
+                errors[step] = step_result.error
+                return False
 
             # Store step results
             context["results"][step] = step_result.data
+            return True
 
-        return {
-            "success": True,
-            "results": context["results"]
+        with deadline(self.plan_timeout):
+            # Step tasks inherit the plan deadline
+            for step in steps:
+                tasks[step] = asyncio.create_task(run_step(step))
+        await asyncio.gather(*tasks.values())
+
+        report = {
+            "results": context["results"],
+            "timings_ms": timings,
+            "total_ms": round((loop.time() - plan_start) * 1000, 2)
         }
 
-    async def _execute_with_retries(self, step: str, context: Dict[str, Any], retries: int = 2) -> AgentResponse:
-        for attempt in range(retries + 1):
-            try:
-                if step == "fraud":
-                    return await self.fraud_agent.run(context["query"], context["customer"])
-                elif step == "insights":
-                    return await self.insights_agent.run(context["query"], context["customer"])
-                elif step == "kb":
-                    return await self.kb_agent.run(context["query"], context["customer"])
-                elif step == "compliance":
-                    return await self.compliance_agent.run(context["query"], context["customer"])
-                else:
-                    raise ValueError(f"Unknown step: {step}")
-            except Exception as e:
-                if attempt == retries:
-                    raise e
-                continue
+        if errors:
+            # Report the first failure in plan order
+            failed_step = next(step for step in steps if step in errors)
+            context["failed_step"] = failed_step
+            self.circuit_breaker.on_failure(report["total_ms"] / 1000)
+            return {
+                "success": False,
+                "error": f"Step {failed_step} failed: {errors[failed_step]}",
+                "failed_step": failed_step,
+                "step_errors": errors,
+                **report
+            }
+
+        return {"success": True, **report}
+
+    # -------------------------
+    # Step implementations
+    # -------------------------
+    async def _run_step(self, step: str, context: Dict[str, Any]) -> AgentResponse:
+        customer_id = context["customer"].customer_id
+        transaction = context["transaction"]
+        results = context["results"]
+
+        if step == "fraud":
+            return await self.fraud_agent.assess_risk(
+                customer_id, transaction, context.get("recent_transactions", []), context["customer"]
+            )
+        elif step == "insights":
+            return await self.insights_agent.get_recent_transactions(customer_id)
+        elif step == "kb":
+            risk_score = results["fraud"].risk_score
+            return await self.kb_agent.lookup_relevant_rules(customer_id, transaction, risk_score)
+        elif step == "decide":
+            return await self._decide_step(transaction, results["fraud"], results["kb"])
+        elif step == "compliance":
+            return await self.compliance_agent.check_action(results["decide"]["proposal"])
+        else:
+            raise ValueError(f"Unknown step: {step}")
+
+    async def _decide_step(
+        self,
+        transaction: Dict[str, Any],
+        assessment: FraudAssessment,
+        kb_rules: List[Dict[str, Any]]
+    ) -> AgentResponse:
+        """Decide (citing the KB rules found) → propose; stops at the first failing agent call"""
+        decision = await self.fraud_agent.make_decision(assessment, kb_rules)
+        if not decision.success:
+            return decision
+        proposal = await self.fraud_agent.propose_action(decision.data, transaction)
+        if not proposal.success:
+            return proposal
+        return AgentResponse(success=True, data={
+            "decision": decision.data,
+            "proposal": proposal.data
+        })
@@ -1,55 +1,22 @@
-import re
 from app.agents.base_agent import BaseAgent, AgentResponse
-from typing import Dict, Any, List
+from app.core.security import trusted
+from app.core.redactor import RedactionEngine, pii_engine
+from typing import Any
 
 class RedactorAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, engine: RedactionEngine = pii_engine):
         super().__init__("redactor_agent")
-        # Regex patterns for PII detection
-        self.patterns = {
-            'credit_card': r'\b\d{13,19}\b',
-            'aadhaar': r'\b\d{4}\s?\d{4}\s?\d{4}\b',
-            'pan': r'[A-Z]{5}\d{4}[A-Z]{1}',
-            'phone': r'\b(?:\+91[\-\s]?)?[789]\d{9}\b'
-        }
-    
+        # Credit card, Aadhaar, PAN and phone patterns in one compiled scan
+        self.engine = engine
+
     async def redact_pii(self, data: Any) -> AgentResponse:
-        """Redact PII from data"""
-        async def _redact():
-            if isinstance(data, str):
-                return self._redact_text(data)
-            elif isinstance(data, dict):
-                return self._redact_dict(data)
-            elif isinstance(data, list):
-                return [self._redact_item(item) for item in data]
-            else:
-                return data
-        
-        return await self.execute_with_guardrails(_redact)
-    
+        """Redact PII from data; Pydantic models (or lists of them) come back as redacted dicts"""
+        async def _redact(data):
+            return await self.engine.aredact(data)
+
+        # Redaction needs the raw text; sanitizing would strip or truncate it first
+        return await self.execute_with_guardrails(_redact, trusted(data))
+
     def _redact_text(self, text: str) -> str:
         """Redact PII from text"""
-        for pattern_name, pattern in self.patterns.items():
-            text = re.sub(pattern, "****REDACTED****", text)
-        return text
-    
-    def _redact_dict(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Redact PII from dictionary"""
-        redacted = {}
-        for key, value in data.items():
-            if isinstance(value, (str, dict, list)):
-                redacted[key] = self._redact_item(value)
-            else:
-                redacted[key] = value
-        return redacted
-    
-    def _redact_item(self, item: Any) -> Any:
-        """Redact PII from any item"""
-        if isinstance(item, str):
-            return self._redact_text(item)
-        elif isinstance(item, dict):
-            return self._redact_dict(item)
-        elif isinstance(item, list):
-            return [self._redact_item(i) for i in item]
-        else:
-            return item
\ No newline at end of file
+        return self.engine.redact_text(text)
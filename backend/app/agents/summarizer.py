@@ -1,4 +1,5 @@
 from app.agents.base_agent import BaseAgent, AgentResponse
+from app.core.security import trusted
 from typing import Dict, Any, List
 
 class SummarizerAgent(BaseAgent):
@@ -7,7 +8,7 @@ class SummarizerAgent(BaseAgent):
     
     async def summarize_customer_notes(self, customer_id: str, assessment: Dict[str, Any]) -> AgentResponse:
         """Generate customer-facing summary notes"""
-        async def _summarize_customer():
+        async def _summarize_customer(assessment):
             risk_score = assessment.get('risk_score', 0)
             
             if risk_score > 0.7:
@@ -22,11 +23,11 @@ class SummarizerAgent(BaseAgent):
                 "risk_level": "high" if risk_score > 0.7 else "medium" if risk_score > 0.4 else "low"
             }
         
-        return await self.execute_with_guardrails(_summarize_customer)
+        return await self.execute_with_guardrails(_summarize_customer, trusted(assessment))
     
     async def summarize_internal_notes(self, customer_id: str, assessment: Dict[str, Any]) -> AgentResponse:
         """Generate internal notes for agents"""
-        async def _summarize_internal():
+        async def _summarize_internal(customer_id, assessment):
             reasons = assessment.get('reasons', [])
             signals = assessment.get('signals', {})
             
@@ -48,4 +49,4 @@ class SummarizerAgent(BaseAgent):
                 "action_required": len(reasons) > 0
             }
         
-        return await self.execute_with_guardrails(_summarize_internal)
\ No newline at end of file
+        return await self.execute_with_guardrails(_summarize_internal, customer_id, trusted(assessment))
\ No newline at end of file
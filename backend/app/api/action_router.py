@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, Request, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.services.kb_service import KBService
 from app.services.action_service import ActionService
 from app.schemas.action import ActionCreate, ActionRead, OTPVerify
@@ -79,14 +79,8 @@ async def freeze_card_risk(
     db: Session = Depends(get_db),
     request: Request = None
 ):
-    action = await ActionService.freeze_card_with_risk(db, customer_id)
-    # ✅ Publish SSE fallback event if triggered
-    if action.details.get("fallbackUsed", False):
-        await sse.publish(
-            {"customer_id": customer_id, "action_id": str(action.id)},
-            type="fallback_triggered"
-        )
-    return action
+    # ActionService publishes fallback_triggered when the fallback is used
+    return await ActionService.freeze_card_with_risk(db, customer_id)
 
 
 # -------------------------
@@ -126,7 +120,7 @@ async def open_dispute(
     # Safe KB reference: default if none exists
     kb_reference = "No KB reference available"
     try:
-        kb_results = await KBService.search_entries(db, query="How disputes work")
+        kb_results = await KBService.search_entries(db, query="How disputes work", limit=1)
         if kb_results:
             kb_reference = kb_results[0].snippet
     except Exception:
@@ -154,7 +148,7 @@ async def open_dispute(
     created_action = await ActionService.create_action(db, action_data)
 
     # SSE trace for frontend
-    await sse.publish(
+    sse.publish(
         {
             "event": "dispute_opened",
             "txn_id": txn_id,
@@ -208,5 +202,18 @@ async def handle_duplicate(
 # SSE subscription (frontend listens here)
 # -------------------------
 @router.get("/events")
-async def subscribe_events():
-    return await sse.subscribe()
+async def subscribe_events(
+    types: Optional[str] = Query(None, description="Comma-separated event types, e.g. fraud,kb"),
+    customer_id: Optional[str] = Query(None),
+    policy: Optional[str] = Query(None, description="drop_oldest | drop_newest | coalesce"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    try:
+        return await sse.subscribe(
+            types=[t.strip() for t in types.split(",") if t.strip()] if types else None,
+            customer_id=customer_id,
+            policy=policy,
+            last_event_id=last_event_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
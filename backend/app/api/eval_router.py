@@ -66,19 +66,8 @@ async def get_all_results(
     """
     Fetch all evaluation results and notify via SSE if available.
     """
-    results = await EvalService.get_all_results(db)
-    
-    # Try SSE notification
-    try:
-        if sse:  # check if sse is initialized
-            await sse.publish(
-                {"event": "eval_results_fetched", "results_count": len(results)},
-                type="eval"
-            )
-    except Exception as e:
-        print(f"[SSE Error] Could not publish eval results: {e}")
-    
-    return results
+    # EvalService.get_all_results publishes eval_results_fetched
+    return await EvalService.get_all_results(db)
 
 
 # -------------------------
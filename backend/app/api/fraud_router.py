@@ -143,16 +143,21 @@
 
 # app/api/fraud_router.py
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
+import json
 import time
 import os
 from types import SimpleNamespace
 from app.services.fraud_service import FraudService
-from app.schemas.fraud_alert import FraudAlertCreate, FraudAlertRead
-from app.core.database import get_db
+from app.services.fraud_batch_service import FraudBatchService
+from app.schemas.fraud_alert import FraudAlertCreate, FraudAlertResponse
+from app.core.database import get_db, get_async_db
 from app.core.rate_limiter import rate_limit
 from app.core.sse import sse
+from app.core.circuit_breaker import circuit_breakers
 from app.agents.orchestrator import Orchestrator
 from app.agents.redactor import RedactorAgent
 from app.agents.summarizer import SummarizerAgent
@@ -165,11 +170,12 @@ orchestrator = Orchestrator()
 redactor = RedactorAgent()
 summarizer = SummarizerAgent()
 TEST_MODE = os.getenv("TESTING") == "1"
+CRITICAL_BREAKERS = ("orchestrator", "fraud_agent", "kb_agent")
 
 # -------------------------
 # Create a new fraud alert
 # -------------------------
-@router.post("/", response_model=FraudAlertRead)
+@router.post("/", response_model=FraudAlertResponse)
 @rate_limit(max_requests=5, window_seconds=60)
 async def create_alert(
     alert: FraudAlertCreate,
@@ -177,12 +183,9 @@ async def create_alert(
     request: Request = None
 ):
     alert_read = await FraudService.create_alert(db, alert)
-    redacted_resp = await redactor.redact_pii(alert_read.dict())
+    redacted_resp = await redactor.redact_pii(alert_read)
     redacted_alert = redacted_resp.data if hasattr(redacted_resp, "data") else redacted_resp
 
-    if sse:
-        await sse.publish({"event": "fraud_alert_created", "alert": redacted_alert}, type="fraud")
-
     return redacted_alert
 
 # -------------------------
@@ -202,23 +205,9 @@ async def get_alerts_for_customer(
 
     alerts, total = await FraudService.get_alerts_by_customer(db, customer_id, limit=limit, offset=offset)
 
-    redacted_alerts = []
-    for a in alerts:
-        redacted_resp = await redactor.redact_pii(a.model_dump())
-        redacted_alerts.append(redacted_resp.data if hasattr(redacted_resp, "data") else redacted_resp)
-
-    if sse:
-        try:
-            await sse.publish(
-                {
-                    "event": "fraud_alerts_fetched",
-                    "customer_id": customer_id,
-                    "count": len(redacted_alerts)
-                },
-                type="fraud"
-            )
-        except Exception as e:
-            print(f"SSE publish failed: {e}")
+    # One guarded call for the page; each alert goes through the FraudAlertRead plan
+    redacted_resp = await redactor.redact_pii(alerts)
+    redacted_alerts = redacted_resp.data if hasattr(redacted_resp, "data") else redacted_resp
 
     return {
         "page": page,
@@ -230,19 +219,19 @@ async def get_alerts_for_customer(
 # -------------------------
 # Get single fraud alert by ID
 # -------------------------
-@router.get("/{alert_id}", response_model=FraudAlertRead)
+@router.get("/{alert_id}", response_model=FraudAlertResponse)
 @rate_limit(max_requests=10, window_seconds=60)
 async def get_alert(alert_id: str, db: Session = Depends(get_db), request: Request = None):
     alert = await FraudService.get_alert(db, alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Fraud alert not found")
 
-    redacted_resp = await redactor.redact_pii(alert.dict())
+    redacted_resp = await redactor.redact_pii(alert)
     redacted_alert = redacted_resp.data if hasattr(redacted_resp, "data") else redacted_resp
 
     if sse:
         try:
-            await sse.publish({"event": "fraud_alert_fetched", "alert_id": alert_id}, type="fraud")
+            sse.publish({"event": "fraud_alert_fetched", "alert_id": alert_id}, type="fraud")
         except Exception as e:
             print(f"SSE publish failed: {e}")
 
@@ -258,18 +247,6 @@ async def fraud_score(customer_id: str, request: Request = None):
     redacted_resp = await redactor.redact_pii(score_data)
     redacted_score = redacted_resp.data if hasattr(redacted_resp, "data") else redacted_resp
 
-    try:
-        await sse.publish(
-            {
-                "event": "fraud_score_generated",
-                "customer_id": customer_id,
-                **(redacted_score if isinstance(redacted_score, dict) else {})
-            },
-            type="fraud"
-        )
-    except Exception as e:
-        print(f"SSE publish failed: {e}")
-
     return redacted_score
 
 # -------------------------
@@ -312,14 +289,14 @@ async def assess_fraud(transaction_data: Dict[str, Any], db: Session = Depends(g
         action_taken = alert_dict.get("action_taken", "none")
         execution_time = time.time() - start_time
 
-        # Redact PII
-        redacted_resp = await redactor.redact_pii(alert_dict)
+        # Redact PII (FraudAlertRead goes through its cached plan)
+        redacted_resp = await redactor.redact_pii(alert)
         redacted_alert = getattr(redacted_resp, "data", redacted_resp)
 
         # SSE publish
         if sse:
             try:
-                await sse.publish({
+                sse.publish({
                     "event": "fraud_assessment_completed",
                     "customer_id": customer_id,
                     "transaction_id": transaction_data.get("id") or transaction_data.get("txn_id"),
@@ -343,7 +320,7 @@ async def assess_fraud(transaction_data: Dict[str, Any], db: Session = Depends(g
         # SSE publish on failure
         if sse:
             try:
-                await sse.publish({
+                sse.publish({
                     "event": "fraud_assessment_failed",
                     "customer_id": customer_id,
                     "transaction_id": transaction_data.get("id") or transaction_data.get("txn_id"),
@@ -359,46 +336,46 @@ async def assess_fraud(transaction_data: Dict[str, Any], db: Session = Depends(g
 # -------------------------
 @router.post("/assess/batch")
 @rate_limit(max_requests=20 if TEST_MODE else 2, window_seconds=5 if TEST_MODE else 60)
-async def assess_fraud_batch(transactions: List[Dict[str, Any]], db: Session = Depends(get_db), request: Request = None):
+async def assess_fraud_batch(
+    transactions: List[Dict[str, Any]],
+    stream: bool = Query(False, description="Stream per-transaction results as NDJSON"),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    """
+    Assess up to 100 transactions concurrently (FRAUD_BATCH_CONCURRENCY at a time).
+    With stream=true, each result is written as one NDJSON line as soon as it
+    completes, followed by a final {"event": "summary", ...} line.
+    """
     if len(transactions) > 100:
         raise HTTPException(status_code=400, detail="Batch size cannot exceed 100 transactions")
 
-    results = []
     start_time = time.time()
 
-    for transaction in transactions:
+    def _publish_summary(summary: Dict[str, Any]):
         try:
-            result = await orchestrator.execute_plan(transaction.get("customerId") or transaction.get("customer_id") or f"test_{transaction.get('id','unknown')}", transaction)
-            redacted_resp = await redactor.redact_pii(result)
-            redacted = redacted_resp.data if hasattr(redacted_resp, "data") else redacted_resp
-
-            final_action = result.get("final_action", {}) if isinstance(result, dict) else {}
-            normalized_action = {"action": final_action.get("action", "NO_ACTION"), "reason": final_action.get("reason", "unspecified")}
-
-            results.append({
-                "transaction_id": transaction.get("id"),
-                "status": "success" if result.get("success") else "error",
-                "result": {"action": normalized_action, "details": redacted}
-            })
+            sse.publish({"event": "batch_assessment_completed", "batch_size": len(transactions), **summary}, type="fraud_batch")
         except Exception as e:
-            results.append({"transaction_id": transaction.get("id"), "status": "error", "error": str(e)})
+            print(f"SSE publish failed: {e}")
 
-    await sse.publish({
-        "event": "batch_assessment_completed",
-        "batch_size": len(transactions),
-        "successful": sum(1 for r in results if r["status"] == "success"),
-        "failed": sum(1 for r in results if r["status"] == "error"),
-        "total_time": time.time() - start_time
-    }, type="fraud_batch")
+    if stream:
+        async def _ndjson():
+            results = []
+            async for item in FraudBatchService.iter_results(orchestrator, redactor, transactions):
+                results.append(item)
+                yield json.dumps(item, default=str) + "\n"
+            summary = FraudBatchService.summarize(results, start_time)
+            _publish_summary(summary)
+            yield json.dumps({"event": "summary", **summary}) + "\n"
 
-    return {
-        "batch_id": f"batch_{int(time.time())}",
-        "processed": len(results),
-        "successful": sum(1 for r in results if r["status"] == "success"),
-        "failed": sum(1 for r in results if r["status"] == "error"),
-        "total_time": time.time() - start_time,
-        "results": results
-    }
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+    results = [item async for item in FraudBatchService.iter_results(orchestrator, redactor, transactions)]
+    results.sort(key=lambda item: item["index"])
+    summary = FraudBatchService.summarize(results, start_time)
+    _publish_summary(summary)
+
+    return {**summary, "results": results}
 
 # -------------------------
 # Agent System Status
@@ -407,18 +384,22 @@ async def assess_fraud_batch(transactions: List[Dict[str, Any]], db: Session = D
 @rate_limit(max_requests=1, window_seconds=300)
 async def get_agent_system_status(request: Request):
     status = {
-        "orchestrator": orchestrator.circuit_breaker.get_status(),
-        "insights_agent": orchestrator.insights_agent.circuit_breaker.get_status(),
-        "fraud_agent": orchestrator.fraud_agent.circuit_breaker.get_status(),
-        "kb_agent": orchestrator.kb_agent.circuit_breaker.get_status(),
-        "compliance_agent": orchestrator.compliance_agent.circuit_breaker.get_status(),
+        # Every registered breaker, keyed by name (orchestrator, fraud_agent, ...)
+        **circuit_breakers.get_status(),
+        "guardrails": [
+            agent.get_guardrail_status()
+            for agent in (
+                orchestrator, orchestrator.insights_agent, orchestrator.fraud_agent,
+                orchestrator.kb_agent, orchestrator.compliance_agent, redactor
+            )
+        ],
         "system_status": "operational" if _is_system_operational() else "degraded"
     }
 
     # Publish to SSE only if sse is initialized
     if sse is not None:
         try:
-            await sse.publish(
+            sse.publish(
                 {"event": "system_status_checked", "status": status["system_status"]},
                 type="system"
             )
@@ -432,25 +413,13 @@ async def get_agent_system_status(request: Request):
 @router.post("/system/reset")
 @rate_limit(max_requests=1, window_seconds=300)
 async def reset_agent_system(request: Request):
-    agents = [
-        orchestrator,
-        orchestrator.insights_agent,
-        orchestrator.fraud_agent,
-        orchestrator.kb_agent,
-        orchestrator.compliance_agent
-    ]
-
-    # Reset circuit breakers safely
-    for agent in agents:
-        try:
-            agent.circuit_breaker.on_success()  # Reset to "closed" state
-        except AttributeError as e:
-            print(f"[Warning] Could not reset circuit breaker for {agent.name}: {e}")
+    # Reset every registered circuit breaker to "closed"
+    circuit_breakers.reset_all()
 
     # Try publishing SSE event
     try:
         if sse:
-            await sse.publish(
+            sse.publish(
                 {"event": "system_reset", "message": "All circuit breakers reset"},
                 type="system"
             )
@@ -464,15 +433,14 @@ async def reset_agent_system(request: Request):
 # Helper Functions
 # -------------------------
 def _is_system_operational() -> bool:
-    critical_agents = [orchestrator.circuit_breaker, orchestrator.fraud_agent.circuit_breaker, orchestrator.kb_agent.circuit_breaker]
-    return all(cb.state == "closed" for cb in critical_agents)
+    return all(circuit_breakers.get(name).state == "closed" for name in CRITICAL_BREAKERS)
 
 
 @router.get("/customer-metrics/{customer_id}", response_model=Dict[str, Any])
 @rate_limit(max_requests=10, window_seconds=60)
 async def get_customer_metrics(
     customer_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None  
     # page: int = Query(1, ge=1),
     # limit: int = Query(50, ge=1, le=100)
@@ -490,7 +458,7 @@ async def get_customer_metrics(
         # Optional: SSE publish
         if sse:
             try:
-                await sse.publish(
+                sse.publish(
                     {"event": "customer_metrics_fetched", "customer_id": customer_id, **metrics},
                     type="fraud_metrics"
                 )
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
-from typing import List, Dict, Tuple
+from fastapi import APIRouter, Depends, Request, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional, Tuple
 
 from app.services.insights_service import InsightsService
 from app.schemas.insight import InsightRead
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.rate_limiter import rate_limit  # Redis rate limiter
 from app.core.sse import sse  # ✅ SSE manager
 
@@ -18,28 +18,15 @@ router = APIRouter(prefix="", tags=["Insights"])
 @rate_limit(max_requests=10, window_seconds=60)
 async def get_categories(
     customer_id: str,
-    db: Session = Depends(get_db),
+    month: Optional[int] = Query(None, ge=190001, le=999912, description="Restrict to one month (YYYYMM)"),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
     Return total spend per category for the customer.
     Also pushes SSE event.
     """
-    categories = await InsightsService.spend_categories(db, customer_id)
-
-    # 🔔 Push SSE event explicitly from API (safe)
-    if sse:
-        try:
-            await sse.publish(
-                {
-                    "event": "api_categories",
-                    "customer_id": customer_id,
-                    "categories": categories,
-                },
-                type="insight",
-            )
-        except Exception as e:
-            print(f"SSE publish failed (api_categories): {e}")
+    categories = await InsightsService.spend_categories(db, customer_id, month=month or 0)
 
     return categories
 
@@ -52,27 +39,14 @@ async def get_categories(
 @rate_limit(max_requests=10, window_seconds=60)
 async def get_top_merchants(
     customer_id: str,
-    db: Session = Depends(get_db),
+    month: Optional[int] = Query(None, ge=190001, le=999912, description="Restrict to one month (YYYYMM)"),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
     Return top merchants by spend for the customer.
     Also pushes SSE event.
     """
-    merchants = await InsightsService.top_merchants(db, customer_id)
-
-    # 🔔 Push SSE event explicitly from API (safe)
-    if sse:
-        try:
-            await sse.publish(
-                {
-                    "event": "api_top_merchants",
-                    "customer_id": customer_id,
-                    "merchants": merchants,
-                },
-                type="insight",
-            )
-        except Exception as e:
-            print(f"SSE publish failed (api_top_merchants): {e}")
+    merchants = await InsightsService.top_merchants(db, customer_id, month=month or 0)
 
     return merchants
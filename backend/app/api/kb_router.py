@@ -24,7 +24,7 @@
 #     return KBService.search_entries(db, query)
 
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -46,18 +46,8 @@ async def create_kb_entry(
     db: Session = Depends(get_db),
     request: Request = None
 ):
-    entry_read = await KBService.create_entry(db, entry_data)
-
-    # 🔔 SSE event for frontend
-    await sse.publish(
-        {
-            "event": "kb_entry_created",
-            "entry": entry_read.dict()
-        },
-        type="kb"
-    )
-
-    return entry_read
+    # KBService.create_entry publishes kb_entry_created
+    return await KBService.create_entry(db, entry_data)
 
 
 # -------------------------
@@ -67,13 +57,14 @@ async def create_kb_entry(
 @rate_limit(max_requests=10, window_seconds=60)
 async def search_kb(
     query: str,
+    limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
     request: Request = None
 ):
-    results = await KBService.search_entries(db, query)
+    results = await KBService.search_entries(db, query, limit=limit)
 
     # 🔔 SSE event for search results
-    await sse.publish(
+    sse.publish(
         {
             "event": "kb_search_performed",
             "query": query,
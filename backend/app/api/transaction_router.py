@@ -1,18 +1,17 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import StreamingResponse
-from typing import List
-import csv
-import io
+from typing import List, Literal, Optional
 from datetime import datetime, timedelta
 import time
 import asyncio
 import json
 from pydantic import BaseModel
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.rate_limiter import rate_limit
 from app.core.sse import sse
-from app.schemas.transaction import TransactionIngest, TransactionRead
+from app.schemas.transaction import TransactionIngest, TransactionRead, TransactionIngestSummary
 from app.services.transaction_service import TransactionService
 from app.models.transaction import Transaction  # <<<< add this
 router = APIRouter(prefix="", tags=["Transactions"])
@@ -34,33 +33,35 @@ router = APIRouter(prefix="", tags=["Transactions"])
 
 class PaginatedTransactions(BaseModel):
     items: List[TransactionRead]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 @router.get("/customer/{customer_id}", response_model=PaginatedTransactions)
 @rate_limit(max_requests=5, window_seconds=60)
 async def get_transactions_last_90d(
     request: Request,
     customer_id: str,
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (offset paging; ignored with cursor)"),
     limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
-    db: Session = Depends(get_db)
+    count: Literal["exact", "cached", "none"] = Query("cached", description="How to compute total"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     start = time.perf_counter()
-    
-    txns = await TransactionService.get_transactions_by_customer_last_90d(
-        db, customer_id, skip=skip, limit=limit
-    )
 
-    total_count = db.query(Transaction).filter(
-        Transaction.customer_id == customer_id,
-        Transaction.timestamp >= datetime.utcnow() - timedelta(days=90)
-    ).count()
+    try:
+        txns, next_cursor = await TransactionService.get_transactions_by_customer_last_90d(
+            db, customer_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total_count = await TransactionService.count_transactions_by_customer_last_90d(db, customer_id, mode=count)
 
     end = time.perf_counter()
     duration_ms = (end - start) * 1000
     print(f"[Performance] GET /customer/{customer_id} last 90d query: {duration_ms:.2f} ms")
-    
-    return {"items": txns, "total": total_count}
+
+    return {"items": txns, "total": total_count, "next_cursor": next_cursor}
 
 # -------------------------
 # JSON ingestion endpoint with performance logging
@@ -69,6 +70,7 @@ async def get_transactions_last_90d(
 @rate_limit(max_requests=5, window_seconds=60)
 async def ingest_transactions(
     records: List[TransactionIngest],
+    bulk: bool = Query(False, description="Use the set-based bulk path (one query/insert/commit per batch)"),
     db: Session = Depends(get_db),
     request: Request = None
 ):
@@ -76,16 +78,20 @@ async def ingest_transactions(
     Ingest transactions from JSON.
     Deduplicates by (customer_id, txn_id).
     Risk evaluation + fallback handled in TransactionService.
+    Pass `?bulk=true` for large payloads and backfills.
     """
     start = time.perf_counter()
-    result = await TransactionService.ingest_transactions(db, records)
+    if bulk:
+        result = await TransactionService.ingest_transactions_bulk(db, records)
+    else:
+        result = await TransactionService.ingest_transactions(db, records)
     end = time.perf_counter()
     duration_ms = (end - start) * 1000
-    print(f"[Performance] POST /ingest {len(records)} records: {duration_ms:.2f} ms")
+    print(f"[Performance] POST /ingest {len(records)} records (bulk={bulk}): {duration_ms:.2f} ms")
 
     # SSE broadcast for each ingested transaction
     for txn in result:
-        await sse.publish(
+        sse.publish(
             {"event": "transaction_ingested", "txn_id": txn.txn_id, "customer_id": txn.customer_id},
             type="transaction"
         )
@@ -95,62 +101,53 @@ async def ingest_transactions(
 # -------------------------
 # CSV ingestion endpoint with performance logging
 # -------------------------
-@router.post("/ingest/csv", response_model=List[TransactionRead])
+@router.post("/ingest/csv", response_model=TransactionIngestSummary)
 @rate_limit(max_requests=3, window_seconds=60)
 async def ingest_transactions_csv(
     file: UploadFile = File(...),
+    batch_size: int = Query(500, ge=1, le=5000, description="Rows flushed to the database per batch"),
     db: Session = Depends(get_db),
     request: Request = None
 ):
     """
     Ingest transactions from uploaded CSV file.
     CSV headers: customer_id, txn_id, merchant, category, amount, currency, mcc, timestamp
+
+    The upload is parsed incrementally and flushed in batches, so memory use
+    does not grow with file size. Returns a summary instead of echoing rows;
+    rejected rows are reported with their line numbers.
     """
     if file.content_type != "text/csv":
         raise HTTPException(status_code=400, detail="Invalid file type. Upload a CSV file.")
 
+    start = time.perf_counter()
     try:
-        decoded_file = await file.read()
-        decoded_str = decoded_file.decode("utf-8")
-        reader = csv.DictReader(io.StringIO(decoded_str))
-
-        records: List[TransactionIngest] = []
-        for row in reader:
-            try:
-                timestamp_str = row.get("timestamp")
-                timestamp = datetime.fromisoformat(timestamp_str) if timestamp_str else None
-
-                record = TransactionIngest(
-                    customer_id=row.get("customer_id") or row.get("customerId"),
-                    txn_id=row.get("txn_id") or row.get("txnId"),
-                    merchant=row.get("merchant"),
-                    category=row.get("category"),
-                    amount=float(row.get("amount")),
-                    currency=row.get("currency") or "USD",
-                    mcc=row.get("mcc"),
-                    timestamp=timestamp
-                )
-                records.append(record)
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error parsing row: {row}. {str(e)}")
-
-        start = time.perf_counter()
-        result = await TransactionService.ingest_transactions(db, records)
-        end = time.perf_counter()
-        duration_ms = (end - start) * 1000
-        print(f"[Performance] POST /ingest/csv {len(records)} records: {duration_ms:.2f} ms")
+        summary = await TransactionService.ingest_csv_stream(db, file, batch_size=batch_size)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read CSV file: {str(e)}")
 
-        # SSE broadcast for each ingested transaction
-        for txn in result:
-            await sse.publish(
-                {"event": "transaction_ingested", "txn_id": txn.txn_id, "customer_id": txn.customer_id},
-                type="transaction"
-            )
+    end = time.perf_counter()
+    duration_ms = (end - start) * 1000
+    print(
+        f"[Performance] POST /ingest/csv accepted={summary.accepted} duplicates={summary.duplicates} "
+        f"rejected={summary.rejected} batches={summary.batches}: {duration_ms:.2f} ms"
+    )
 
-        return result
+    # One SSE broadcast per upload rather than one per row
+    sse.publish(
+        {
+            "event": "transactions_ingested",
+            "filename": file.filename,
+            "accepted": summary.accepted,
+            "duplicates": summary.duplicates,
+            "rejected": summary.rejected
+        },
+        type="transaction"
+    )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read CSV file: {str(e)}")
+    return summary
 
 # -------------------------
 # SSE Stream Endpoint
@@ -0,0 +1,31 @@
+# app/backfill_alert_reasons.py
+"""
+Rewrite legacy fraud_alerts.reasons values (reason text in any shape) into
+reason codes. Safe to run against a live database and to re-run; rows that
+already hold codes are left alone.
+
+    python -m app.backfill_alert_reasons
+    python -m app.backfill_alert_reasons --batch-size 500 --pause 0.2
+"""
+import argparse
+from app.core.database import SessionLocal
+from app.services.fraud_service import FraudService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows read and committed per batch")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rewritten = FraudService.backfill_reasons(db, batch_size=args.batch_size, pause_seconds=args.pause)
+    finally:
+        db.close()
+
+    print(f"✅ Rewrote reasons on {rewritten} fraud alerts")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,273 @@
+import asyncio
+import json
 import time
-from typing import Optional
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.redis import get_redis_client
+
 
 class CircuitBreaker:
-    def __init__(self, failure_threshold: int = 3, recovery_timeout: int = 30, name: str = ""):
-        self.failure_threshold = failure_threshold
-        self.recovery_timeout = recovery_timeout
+    """
+    Rolling-window circuit breaker.
+
+    Outcomes are counted in `buckets` time buckets spanning window_seconds.
+    Once the window holds at least min_calls, the breaker opens when the
+    error rate reaches error_rate_threshold or the share of calls slower
+    than slow_call_seconds reaches slow_call_rate_threshold.
+
+    After recovery_timeout it goes half-open and admits at most
+    half_open_probes calls; that many successes close it, any failure
+    reopens it. Everyone else keeps failing fast, so a recovering
+    dependency is not hit by every queued retry at once.
+
+    With shared=True, open/close transitions are written to Redis and
+    polled every sync_seconds, so all workers trip together.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        window_seconds: float = 60.0,
+        buckets: int = 10,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 2.0,
+        slow_call_rate_threshold: float = 0.8,
+        recovery_timeout: float = 30.0,
+        half_open_probes: int = 2,
+        shared: bool = False,
+        sync_seconds: float = 1.0
+    ):
         self.name = name
-        self.failures = 0
-        self.last_failure_time: Optional[float] = None
+        self.bucket_seconds = window_seconds / buckets
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_probes = half_open_probes
+        self.shared = shared
+        self.sync_seconds = sync_seconds
+
+        # Per bucket: [bucket number, calls, failures, slow calls]
+        self._buckets: List[List[int]] = [[-1, 0, 0, 0] for _ in range(buckets)]
         self.state = "closed"  # closed, open, half-open
-    
+        self.opened_at: Optional[float] = None
+        self.failures = 0  # failures in the current window
+        self.last_failure_time: Optional[float] = None
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self._last_sync = 0.0
+        self._sync_task: Optional[asyncio.Task] = None
+        self.metrics = {"rejected": 0, "opened": 0, "probes": 0}
+
+    # -------------------------
+    # Rolling window
+    # -------------------------
+    def _bucket(self, now: float) -> List[int]:
+        number = int(now / self.bucket_seconds)
+        bucket = self._buckets[number % len(self._buckets)]
+        if bucket[0] != number:
+            bucket[:] = [number, 0, 0, 0]
+        return bucket
+
+    def _window(self, now: float):
+        """(calls, failures, slow calls) across the live buckets"""
+        oldest = int(now / self.bucket_seconds) - len(self._buckets) + 1
+        calls = failures = slow = 0
+        for number, bucket_calls, bucket_failures, bucket_slow in self._buckets:
+            if number >= oldest:
+                calls += bucket_calls
+                failures += bucket_failures
+                slow += bucket_slow
+        return calls, failures, slow
+
+    def _record(self, failed: bool, duration: Optional[float], now: float):
+        bucket = self._bucket(now)
+        bucket[1] += 1
+        slow = duration is not None and duration >= self.slow_call_seconds
+        if failed:
+            bucket[2] += 1
+        if slow:
+            bucket[3] += 1
+
+    # -------------------------
+    # Breaker API
+    # -------------------------
     def allow_request(self) -> bool:
+        now = time.time()
+        self._maybe_sync(now)
+        if self.state == "closed":
+            return True
         if self.state == "open":
-            if self.last_failure_time is None:
+            if now - self.opened_at < self.recovery_timeout:
+                self.metrics["rejected"] += 1
                 return False
-            # Check if recovery timeout has passed
-            if (time.time() - self.last_failure_time) > self.recovery_timeout:
-                self.state = "half-open"
-                return True
+            self.state = "half-open"
+            self._probes_started = self._probes_succeeded = 0
+            self.opened_at = now  # probes that never report back expire after another recovery_timeout
+        elif now - self.opened_at >= self.recovery_timeout:
+            self._probes_started = self._probes_succeeded = 0
+            self.opened_at = now
+        if self._probes_started >= self.half_open_probes:
+            self.metrics["rejected"] += 1
             return False
+        self._probes_started += 1
+        self.metrics["probes"] += 1
         return True
-    
-    def on_success(self):
-        # Reset on any successful request
+
+    def on_success(self, duration: Optional[float] = None):
+        now = time.time()
+        self._record(False, duration, now)
+        if self.state == "half-open":
+            self._probes_succeeded += 1
+            if self._probes_succeeded >= self.half_open_probes:
+                self._close()
+        elif self.state == "closed" and duration is not None and duration >= self.slow_call_seconds:
+            self._evaluate(now)
+
+    def on_failure(self, duration: Optional[float] = None):
+        now = time.time()
+        self.last_failure_time = now
+        self._record(True, duration, now)
+        if self.state == "half-open":
+            self._open(now)
+        elif self.state == "closed":
+            self._evaluate(now)
+
+    def reset(self):
+        self._buckets = [[-1, 0, 0, 0] for _ in self._buckets]
+        self.last_failure_time = None
+        self._close()
+
+    def _evaluate(self, now: float):
+        calls, failures, slow = self._window(now)
+        self.failures = failures
+        if calls < self.min_calls:
+            return
+        if failures / calls >= self.error_rate_threshold or slow / calls >= self.slow_call_rate_threshold:
+            self._open(now)
+
+    def _open(self, now: float):
+        self.state = "open"
+        self.opened_at = now
+        self.metrics["opened"] += 1
+        self._publish_shared()
+
+    def _close(self):
+        was_closed = self.state == "closed"
         self.state = "closed"
+        self.opened_at = None
         self.failures = 0
-        self.last_failure_time = None
-    
-    def on_failure(self):
-        self.failures += 1
-        self.last_failure_time = time.time()
-        
-        if self.failures >= self.failure_threshold:
+        self._probes_started = self._probes_succeeded = 0
+        if not was_closed:
+            # Start the recovered dependency with a clean window
+            self._buckets = [[-1, 0, 0, 0] for _ in self._buckets]
+            self._publish_shared()
+
+    # -------------------------
+    # Shared state (Redis)
+    # -------------------------
+    @property
+    def _redis_key(self) -> str:
+        return f"cb:{self.name}"
+
+    def _spawn(self, coroutine) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            coroutine.close()
+            return False
+        self._sync_task = loop.create_task(coroutine)
+        return True
+
+    def _publish_shared(self):
+        if self.shared:
+            self._spawn(self._write_shared(self.state, self.opened_at))
+
+    def _maybe_sync(self, now: float):
+        if not self.shared or now - self._last_sync < self.sync_seconds:
+            return
+        if self._sync_task is not None and not self._sync_task.done():
+            return
+        self._last_sync = now
+        self._spawn(self._read_shared())
+
+    async def _write_shared(self, state: str, opened_at: Optional[float]):
+        try:
+            redis_client = await get_redis_client()
+            if state == "open":
+                payload = json.dumps({"state": state, "opened_at": opened_at})
+                # Expires once every worker would have moved on to probing anyway
+                await redis_client.set(self._redis_key, payload, px=int(self.recovery_timeout * 2000))
+            elif state == "closed":
+                await redis_client.delete(self._redis_key)
+        except Exception as e:
+            print(f"[CircuitBreaker] {self.name}: shared state write failed: {e}")
+
+    async def _read_shared(self):
+        try:
+            redis_client = await get_redis_client()
+            raw = await redis_client.get(self._redis_key)
+        except Exception as e:
+            print(f"[CircuitBreaker] {self.name}: shared state read failed: {e}")
+            return
+        if not raw:
+            return
+        shared = json.loads(raw)
+        # Adopt a trip from another worker, unless we already tripped more recently
+        if shared.get("state") == "open" and (self.opened_at or 0) < shared["opened_at"]:
             self.state = "open"
-    
+            self.opened_at = shared["opened_at"]
+
     def get_status(self) -> dict:
+        calls, failures, slow = self._window(time.time())
         return {
             "name": self.name,
             "state": self.state,
-            "failures": self.failures,
+            "failures": failures,
             "last_failure": self.last_failure_time,
+            "window_calls": calls,
+            "error_rate": round(failures / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(slow / calls, 3) if calls else 0.0,
+            "shared": self.shared,
+            **self.metrics,
         }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per dependency name, configured from settings"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str, **overrides) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            options = dict(
+                window_seconds=settings.cb_window_seconds,
+                buckets=settings.cb_buckets,
+                min_calls=settings.cb_min_calls,
+                error_rate_threshold=settings.cb_error_rate_threshold,
+                slow_call_seconds=settings.cb_slow_call_seconds,
+                slow_call_rate_threshold=settings.cb_slow_call_rate_threshold,
+                recovery_timeout=settings.cb_recovery_timeout,
+                half_open_probes=settings.cb_half_open_probes,
+                shared=settings.cb_redis_shared,
+            )
+            options.update(overrides)
+            breaker = self._breakers[name] = CircuitBreaker(name=name, **options)
+        return breaker
+
+    def all(self) -> List[CircuitBreaker]:
+        return list(self._breakers.values())
+
+    def reset_all(self):
+        for breaker in self._breakers.values():
+            breaker.reset()
+
+    def get_status(self) -> Dict[str, dict]:
+        return {name: breaker.get_status() for name, breaker in self._breakers.items()}
+
+
+circuit_breakers = CircuitBreakerRegistry()
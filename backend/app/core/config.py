@@ -81,6 +81,15 @@ class Settings(BaseSettings):
     postgres_host: str = Field(..., env="POSTGRES_HOST")
     postgres_port: int = Field(..., env="POSTGRES_PORT")
     database_url: PostgresDsn | None = None
+    async_database_url: str | None = None
+
+    # Connection pool (shared by the sync and async engines)
+    db_pool_size: int = Field(10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(20, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: int = Field(30, env="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(1800, env="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(True, env="DB_POOL_PRE_PING")
+    db_echo: bool = Field(True, env="DB_ECHO")
 
     # Redis
     redis_host: str = Field(..., env="REDIS_HOST")
@@ -88,6 +97,63 @@ class Settings(BaseSettings):
     redis_db: int = Field(..., env="REDIS_DB")
     redis_url: RedisDsn | None = None
 
+    # Partitioning
+    partition_precreate_months: int = Field(3, env="PARTITION_PRECREATE_MONTHS")
+    partition_refresh_seconds: int = Field(3600, env="PARTITION_REFRESH_SECONDS")
+
+    # Velocity features
+    velocity_max_entities: int = Field(100_000, env="VELOCITY_MAX_ENTITIES")
+    velocity_idle_seconds: int = Field(86_400, env="VELOCITY_IDLE_SECONDS")
+
+    # Customer feature snapshots (in-process LRU in front of Redis)
+    snapshot_max_entries: int = Field(10_000, env="SNAPSHOT_MAX_ENTRIES")
+    snapshot_local_ttl_seconds: float = Field(30.0, env="SNAPSHOT_LOCAL_TTL_SECONDS")
+    snapshot_redis_ttl_seconds: int = Field(300, env="SNAPSHOT_REDIS_TTL_SECONDS")
+    snapshot_recent_limit: int = Field(50, env="SNAPSHOT_RECENT_LIMIT")
+
+    # Transaction listing (TTL of the ?count=cached page total)
+    txn_count_cache_ttl_seconds: int = Field(60, env="TXN_COUNT_CACHE_TTL_SECONDS")
+
+    # KB search index (0 disables the periodic reload from the DB)
+    kb_index_refresh_seconds: int = Field(300, env="KB_INDEX_REFRESH_SECONDS")
+
+    # Orchestrator
+    orchestrator_step_timeout: float = Field(5.0, env="ORCHESTRATOR_STEP_TIMEOUT")
+    orchestrator_plan_timeout: float = Field(15.0, env="ORCHESTRATOR_PLAN_TIMEOUT")
+    fraud_batch_concurrency: int = Field(10, env="FRAUD_BATCH_CONCURRENCY")
+
+    # Circuit breakers (shared: mirror open/close transitions in Redis across workers)
+    cb_window_seconds: float = Field(60.0, env="CB_WINDOW_SECONDS")
+    cb_buckets: int = Field(10, env="CB_BUCKETS")
+    cb_min_calls: int = Field(5, env="CB_MIN_CALLS")
+    cb_error_rate_threshold: float = Field(0.5, env="CB_ERROR_RATE_THRESHOLD")
+    cb_slow_call_seconds: float = Field(2.0, env="CB_SLOW_CALL_SECONDS")
+    cb_slow_call_rate_threshold: float = Field(0.8, env="CB_SLOW_CALL_RATE_THRESHOLD")
+    cb_recovery_timeout: float = Field(30.0, env="CB_RECOVERY_TIMEOUT")
+    cb_half_open_probes: int = Field(2, env="CB_HALF_OPEN_PROBES")
+    cb_redis_shared: bool = Field(False, env="CB_REDIS_SHARED")
+
+    # Agent retries (hedging applies to idempotent agents only)
+    retry_attempts: int = Field(2, env="RETRY_ATTEMPTS")
+    retry_attempt_timeout: float = Field(1.0, env="RETRY_ATTEMPT_TIMEOUT")
+    retry_hedge_after: float = Field(0.3, env="RETRY_HEDGE_AFTER")
+    retry_budget_ratio: float = Field(0.2, env="RETRY_BUDGET_RATIO")
+    retry_budget_min_per_second: float = Field(1.0, env="RETRY_BUDGET_MIN_PER_SECOND")
+
+    # Rate limiting (lease fraction 0 disables the local token lease)
+    rate_limit_lease_fraction: float = Field(0.0, env="RATE_LIMIT_LEASE_FRACTION")
+    rate_limit_lease_ms: int = Field(1000, env="RATE_LIMIT_LEASE_MS")
+
+    # SSE
+    sse_queue_size: int = Field(100, env="SSE_QUEUE_SIZE")
+    sse_overflow_policy: str = Field("drop_oldest", env="SSE_OVERFLOW_POLICY")
+    sse_heartbeat_seconds: float = Field(15.0, env="SSE_HEARTBEAT_SECONDS")
+    sse_redis_enabled: bool = Field(True, env="SSE_REDIS_ENABLED")
+    sse_redis_stream: str = Field("sse:events", env="SSE_REDIS_STREAM")
+    sse_stream_maxlen: int = Field(10_000, env="SSE_STREAM_MAXLEN")
+    sse_ring_size: int = Field(10_000, env="SSE_RING_SIZE")
+    sse_batch_size: int = Field(256, env="SSE_BATCH_SIZE")
+
     # Security
     api_key: str = Field(..., env="API_KEY")
 
@@ -101,6 +167,10 @@ class Settings(BaseSettings):
             f"postgresql+psycopg2://{self.postgres_user}:{self.postgres_password}"
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
+        self.async_database_url = (
+            f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
+            f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+        )
         self.redis_url = f"redis://{self.redis_host}:{self.redis_port}/{self.redis_db}"
 
 # Create a settings instance
@@ -27,15 +27,36 @@ from sqlalchemy import create_engine, event, text
 # from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.core.config import settings
 from datetime import datetime
+from typing import Iterable, Optional, Set, Tuple
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_pool_options = dict(
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+)
 
 # Create SQLAlchemy engine
-engine = create_engine(settings.database_url, echo=True, future=True)
+engine = create_engine(settings.database_url, echo=settings.db_echo, future=True, **_pool_options)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 
+# Async engine (asyncpg) for request paths that should not hop through the
+# default thread pool via asyncio.to_thread
+async_engine = create_async_engine(settings.async_database_url, echo=settings.db_echo, **_pool_options)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -48,6 +69,12 @@ def get_db():
         db.close()
 
 
+# Async dependency for FastAPI routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # ---------------------------
 # Optional: Partition Helper
 # ---------------------------
@@ -62,7 +89,7 @@ def create_month_partition(table_name: str, year: int, month: int):
     partition_range_start = year * 100 + month
     partition_range_end = next_year * 100 + next_month
 
-    with engine.connect() as conn:
+    with engine.begin() as conn:
         conn.execute(
             text(f"""
             CREATE TABLE IF NOT EXISTS {partition_table}
@@ -71,17 +98,114 @@ def create_month_partition(table_name: str, year: int, month: int):
             """)
         )
 
+class PartitionManager:
+    """
+    Keeps an in-process set of known monthly partitions so the write path
+    only issues DDL (and checks out a connection) on a cache miss.
+
+    At startup the cache is seeded from pg_inherits and the next
+    `months_ahead` months are pre-created; a background task repeats this
+    every `refresh_seconds` so month rollovers never hit the hot path.
+    """
+
+    def __init__(self, months_ahead: int = 3, refresh_seconds: int = 3600):
+        self.months_ahead = months_ahead
+        self.refresh_seconds = refresh_seconds
+        self._known: Set[Tuple[str, int, int]] = set()
+        self._tables: Set[str] = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return engine.dialect.name == "postgresql"
+
+    def ensure_partition(self, table_name: str, ts: datetime):
+        """Create the partition holding `ts` unless it is already known."""
+        key = (table_name, ts.year, ts.month)
+        if key in self._known or not self.enabled:
+            return
+        with self._lock:
+            if key in self._known:
+                return
+            create_month_partition(table_name, ts.year, ts.month)
+            self._known.add(key)
+
+    def load_existing(self, table_name: str):
+        """Seed the cache with partitions that already exist in the database."""
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("""
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = CAST(:parent AS regclass)
+                """),
+                {"parent": table_name}
+            )
+            for (relname,) in rows:
+                suffix = relname[len(table_name) + 1:]
+                if relname.startswith(f"{table_name}_") and len(suffix) == 6 and suffix.isdigit():
+                    self._known.add((table_name, int(suffix[:4]), int(suffix[4:])))
+
+    def precreate(self, table_name: str, start: Optional[datetime] = None):
+        """Ensure partitions exist for the current month and `months_ahead` after it."""
+        start = start or datetime.utcnow()
+        year, month = start.year, start.month
+        for _ in range(self.months_ahead + 1):
+            self.ensure_partition(table_name, datetime(year, month, 1))
+            year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+
+    def refresh(self):
+        for table_name in self._tables:
+            try:
+                self.load_existing(table_name)
+                self.precreate(table_name)
+            except Exception as e:
+                logger.error(f"Partition refresh failed for {table_name}: {e}")
+
+    async def start(self, table_names: Iterable[str]):
+        """Seed and pre-create partitions, then keep refreshing in the background."""
+        self._tables.update(table_names)
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self.refresh)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await asyncio.to_thread(self.refresh)
+
+    def get_status(self) -> dict:
+        return {
+            "tables": sorted(self._tables),
+            "known_partitions": len(self._known),
+            "months_ahead": self.months_ahead,
+        }
+
+
+partition_manager = PartitionManager(
+    months_ahead=settings.partition_precreate_months,
+    refresh_seconds=settings.partition_refresh_seconds,
+)
+
+
 # Optional: Auto-create partition on insert (event listener)
 def attach_partition_listener(table_name: str):
     """
     Attach a listener to automatically create a monthly partition before insert.
-    Only works if you use SQLAlchemy ORM insert.
+    Only works if you use SQLAlchemy ORM insert. DDL only runs on a
+    PartitionManager cache miss.
     """
 
     @event.listens_for(SessionLocal, "before_flush")
     def before_flush(session, flush_context, instances):
         for obj in session.new:
             if hasattr(obj, "timestamp") and hasattr(obj, "__tablename__") and obj.__tablename__ == table_name:
-                year = obj.timestamp.year
-                month = obj.timestamp.month
-                create_month_partition(table_name, year, month)
+                partition_manager.ensure_partition(table_name, obj.timestamp)
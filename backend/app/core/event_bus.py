@@ -0,0 +1,91 @@
+# app/core/event_bus.py
+import asyncio
+from typing import Callable, List, Optional, Tuple
+from app.core.redis import get_redis_client
+
+# (event_id, type, customer_id, data_json)
+BusEvent = Tuple[str, str, Optional[str], str]
+
+
+class RedisEventBus:
+    """
+    Cross-worker event bus on a capped Redis Stream.
+
+    Every worker XADDs to the same stream and runs one XREAD loop that hands
+    new entries to a local deliver callback, so each event is fanned out to
+    the subscribers of every worker. The stream doubles as replay history for
+    reconnecting clients (Last-Event-ID).
+    """
+
+    def __init__(self, stream: str = "sse:events", maxlen: int = 10_000, block_ms: int = 5000):
+        self.stream = stream
+        self.maxlen = maxlen
+        self.block_ms = block_ms
+        self._task: Optional[asyncio.Task] = None
+        self._deliver: Optional[Callable[[BusEvent], None]] = None
+        self.metrics = {"appended": 0, "received": 0, "errors": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, deliver: Callable[[BusEvent], None]):
+        self._deliver = deliver
+        redis_client = await get_redis_client()
+        await redis_client.ping()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def append(self, event_type: str, customer_id: Optional[str], data: str) -> str:
+        redis_client = await get_redis_client()
+        fields = {"type": event_type, "customer_id": customer_id or "", "data": data}
+        event_id = await redis_client.xadd(self.stream, fields, maxlen=self.maxlen, approximate=True)
+        self.metrics["appended"] += 1
+        return event_id
+
+    async def append_many(self, events: List[Tuple[str, Optional[str], str]]) -> List[str]:
+        """XADD a batch of (type, customer_id, data) in one pipelined round trip"""
+        redis_client = await get_redis_client()
+        pipe = redis_client.pipeline(transaction=False)
+        for event_type, customer_id, data in events:
+            fields = {"type": event_type, "customer_id": customer_id or "", "data": data}
+            pipe.xadd(self.stream, fields, maxlen=self.maxlen, approximate=True)
+        event_ids = await pipe.execute()
+        self.metrics["appended"] += len(event_ids)
+        return event_ids
+
+    async def replay(self, last_event_id: str, count: int) -> List[BusEvent]:
+        """Entries after last_event_id (exclusive), oldest first, at most count"""
+        redis_client = await get_redis_client()
+        entries = await redis_client.xrange(self.stream, min=f"({last_event_id}", max="+", count=count)
+        return [self._decode(event_id, fields) for event_id, fields in entries]
+
+    @staticmethod
+    def _decode(event_id: str, fields: dict) -> BusEvent:
+        return event_id, fields["type"], fields.get("customer_id") or None, fields["data"]
+
+    async def _run(self):
+        last_id = "$"
+        while True:
+            try:
+                redis_client = await get_redis_client()
+                response = await redis_client.xread({self.stream: last_id}, block=self.block_ms, count=500)
+                for _stream, entries in response or []:
+                    for event_id, fields in entries:
+                        last_id = event_id
+                        self.metrics["received"] += 1
+                        self._deliver(self._decode(event_id, fields))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics["errors"] += 1
+                print(f"[EventBus] read failed: {e}")
+                await asyncio.sleep(1)
+
+    def get_status(self) -> dict:
+        return {"stream": self.stream, "running": self.running, **self.metrics}
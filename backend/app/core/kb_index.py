@@ -0,0 +1,165 @@
+# app/core/kb_index.py
+import heapq
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights for BM25F-style term frequencies
+FIELD_WEIGHTS = {"title": 2.0, "anchors": 1.5, "snippet": 1.0}
+PREFIX_WEIGHT = 0.7      # discount for terms only matched by prefix
+MAX_PREFIX_TERMS = 50    # cap on expansions per query token
+
+
+def tokenize(text: Any) -> List[str]:
+    return TOKEN_RE.findall(str(text).lower()) if text else []
+
+
+class KBSearchIndex:
+    """
+    In-memory inverted index over KB entries with BM25 ranking.
+
+    Title, snippet and anchors are tokenized once at insert time; a search
+    only touches the posting lists of its query terms. Query tokens also
+    match indexed terms they are a prefix of ("disp" -> "dispute").
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, refresh_seconds: int = 0):
+        self.k1 = k1
+        self.b = b
+        self.refresh_seconds = refresh_seconds
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._doc_len: Dict[str, float] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []  # sorted, for prefix lookups
+        self._total_len = 0.0
+        self._lock = threading.RLock()
+        self.loaded_at: Optional[float] = None
+        self.metrics = {"searches": 0, "loads": 0, "adds": 0}
+
+    # ------------------------------
+    # Maintenance
+    # ------------------------------
+    def needs_load(self) -> bool:
+        if self.loaded_at is None:
+            return True
+        return bool(self.refresh_seconds) and time.time() - self.loaded_at > self.refresh_seconds
+
+    def load(self, entries: Iterable[Any]):
+        """Replace the index contents with `entries` (ORM rows or dicts)."""
+        with self._lock:
+            self._docs.clear()
+            self._doc_terms.clear()
+            self._doc_len.clear()
+            self._postings.clear()
+            self._terms = []
+            self._total_len = 0.0
+            for entry in entries:
+                self._add(entry)
+            self.loaded_at = time.time()
+            self.metrics["loads"] += 1
+
+    def add(self, entry: Any):
+        """Index (or re-index) a single entry."""
+        with self._lock:
+            self._add(entry)
+            self.metrics["adds"] += 1
+
+    def _add(self, entry: Any):
+        get = entry.get if isinstance(entry, dict) else lambda name: getattr(entry, name, None)
+        doc_id = str(get("id"))
+        if doc_id in self._docs:
+            self._remove(doc_id)
+
+        anchors = get("anchors") or []
+        fields = {"title": get("title"), "snippet": get("snippet"), "anchors": " ".join(map(str, anchors))}
+        terms: Counter = Counter()
+        length = 0.0
+        for field, text in fields.items():
+            tokens = tokenize(text)
+            weight = FIELD_WEIGHTS[field]
+            length += weight * len(tokens)
+            for token in tokens:
+                terms[token] += weight
+
+        self._docs[doc_id] = {"id": doc_id, "title": get("title"), "snippet": get("snippet"), "anchors": anchors}
+        self._doc_terms[doc_id] = dict(terms)
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            postings[doc_id] = tf
+
+    def _remove(self, doc_id: str):
+        for term in self._doc_terms.pop(doc_id, {}):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+        self._total_len -= self._doc_len.pop(doc_id, 0.0)
+        self._docs.pop(doc_id, None)
+
+    # ------------------------------
+    # Query
+    # ------------------------------
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        expanded = [(token, 1.0)] if token in self._postings else []
+        i = bisect_left(self._terms, token)
+        while i < len(self._terms) and len(expanded) < MAX_PREFIX_TERMS and self._terms[i].startswith(token):
+            if self._terms[i] != token:
+                expanded.append((self._terms[i], PREFIX_WEIGHT))
+            i += 1
+        return expanded
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries ranked by BM25 score, best first."""
+        with self._lock:
+            self.metrics["searches"] += 1
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_len = self._total_len / n_docs or 1.0
+
+            # A term reachable from several query tokens counts once, at its best weight
+            term_weights: Dict[str, float] = {}
+            for token in set(tokenize(query)):
+                for term, weight in self._expand(token):
+                    term_weights[term] = max(weight, term_weights.get(term, 0.0))
+
+            scores: Dict[str, float] = {}
+            for term, weight in term_weights.items():
+                postings = self._postings[term]
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if limit:
+                ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            else:
+                ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            return [self._docs[doc_id] | {"score": round(score, 4)} for doc_id, score in ranked]
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._terms),
+                "loaded_at": self.loaded_at,
+                **self.metrics,
+            }
+
+
+kb_index = KBSearchIndex(refresh_seconds=settings.kb_index_refresh_seconds)
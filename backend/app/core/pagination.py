@@ -0,0 +1,27 @@
+# app/core/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+# Total-count modes for paginated endpoints:
+#   exact  - COUNT(*) on every request
+#   cached - COUNT(*) at most once per TTL per key (may lag recent ingests)
+#   none   - no count; clients page with next_cursor until it is null
+COUNT_MODES = ("exact", "cached", "none")
+
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    """Opaque keyset cursor for the row a page ended on"""
+    raw = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), str(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
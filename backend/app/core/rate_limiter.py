@@ -1,8 +1,114 @@
 # core/rate_limiter.py
+import math
+import time
+from collections import OrderedDict
 from fastapi import HTTPException, Request
 from functools import wraps
+from typing import Tuple
+from app.core.config import settings
 from app.core.redis import get_redis_client
 
+# GCRA (generic cell rate algorithm) in one round trip.
+# Stores the theoretical arrival time (TAT) per key; uses the Redis clock
+# so app servers with skewed clocks agree. Grants up to `cost` tokens
+# (fewer when the window is nearly used up).
+# KEYS[1] = key, ARGV = limit, period_ms, cost
+# Returns {granted, retry_after_ms, remaining}
+GCRA_LUA = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local interval = period / limit
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local available = math.floor((now + period - tat) / interval)
+if available < 1 then
+    return {0, math.ceil(tat + interval - period - now), 0}
+end
+local granted = math.min(cost, available)
+local new_tat = tat + interval * granted
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return {granted, 0, available - granted}
+"""
+
+
+class RateLimiter:
+    """
+    Atomic GCRA limiter backed by a Redis Lua script.
+
+    With lease_fraction > 0, each worker takes a lease of up to
+    limit * lease_fraction tokens from Redis in one call and serves
+    requests from it locally until it is used up or lease_ms passes.
+    Unused leased tokens simply lapse, so the shared limit is never exceeded.
+    """
+
+    def __init__(self, lease_fraction: float = 0.0, lease_ms: int = 1000, max_local_keys: int = 10_000):
+        self.lease_fraction = lease_fraction
+        self.lease_ms = lease_ms
+        self.max_local_keys = max_local_keys
+        self._leases: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, expires_at]
+        self._script = None
+        self._script_client = None
+        self.metrics = {"checks": 0, "local_hits": 0, "redis_calls": 0, "limited": 0}
+
+    async def _acquire(self, key: str, limit: int, period_ms: int, cost: int) -> Tuple[int, int]:
+        redis_client = await get_redis_client()
+        if self._script is None or self._script_client is not redis_client:
+            self._script = redis_client.register_script(GCRA_LUA)
+            self._script_client = redis_client
+        self.metrics["redis_calls"] += 1
+        granted, retry_after_ms, _remaining = await self._script(keys=[key], args=[limit, period_ms, cost])
+        return int(granted), int(retry_after_ms)
+
+    def _take_local(self, key: str) -> bool:
+        lease = self._leases.get(key)
+        if lease is None:
+            return False
+        if lease[0] <= 0 or lease[1] <= time.monotonic():
+            del self._leases[key]
+            return False
+        lease[0] -= 1
+        self._leases.move_to_end(key)
+        return True
+
+    def _store_lease(self, key: str, tokens: int):
+        self._leases[key] = [tokens, time.monotonic() + self.lease_ms / 1000]
+        self._leases.move_to_end(key)
+        while len(self._leases) > self.max_local_keys:
+            self._leases.popitem(last=False)
+
+    async def check(self, key: str, limit: int, window_seconds: int) -> Tuple[bool, int]:
+        """(allowed, retry_after_ms) for one request against limit per window"""
+        self.metrics["checks"] += 1
+        period_ms = window_seconds * 1000
+
+        lease_size = int(limit * self.lease_fraction)
+        if lease_size > 1 and self._take_local(key):
+            self.metrics["local_hits"] += 1
+            return True, 0
+
+        granted, retry_after_ms = await self._acquire(key, limit, period_ms, max(1, lease_size))
+        if not granted:
+            self.metrics["limited"] += 1
+            return False, retry_after_ms
+        if granted > 1:
+            self._store_lease(key, granted - 1)
+        return True, 0
+
+    def get_status(self) -> dict:
+        return {"local_keys": len(self._leases), **self.metrics}
+
+
+rate_limiter = RateLimiter(
+    lease_fraction=settings.rate_limit_lease_fraction,
+    lease_ms=settings.rate_limit_lease_ms,
+)
+
+
 def rate_limit(max_requests: int, window_seconds: int, key: str | None = None):
     """
     Rate limiter decorator using Redis.
@@ -20,18 +126,10 @@ def rate_limit(max_requests: int, window_seconds: int, key: str | None = None):
             # Use custom key if provided, else client IP + path
             rate_key = key if key else f"rate:{request.client.host}:{request.url.path}"
 
-            redis_client = await get_redis_client()
-
-            # Increment counter atomically
-            current = await redis_client.incr(rate_key)
-            if current == 1:
-                # Set TTL for first request
-                await redis_client.expire(rate_key, window_seconds)
+            allowed, retry_after_ms = await rate_limiter.check(rate_key, max_requests, window_seconds)
 
-            if current > max_requests:
-                ttl = await redis_client.ttl(rate_key)
-                retry_after_sec = ttl if ttl > 0 else window_seconds
-                retry_after_ms = retry_after_sec * 1000
+            if not allowed:
+                retry_after_sec = max(1, math.ceil(retry_after_ms / 1000))
 
                 # Raise 429 with Retry-After header and retryAfterMs in JSON body
                 raise HTTPException(
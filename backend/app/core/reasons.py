@@ -0,0 +1,107 @@
+# app/core/reasons.py
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+NO_REASON = "No specific reason provided"
+
+
+def _collect(raw: Any, out: List[str]):
+    if isinstance(raw, str):
+        out.append(raw)
+    elif isinstance(raw, dict):
+        if "reason" in raw:
+            _collect(raw["reason"], out)
+        else:
+            out.extend(value for value in raw.values() if isinstance(value, str))
+    elif isinstance(raw, list):
+        for item in raw:
+            if isinstance(item, (str, dict)):
+                _collect(item, out)
+
+
+def canonical_reasons(raw: Any) -> List[str]:
+    """
+    Reason text as a non-empty list of distinct, stripped strings, ready to
+    be interned into codes. Accepts every legacy shape of the reasons
+    column (lists of {"reason": ...} dicts, bare dicts, JSON-encoded
+    strings, plain strings).
+    """
+    if isinstance(raw, str) and raw.lstrip()[:1] in ("[", "{"):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            pass
+
+    collected: List[str] = []
+    _collect(raw, collected)
+    reasons = list(dict.fromkeys(
+        reason.strip() for reason in collected if reason.strip() and reason.strip() != NO_REASON
+    ))
+    return reasons or [NO_REASON]
+
+
+# -------------------------
+# Reason codes
+# -------------------------
+# Alerts store small integer codes instead of reason text. Codes below
+# FIRST_DYNAMIC_CODE are fixed here (and seeded into fraud_reason_codes);
+# any other text is interned into that table by ReasonCodeService.
+NO_REASON_CODE = 1
+HIGH_VELOCITY = 2
+DEVICE_CHANGE = 3
+UNUSUAL_MCC = 4
+CHARGEBACK_HISTORY = 5
+CASH_WITHDRAWAL = 6
+NEGATIVE_AMOUNT = 7
+FIRST_DYNAMIC_CODE = 100
+
+BUILTIN_REASONS: Dict[int, str] = {
+    NO_REASON_CODE: NO_REASON,
+    HIGH_VELOCITY: "High transaction velocity detected",
+    DEVICE_CHANGE: "Suspicious device change",
+    UNUSUAL_MCC: "Unusual merchant category",
+    CHARGEBACK_HISTORY: "Previous chargeback history",
+    CASH_WITHDRAWAL: "High-value cash withdrawal at unusual time/location",
+    NEGATIVE_AMOUNT: "Negative amount transaction",
+}
+
+
+def is_codes(raw: Any) -> bool:
+    return type(raw) is list and bool(raw) and all(type(code) is int for code in raw)
+
+
+class ReasonCodeRegistry:
+    """
+    In-process code <-> text table. Starts with BUILTIN_REASONS; codes
+    interned at runtime are added by ReasonCodeService as it sees them.
+    Codes are never reassigned, so entries never go stale.
+    """
+
+    def __init__(self, builtins: Dict[int, str] = BUILTIN_REASONS):
+        self._text_by_code: Dict[int, str] = dict(builtins)
+        self._code_by_text: Dict[str, int] = {text: code for code, text in builtins.items()}
+        self._lock = threading.Lock()
+
+    def code_for(self, text: str) -> Optional[int]:
+        return self._code_by_text.get(text)
+
+    def missing(self, codes: Iterable[int]) -> Set[int]:
+        return {code for code in codes if code not in self._text_by_code}
+
+    def remember(self, pairs: Iterable[Tuple[int, str]]):
+        with self._lock:
+            for code, text in pairs:
+                self._text_by_code[code] = text
+                self._code_by_text[text] = code
+
+    def texts(self, codes: Iterable[int]) -> List[str]:
+        """Expand codes for API output; a code this worker has not loaded yet shows as reason:<code>"""
+        text_by_code = self._text_by_code
+        return [text_by_code.get(code) or f"reason:{code}" for code in codes]
+
+    def get_status(self) -> dict:
+        return {"codes": len(self._text_by_code)}
+
+
+reason_codes = ReasonCodeRegistry()
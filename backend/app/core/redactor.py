@@ -1,16 +1,188 @@
+import asyncio
 import re
+import types
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, FrozenSet, Iterable, Literal, Optional, Tuple, Type, Union, get_args, get_origin
+from uuid import UUID
+from pydantic import BaseModel
+
+# name -> (pattern, replacement)
+CARD_EMAIL_RULES: Dict[str, Tuple[str, str]] = {
+    "card": (r'\b(?:\d[ -]*?){13,16}\b', "****REDACTED_CARD****"),
+    "email": (r'\b[\w\.-]+@[\w\.-]+\.\w+\b', "****REDACTED_EMAIL****"),
+}
+
+AGENT_RULES: Dict[str, Tuple[str, str]] = {
+    "credit_card": (r'\b\d{13,19}\b', "****REDACTED****"),
+    "aadhaar": (r'\b\d{4}\s?\d{4}\s?\d{4}\b', "****REDACTED****"),
+    "pan": (r'[A-Z]{5}\d{4}[A-Z]{1}', "****REDACTED****"),
+    "phone": (r'\b(?:\+91[\-\s]?)?[789]\d{9}\b', "****REDACTED****"),
+}
+# Every AGENT_RULES match starts with one of these
+AGENT_FIRST_CHARS = r'[\dA-Z+]'
+
+# Keys whose string values are never free text (enums, scores, timestamps)
+SAFE_KEYS: FrozenSet[str] = frozenset({
+    "status", "success", "action", "type", "event", "risk_level", "riskLevel",
+    "risk_score", "score", "confidence", "created_at", "updated_at", "timestamp",
+})
+
+
+# Field kinds in a model redaction plan
+SAFE, TEXT, GENERIC = "safe", "text", "generic"
+SAFE_TYPES = (bool, int, float, Decimal, datetime, date, time, timedelta, UUID, Enum, type(None))
+
+
+def _field_kind(annotation: Any) -> str:
+    """SAFE if the annotation can never hold free text, TEXT for plain str, else GENERIC"""
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return SAFE
+    if origin is Union or origin is types.UnionType:
+        kinds = {_field_kind(arg) for arg in get_args(annotation) if arg is not type(None)}
+        return kinds.pop() if len(kinds) == 1 else GENERIC
+    if origin in (list, set, frozenset, tuple):
+        args = [arg for arg in get_args(annotation) if arg is not Ellipsis]
+        return SAFE if args and all(_field_kind(arg) == SAFE for arg in args) else GENERIC
+    if isinstance(annotation, type):
+        # Enum before str: str-valued enums are still closed sets
+        if issubclass(annotation, SAFE_TYPES):
+            return SAFE
+        if annotation is str:
+            return TEXT
+    return GENERIC
+
+
+class RedactionEngine:
+    """
+    All rules compiled into a single alternation of named groups, so each
+    string is scanned once regardless of how many rules there are. An
+    optional first_chars class guards the alternation so positions where no
+    rule can start are rejected with one character test.
+
+    redact() walks dicts and lists, leaves non-string leaves alone and skips
+    string values under keys in safe_keys. aredact() is the async entry point and
+    moves large payloads off the event loop.
+
+    Pydantic models are redacted from a per-class plan compiled on first
+    use: numeric, datetime, enum and Literal fields are copied as-is, plain
+    str fields get one scan, and only Any/dict/list/nested-model fields are
+    walked. Computed fields are included, so the result is the redacted
+    model_dump().
+    """
+
+    def __init__(
+        self,
+        rules: Dict[str, Tuple[str, str]],
+        safe_keys: Iterable[str] = SAFE_KEYS,
+        first_chars: Optional[str] = None,
+        offload_chars: int = 64 * 1024
+    ):
+        self.rules = dict(rules)
+        self.safe_keys = frozenset(safe_keys)
+        self.offload_chars = offload_chars
+        self._plans: Dict[Type[BaseModel], Tuple[Tuple[str, str], ...]] = {}
+        alternation = "|".join(f"(?P<{name}>{regex})" for name, (regex, _) in self.rules.items())
+        self.pattern = re.compile(f"(?={first_chars})(?:{alternation})" if first_chars else alternation)
+        replacements = {name: replacement for name, (_, replacement) in self.rules.items()}
+        if len(set(replacements.values())) == 1:
+            # One replacement for every rule: plain-string sub, no per-match callback
+            self._replacement = next(iter(replacements.values())).replace("\\", "\\\\")
+        else:
+            self._replacement = lambda match: replacements[match.lastgroup]
+
+    def redact_text(self, text: str) -> str:
+        return self.pattern.sub(self._replacement, text)
+
+    def redact(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.pattern.sub(self._replacement, value)
+        if isinstance(value, dict):
+            return self._redact_dict(value)
+        if isinstance(value, list):
+            return [self.redact(item) for item in value]
+        if isinstance(value, BaseModel):
+            return self.redact_model(value)
+        return value
+
+    def _redact_dict(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        safe_keys = self.safe_keys
+        redacted = {}
+        for key, value in data.items():
+            if isinstance(value, str):
+                redacted[key] = value if key in safe_keys else self.pattern.sub(self._replacement, value)
+            elif isinstance(value, (dict, list)):
+                redacted[key] = self.redact(value)
+            else:
+                redacted[key] = value
+        return redacted
+
+    # -------------------------
+    # Schema-aware plans
+    # -------------------------
+    def plan_for(self, model: Type[BaseModel]) -> Tuple[Tuple[str, str], ...]:
+        plan = self._plans.get(model)
+        if plan is None:
+            fields = []
+            annotations = [(name, field.annotation) for name, field in model.model_fields.items()]
+            annotations += [(name, field.return_type) for name, field in model.model_computed_fields.items()]
+            for name, annotation in annotations:
+                kind = _field_kind(annotation)
+                fields.append((name, SAFE if kind == TEXT and name in self.safe_keys else kind))
+            plan = self._plans[model] = tuple(fields)
+        return plan
+
+    def redact_model(self, instance: BaseModel) -> Dict[str, Any]:
+        sub, replacement = self.pattern.sub, self._replacement
+        redacted = {}
+        for name, kind in self.plan_for(type(instance)):
+            value = getattr(instance, name)
+            if kind == SAFE or value is None:
+                redacted[name] = value
+            elif kind == TEXT and isinstance(value, str):
+                redacted[name] = sub(replacement, value)
+            else:
+                redacted[name] = self.redact(value)
+        if instance.__pydantic_extra__:
+            redacted.update(self._redact_dict(instance.__pydantic_extra__))
+        return redacted
+
+    async def aredact(self, value: Any) -> Any:
+        if self._approx_chars(value, self.offload_chars) >= self.offload_chars:
+            return await asyncio.to_thread(self.redact, value)
+        return self.redact(value)
+
+    @staticmethod
+    def _approx_chars(value: Any, limit: int) -> int:
+        """Total string length in value, counting stops once limit is reached"""
+        total = 0
+        stack = [value]
+        while stack and total < limit:
+            item = stack.pop()
+            if isinstance(item, str):
+                total += len(item)
+            elif isinstance(item, dict):
+                stack.extend(item.values())
+            elif isinstance(item, list):
+                stack.extend(item)
+        return total
+
+
+card_email_engine = RedactionEngine(CARD_EMAIL_RULES, safe_keys=())
+pii_engine = RedactionEngine(AGENT_RULES, first_chars=AGENT_FIRST_CHARS)
+
 
 class Redactor:
-    CARD_PATTERN = re.compile(r'\b(?:\d[ -]*?){13,16}\b')
-    EMAIL_PATTERN = re.compile(r'\b[\w\.-]+@[\w\.-]+\.\w+\b')
+    CARD_PATTERN = re.compile(CARD_EMAIL_RULES["card"][0])
+    EMAIL_PATTERN = re.compile(CARD_EMAIL_RULES["email"][0])
 
     @staticmethod
     def mask_pii(text: str) -> str:
         if not text:
             return text
-        text = Redactor.CARD_PATTERN.sub("****REDACTED_CARD****", text)
-        text = Redactor.EMAIL_PATTERN.sub("****REDACTED_EMAIL****", text)
-        return text
+        return card_email_engine.redact_text(text)
 
 # Create a singleton instance
-redactor = Redactor()
\ No newline at end of file
+redactor = Redactor()
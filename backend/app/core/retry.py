@@ -0,0 +1,154 @@
+# app/core/retry.py
+import asyncio
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Type
+from app.core.config import settings
+
+# Absolute time.monotonic() by which the current request must finish
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+RETRYABLE: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError, asyncio.TimeoutError)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Bound everything inside to `seconds` from now (or the enclosing deadline,
+    if sooner). Tasks created inside inherit it through their context copy.
+    """
+    candidate = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(candidate if current is None else min(current, candidate))
+    try:
+        yield _deadline.get()
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline; None when there is none"""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of first attempts, so a failing dependency
+    sees at most (1 + ratio) x normal load instead of attempts x load.
+    Each first attempt deposits `ratio` tokens (up to max_tokens); each
+    retry or hedge spends one. min_per_second tokens trickle in regardless,
+    so low-traffic callers can still retry occasionally.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._refilled_at = time.monotonic()
+        self.metrics = {"requests": 0, "retries": 0, "hedges": 0, "exhausted": 0}
+
+    def _refill(self, amount: float):
+        self.tokens = min(self.max_tokens, self.tokens + amount)
+
+    def record_request(self):
+        self.metrics["requests"] += 1
+        self._refill(self.ratio)
+
+    def try_spend(self, kind: str = "retries") -> bool:
+        now = time.monotonic()
+        self._refill((now - self._refilled_at) * self.min_per_second)
+        self._refilled_at = now
+        if self.tokens < 1:
+            self.metrics["exhausted"] += 1
+            return False
+        self.tokens -= 1
+        self.metrics[kind] += 1
+        return True
+
+    def get_status(self) -> dict:
+        return {"tokens": round(self.tokens, 2), **self.metrics}
+
+
+_budgets: Dict[str, RetryBudget] = {}
+
+
+def retry_budget(name: str) -> RetryBudget:
+    """The process-wide budget for one agent, shared by all its instances"""
+    budget = _budgets.get(name)
+    if budget is None:
+        budget = _budgets[name] = RetryBudget(
+            ratio=settings.retry_budget_ratio,
+            min_per_second=settings.retry_budget_min_per_second,
+        )
+    return budget
+
+
+def get_budgets_status() -> Dict[str, dict]:
+    return {name: budget.get_status() for name, budget in _budgets.items()}
+
+
+async def _hedged(call: Callable[[], Awaitable[Any]], hedge_after: float, budget: Optional[RetryBudget]) -> Any:
+    """Run call; if it is still pending after hedge_after, race a second copy and keep the first success"""
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done and (budget is None or budget.try_spend("hedges")):
+            tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None or not pending:
+                    return task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call_with_retries(
+    call: Callable[[], Awaitable[Any]],
+    attempts: int = 2,
+    attempt_timeout: float = 1.0,
+    base_delay: float = 0.15,
+    max_delay: float = 0.4,
+    retry_on: Tuple[Type[BaseException], ...] = RETRYABLE,
+    budget: Optional[RetryBudget] = None,
+    hedge_after: Optional[float] = None
+) -> Any:
+    """
+    Await call() with retries on retry_on errors.
+
+    Each attempt gets attempt_timeout, cut down to what is left of the
+    current deadline; no attempt (or backoff sleep) starts that cannot
+    finish in time. Retries are drawn from budget when one is given.
+    hedge_after (idempotent calls only) starts a duplicate of a slow attempt.
+    """
+    if budget is not None:
+        budget.record_request()
+
+    for attempt in range(1, attempts + 1):
+        left = remaining()
+        if left is not None and left <= 0:
+            raise TimeoutError("Request deadline exceeded")
+        timeout = attempt_timeout if left is None else min(attempt_timeout, left)
+        try:
+            if hedge_after is not None and hedge_after < timeout:
+                return await asyncio.wait_for(_hedged(call, hedge_after, budget), timeout=timeout)
+            return await asyncio.wait_for(call(), timeout=timeout)
+        except retry_on as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(f"Operation timed out after {timeout:.2f} seconds")
+            if attempt == attempts:
+                raise e
+            # Exponential backoff with jitter, only if a retry still fits
+            delay = min(base_delay * (2 ** (attempt - 1)), max_delay) * (1 + 0.1 * random.random())
+            left = remaining()
+            if left is not None and left <= delay:
+                raise e
+            if budget is not None and not budget.try_spend():
+                raise e
+            await asyncio.sleep(delay)
@@ -1,34 +1,63 @@
 import re
+from functools import lru_cache
 from typing import Any
 
+MAX_INPUT_LENGTH = 1000
+# Potentially dangerous characters stripped from untrusted strings
+UNSAFE_CHARS = re.compile(r'[<>{}[\]\\]')
+
+# All injection patterns in one compiled, case-insensitive alternation.
+# "as ... ai" used to be `as.*ai`, which matched almost any text containing
+# "as" (and backtracked over the whole string); it now needs "as (an) AI".
+INJECTION_PATTERN = re.compile(
+    r'ignore.*previous'
+    r'|forget.*instructions'
+    r'|\bas\s+(?:an?\s+)?ai\b'
+    r'|disregard'
+    r'|override'
+    r'|system.*prompt',
+    re.IGNORECASE
+)
+
+
+class Trusted:
+    """Marks an internally built argument; guardrails pass it through untouched"""
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+def trusted(value: Any) -> Trusted:
+    return Trusted(value)
+
+
 def sanitize_input(input_data: Any) -> Any:
-    """Sanitize input to prevent injection attacks"""
+    """Sanitize input to prevent injection attacks; unchanged values are returned as-is"""
     if isinstance(input_data, str):
-        # Remove potentially dangerous characters
-        sanitized = re.sub(r'[<>{}[\]\\]', '', input_data)
-        # Limit length
-        return sanitized[:1000]
+        if len(input_data) <= MAX_INPUT_LENGTH and not UNSAFE_CHARS.search(input_data):
+            return input_data
+        # Remove potentially dangerous characters, then limit length
+        return UNSAFE_CHARS.sub('', input_data)[:MAX_INPUT_LENGTH]
+    elif isinstance(input_data, Trusted):
+        return input_data.value
     elif isinstance(input_data, dict):
-        return {k: sanitize_input(v) for k, v in input_data.items()}
+        sanitized = {k: sanitize_input(v) for k, v in input_data.items()}
+        return input_data if all(sanitized[k] is v for k, v in input_data.items()) else sanitized
     elif isinstance(input_data, list):
-        return [sanitize_input(item) for item in input_data]
+        sanitized = [sanitize_input(item) for item in input_data]
+        return input_data if all(a is b for a, b in zip(sanitized, input_data)) else sanitized
     else:
         return input_data
 
+
+@lru_cache(maxsize=4096)
+def _has_injection(text: str) -> bool:
+    return INJECTION_PATTERN.search(text) is not None
+
+
 def detect_prompt_injection(text: str) -> bool:
-    """Detect potential prompt injection attempts"""
-    injection_patterns = [
-        r'(?i)ignore.*previous',
-        r'(?i)forget.*instructions',
-        r'(?i)as.*ai',
-        r'(?i)disregard',
-        r'(?i)override',
-        r'(?i)system.*prompt'
-    ]
-    
-    text_lower = text.lower()
-    for pattern in injection_patterns:
-        if re.search(pattern, text_lower):
-            return True
-    
-    return False
\ No newline at end of file
+    """Detect potential prompt injection attempts (memoized for short strings)"""
+    if len(text) <= MAX_INPUT_LENGTH:
+        return _has_injection(text)
+    return INJECTION_PATTERN.search(text) is not None
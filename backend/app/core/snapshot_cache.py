@@ -0,0 +1,224 @@
+# app/core/snapshot_cache.py
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+
+Snapshot = Dict[str, Any]
+
+# Write the snapshot only if no worker invalidated the customer since the load began
+SET_IF_GENERATION_LUA = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', tonumber(ARGV[3]))
+return 1
+"""
+
+# KEYS are (snapshot key, generation key) pairs; ARGV[1] is the generation key TTL
+INVALIDATE_LUA = """
+for i = 1, #KEYS, 2 do
+    redis.call('DEL', KEYS[i])
+    redis.call('INCR', KEYS[i + 1])
+    redis.call('EXPIRE', KEYS[i + 1], tonumber(ARGV[1]))
+end
+return #KEYS / 2
+"""
+
+
+class CustomerSnapshotCache:
+    """
+    Two-tier cache of per-customer feature snapshots.
+
+    Tier 1 is an in-process LRU with a short TTL (no I/O at all); tier 2 is
+    Redis with a longer TTL, shared by every worker. A miss in both runs the
+    loader once per customer even under concurrent requests, and fills both
+    tiers. invalidate() drops the customer from this worker's LRU and from
+    Redis; other workers' LRU entries age out within local_ttl.
+
+    invalidate() also bumps a per-customer generation key in Redis, and a
+    load only writes its snapshot back if the generation is unchanged, so a
+    slow load on one worker cannot re-cache data another worker invalidated.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        local_ttl: float = 30.0,
+        redis_ttl: int = 300,
+        key_prefix: str = "snapshot:",
+        generation_prefix: str = "snapshot_gen:"
+    ):
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.key_prefix = key_prefix
+        self.generation_prefix = generation_prefix
+        self._scripts: Dict[str, Any] = {}
+        self._script_client = None
+        self._local: "OrderedDict[str, Tuple[float, Snapshot]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        # Invalidation epoch per customer, so a load that raced an ingest is not cached
+        self._epoch = 0
+        self._invalidated: Dict[str, int] = {}
+        self.metrics = {
+            "local_hits": 0, "redis_hits": 0, "misses": 0, "loads": 0,
+            "evictions": 0, "expirations": 0, "invalidations": 0, "redis_errors": 0,
+            "stale_writes_skipped": 0,
+        }
+
+    def _key(self, customer_id: str) -> str:
+        return f"{self.key_prefix}{customer_id}"
+
+    def _generation_key(self, customer_id: str) -> str:
+        return f"{self.generation_prefix}{customer_id}"
+
+    def _script(self, redis_client, source: str):
+        if self._script_client is not redis_client:
+            self._scripts = {}
+            self._script_client = redis_client
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = redis_client.register_script(source)
+        return script
+
+    # -------------------------
+    # Local tier
+    # -------------------------
+    def _get_local(self, customer_id: str) -> Optional[Snapshot]:
+        entry = self._local.get(customer_id)
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at <= time.monotonic():
+            del self._local[customer_id]
+            self.metrics["expirations"] += 1
+            return None
+        self._local.move_to_end(customer_id)
+        return snapshot
+
+    def _put_local(self, customer_id: str, snapshot: Snapshot):
+        self._local[customer_id] = (time.monotonic() + self.local_ttl, snapshot)
+        self._local.move_to_end(customer_id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    # -------------------------
+    # Read path
+    # -------------------------
+    async def get(self, customer_id: str, loader: Callable[[], Awaitable[Snapshot]]) -> Snapshot:
+        snapshot = self._get_local(customer_id)
+        if snapshot is not None:
+            self.metrics["local_hits"] += 1
+            return snapshot
+
+        pending = self._loading.get(customer_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[customer_id] = future
+        try:
+            snapshot = await self._fetch(customer_id, loader)
+            future.set_result(snapshot)
+            return snapshot
+        except asyncio.CancelledError:
+            # Waiters run in other requests; they get an ordinary error their
+            # fallback handles instead of a CancelledError that is not theirs.
+            future.set_exception(TimeoutError(f"Snapshot load for {customer_id} was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved; waiters still get it re-raised
+            raise
+        finally:
+            del self._loading[customer_id]
+            if not self._loading:
+                self._invalidated.clear()
+
+    async def _fetch(self, customer_id: str, loader: Callable[[], Awaitable[Snapshot]]) -> Snapshot:
+        started_epoch = self._epoch
+        raw = generation = None
+        try:
+            redis_client = await get_redis_client()
+            raw, generation = await redis_client.mget(self._key(customer_id), self._generation_key(customer_id))
+        except Exception as e:
+            self.metrics["redis_errors"] += 1
+            print(f"[SnapshotCache] redis read failed: {e}")
+
+        if raw:
+            self.metrics["redis_hits"] += 1
+            snapshot = json.loads(raw)
+            if self._invalidated.get(customer_id, -1) <= started_epoch:
+                self._put_local(customer_id, snapshot)
+            return snapshot
+
+        self.metrics["misses"] += 1
+        self.metrics["loads"] += 1
+        snapshot = await loader()
+        if self._invalidated.get(customer_id, -1) > started_epoch:
+            return snapshot  # ingested while loading; serve it but don't cache it
+
+        self._put_local(customer_id, snapshot)
+        try:
+            redis_client = await get_redis_client()
+            written = await self._script(redis_client, SET_IF_GENERATION_LUA)(
+                keys=[self._key(customer_id), self._generation_key(customer_id)],
+                args=[generation or "0", json.dumps(snapshot, default=str), self.redis_ttl],
+            )
+            if not written:
+                # Another worker invalidated mid-load; our LRU copy still ages out within local_ttl
+                self.metrics["stale_writes_skipped"] += 1
+        except Exception as e:
+            self.metrics["redis_errors"] += 1
+            print(f"[SnapshotCache] redis write failed: {e}")
+        return snapshot
+
+    # -------------------------
+    # Invalidation
+    # -------------------------
+    async def invalidate(self, customer_ids: Iterable[str]):
+        customer_ids = {str(c) for c in customer_ids if c}
+        if not customer_ids:
+            return
+        self._epoch += 1
+        for customer_id in customer_ids:
+            self._local.pop(customer_id, None)
+            if self._loading:
+                self._invalidated[customer_id] = self._epoch
+        self.metrics["invalidations"] += len(customer_ids)
+        keys = []
+        for customer_id in customer_ids:
+            keys += [self._key(customer_id), self._generation_key(customer_id)]
+        try:
+            redis_client = await get_redis_client()
+            # Generations outlive any in-flight load by a wide margin, then lapse
+            await self._script(redis_client, INVALIDATE_LUA)(keys=keys, args=[self.redis_ttl * 2])
+        except Exception as e:
+            self.metrics["redis_errors"] += 1
+            print(f"[SnapshotCache] redis invalidate failed: {e}")
+
+    def clear(self):
+        self._local.clear()
+
+    def get_status(self) -> dict:
+        lookups = self.metrics["local_hits"] + self.metrics["redis_hits"] + self.metrics["misses"]
+        hits = self.metrics["local_hits"] + self.metrics["redis_hits"]
+        return {
+            "entries": len(self._local),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            **self.metrics,
+        }
+
+
+snapshot_cache = CustomerSnapshotCache(
+    max_entries=settings.snapshot_max_entries,
+    local_ttl=settings.snapshot_local_ttl_seconds,
+    redis_ttl=settings.snapshot_redis_ttl_seconds,
+)
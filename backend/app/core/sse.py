@@ -47,35 +47,314 @@
 
 # app/core/sse.py
 from fastapi.responses import StreamingResponse
+from collections import deque
 import asyncio
-from typing import Any, Dict, List, AsyncGenerator
+import json
+from typing import Any, AsyncGenerator, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.event_bus import BusEvent, RedisEventBus
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "coalesce")
+
+
+def _id_key(event_id: str) -> Tuple[int, ...]:
+    """Sortable form of local ("42") and Redis Stream ("1700000000000-0") ids"""
+    return tuple(int(part) for part in str(event_id).split("-"))
+
+
+class Subscriber:
+    """
+    One connected client: a bounded buffer of pre-rendered frames plus the
+    filters chosen at subscribe time.
+
+    When the buffer is full:
+    - drop_oldest: discard the oldest queued frame
+    - drop_newest: discard the incoming frame
+    - coalesce: replace the queued frame with the same (type, customer_id),
+      otherwise discard the oldest
+    """
+    __slots__ = (
+        "types", "customer_id", "policy", "max_queue", "buffer", "wakeup", "dropped",
+        "replayed", "replay_mark",
+    )
+
+    def __init__(self, types: Optional[Set[str]], customer_id: Optional[str], policy: str, max_queue: int):
+        self.types = types
+        self.customer_id = customer_id
+        self.policy = policy
+        self.max_queue = max_queue
+        self.buffer: Deque[Tuple[Tuple[str, Any], str, str]] = deque()  # (coalesce key, event id, frame)
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+        # Ids put in the buffer by a Last-Event-ID replay, and the newest of them;
+        # live copies of these may follow and are sent only once
+        self.replayed: Set[str] = set()
+        self.replay_mark: Optional[Tuple[int, ...]] = None
+
+    def wants(self, event_type: str, customer_id: Any) -> bool:
+        if self.types is not None and event_type not in self.types:
+            return False
+        # Events without a customer (system, eval, ...) go to everyone
+        return self.customer_id is None or customer_id is None or customer_id == self.customer_id
+
+    def offer(self, key: Tuple[str, Any], event_id: str, frame: str) -> bool:
+        """Queue a frame; False if the frame itself was dropped"""
+        if len(self.buffer) >= self.max_queue:
+            self.dropped += 1
+            if self.policy == "drop_newest":
+                return False
+            if self.policy == "coalesce":
+                for i, (queued_key, _, _) in enumerate(self.buffer):
+                    if queued_key == key:
+                        self.buffer[i] = (key, event_id, frame)
+                        self.wakeup.set()
+                        return True
+            self.buffer.popleft()
+        self.buffer.append((key, event_id, frame))
+        self.wakeup.set()
+        return True
+
 
 class SSEManager:
-    def __init__(self):
-        self._subscribers: List[asyncio.Queue] = []
+    """
+    SSE broker. Each event is rendered to a JSON frame once and shared by
+    every matching subscriber; subscribers have bounded buffers with an
+    overflow policy and receive keepalive comments while idle.
+
+    publish() only appends to an in-process ring buffer (O(1), thread-safe)
+    and wakes a background dispatcher, so request latency never includes
+    dispatch. The dispatcher drains the ring in batches, drops exact
+    duplicates within a batch and hands the rest on.
+
+    Once start() has connected the Redis event bus, batches go through the
+    shared stream (one pipelined round trip) and every worker fans out what
+    it reads back, so clients see events from all workers and can resume
+    with Last-Event-ID. Without Redis it falls back to process-local fan-out.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 100,
+        overflow_policy: str = "drop_oldest",
+        heartbeat_seconds: float = 15.0,
+        bus: Optional[RedisEventBus] = None,
+        ring_size: int = 10_000,
+        batch_size: int = 256
+    ):
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: List[Subscriber] = []
+        self._next_id = 0
+        self.bus = bus
+        self.batch_size = batch_size
+        self._ring: Deque[Tuple[str, Dict[str, Any]]] = deque(maxlen=ring_size)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.metrics = {
+            "enqueued": 0, "ring_dropped": 0, "deduplicated": 0, "batches": 0, "dispatch_errors": 0,
+            "delivered": 0, "dropped": 0, "filtered": 0, "replayed": 0,
+        }
+
+    async def start(self):
+        self._ensure_dispatcher()
+        if self.bus is None:
+            return
+        try:
+            await self.bus.start(self._fan_out)
+        except Exception as e:
+            print(f"[SSE] Redis event bus unavailable, using local fan-out: {e}")
+
+    async def stop(self):
+        await self.flush()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self.bus is not None:
+            await self.bus.stop()
 
-    async def subscribe(self) -> StreamingResponse:
-        queue = asyncio.Queue()
-        self._subscribers.append(queue)
+    @staticmethod
+    def _render(event_id: str, event_type: str, data: str) -> str:
+        return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+    async def subscribe(
+        self,
+        types: Optional[Iterable[str]] = None,
+        customer_id: Optional[str] = None,
+        policy: Optional[str] = None,
+        last_event_id: Optional[str] = None
+    ) -> StreamingResponse:
+        policy = policy or self.overflow_policy
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+
+        subscriber = Subscriber(set(types) if types else None, customer_id, policy, self.max_queue)
+        self._subscribers.append(subscriber)
+        if last_event_id and self.bus is not None and self.bus.running:
+            await self._replay(subscriber, last_event_id)
 
         async def event_generator() -> AsyncGenerator[str, None]:
+            sent_replayed: Set[str] = set()
             try:
                 while True:
-                    data = await queue.get()
-                    yield f"event: {data.get('type', 'message')}\ndata: {data}\n\n"
-            except asyncio.CancelledError:
-                self._subscribers.remove(queue)
-                raise
+                    if not subscriber.buffer:
+                        subscriber.wakeup.clear()
+                        try:
+                            await asyncio.wait_for(subscriber.wakeup.wait(), timeout=self.heartbeat_seconds)
+                        except asyncio.TimeoutError:
+                            yield ": keepalive\n\n"
+                            continue
+                    while subscriber.buffer:
+                        _, event_id, frame = subscriber.buffer.popleft()
+                        # Replayed and live frames can overlap; send each replayed id once.
+                        # Only the overlap is checked: coalesce rewrites frames in place,
+                        # so the buffer as a whole is not in id order.
+                        if subscriber.replay_mark is not None:
+                            if _id_key(event_id) > subscriber.replay_mark:
+                                subscriber.replay_mark = None
+                                subscriber.replayed.clear()
+                            elif event_id in subscriber.replayed:
+                                if event_id in sent_replayed:
+                                    continue
+                                sent_replayed.add(event_id)
+                        yield frame
+            finally:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
 
-        return StreamingResponse(event_generator(), media_type="text/event-stream")
+        return StreamingResponse(
+            event_generator(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
 
+    async def _replay(self, subscriber: Subscriber, last_event_id: str):
+        """Put the events missed since last_event_id ahead of anything already queued"""
+        try:
+            missed = await self.bus.replay(last_event_id, self.max_queue)
+        except Exception as e:
+            print(f"[SSE] replay failed: {e}")
+            return
+        frames = [
+            ((event_type, customer_id), event_id, self._render(event_id, event_type, data))
+            for event_id, event_type, customer_id, data in missed
+            if subscriber.wants(event_type, customer_id)
+        ]
+        self.metrics["replayed"] += len(frames)
+        if frames:
+            subscriber.replayed = {event_id for _, event_id, _ in frames}
+            subscriber.replay_mark = max(_id_key(event_id) for event_id in subscriber.replayed)
+        subscriber.buffer.extendleft(reversed(frames))
+        while len(subscriber.buffer) > subscriber.max_queue:
+            subscriber.buffer.popleft()
+        subscriber.wakeup.set()
+
+    # -------------------------
+    # Publishing pipeline
+    # -------------------------
     def publish(self, data: Dict[str, Any], type: str = "message"):
-        payload = {"type": type, **data}
-        for queue in list(self._subscribers):
+        """Enqueue an event; never blocks and is safe to call from worker threads."""
+        if len(self._ring) == self._ring.maxlen:
+            self.metrics["ring_dropped"] += 1  # the deque evicts the oldest event
+        self._ring.append((type, {"type": type, **data}))
+        self.metrics["enqueued"] += 1
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on the event loop thread (asyncio.to_thread, scripts)
+            if self._loop is not None and self._loop.is_running():
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            else:
+                self._dispatch_local(self._take_batch(len(self._ring)))
+            return
+
+        self._ensure_dispatcher()
+        self._wakeup.set()
+
+    def _ensure_dispatcher(self):
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch_loop())
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Dispatch everything enqueued so far."""
+        while self._ring:
+            await self._dispatch(self._take_batch(self.batch_size))
+
+    def _take_batch(self, size: int) -> List[BusEvent]:
+        """Pop up to size events, serialize each once and drop exact duplicates."""
+        batch: List[BusEvent] = []
+        seen: Set[Tuple[str, str]] = set()
+        while self._ring and len(batch) < size:
+            event_type, payload = self._ring.popleft()
+            encoded = json.dumps(payload, default=str, separators=(",", ":"))
+            if (event_type, encoded) in seen:
+                self.metrics["deduplicated"] += 1
+                continue
+            seen.add((event_type, encoded))
+            customer_id = payload.get("customer_id")
+            batch.append(("", event_type, str(customer_id) if customer_id is not None else None, encoded))
+        self.metrics["batches"] += 1
+        return batch
+
+    async def _dispatch(self, batch: List[BusEvent]):
+        if self.bus is not None and self.bus.running:
             try:
-                queue.put_nowait(payload)
-            except asyncio.QueueFull:
-                self._subscribers.remove(queue)
+                # Delivered to local subscribers when the bus reads them back
+                await self.bus.append_many([(event_type, customer_id, data) for _, event_type, customer_id, data in batch])
+                return
+            except Exception as e:
+                self.metrics["dispatch_errors"] += 1
+                print(f"[SSE] bus append failed, delivering locally: {e}")
+        self._dispatch_local(batch)
+
+    def _dispatch_local(self, batch: List[BusEvent]):
+        for _, event_type, customer_id, data in batch:
+            self._next_id += 1
+            self._fan_out((str(self._next_id), event_type, customer_id, data))
+
+    def _fan_out(self, event: BusEvent):
+        event_id, event_type, customer_id, data = event
+        frame = None
+        for subscriber in list(self._subscribers):
+            if not subscriber.wants(event_type, customer_id):
+                self.metrics["filtered"] += 1
+                continue
+            if frame is None:
+                # Render once, only if someone is listening
+                frame = self._render(event_id, event_type, data)
+            dropped_before = subscriber.dropped
+            if subscriber.offer((event_type, customer_id), event_id, frame):
+                self.metrics["delivered"] += 1
+            self.metrics["dropped"] += subscriber.dropped - dropped_before
+
+    def get_status(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "queued": sum(len(s.buffer) for s in self._subscribers),
+            "bus": self.bus.get_status() if self.bus is not None else None,
+            **self.metrics,
+        }
+
 
-# Singleton
-sse = SSEManager()
+sse = SSEManager(
+    max_queue=settings.sse_queue_size,
+    overflow_policy=settings.sse_overflow_policy,
+    heartbeat_seconds=settings.sse_heartbeat_seconds,
+    bus=RedisEventBus(
+        stream=settings.sse_redis_stream,
+        maxlen=settings.sse_stream_maxlen,
+    ) if settings.sse_redis_enabled else None,
+    ring_size=settings.sse_ring_size,
+    batch_size=settings.sse_batch_size,
+)
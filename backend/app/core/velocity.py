@@ -0,0 +1,200 @@
+# app/core/velocity.py
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+# window name -> (bucket width in seconds, number of buckets)
+WINDOWS: Dict[str, Tuple[int, int]] = {
+    "1m": (1, 60),
+    "1h": (60, 60),
+    "24h": (3600, 24),
+}
+ENTITY_KINDS = ("customer", "card", "device")
+
+
+def epoch_seconds(ts: Any) -> float:
+    if ts is None:
+        return time.time()
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if isinstance(ts, datetime):
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return ts.timestamp()
+    return float(ts)
+
+
+def _field(txn: Any, *names: str) -> Any:
+    for name in names:
+        value = txn.get(name) if isinstance(txn, dict) else getattr(txn, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+class RingWindow:
+    """
+    Sliding window of fixed-width buckets with a running count and sum.
+    Buckets that fall out of the window are subtracted as time advances,
+    so add() and totals() touch at most `size` buckets and usually one.
+    """
+    __slots__ = ("width", "size", "counts", "sums", "head", "count", "total")
+
+    def __init__(self, width: int, size: int):
+        self.width = width
+        self.size = size
+        self.counts = [0] * size
+        self.sums = [0.0] * size
+        self.head = -1  # absolute index of the newest bucket
+        self.count = 0
+        self.total = 0.0
+
+    def _advance(self, slot: int):
+        if slot <= self.head:
+            return
+        if self.head < 0 or slot - self.head >= self.size:
+            self.counts = [0] * self.size
+            self.sums = [0.0] * self.size
+            self.count = 0
+            self.total = 0.0
+        else:
+            for expired in range(self.head + 1, slot + 1):
+                i = expired % self.size
+                self.count -= self.counts[i]
+                self.total -= self.sums[i]
+                self.counts[i] = 0
+                self.sums[i] = 0.0
+        self.head = slot
+
+    def add(self, ts: float, amount: float):
+        slot = int(ts // self.width)
+        self._advance(slot)
+        if slot <= self.head - self.size:
+            return  # older than the window, nothing to count
+        i = slot % self.size
+        self.counts[i] += 1
+        self.sums[i] += amount
+        self.count += 1
+        self.total += amount
+
+    def totals(self, now: float) -> Tuple[int, float]:
+        self._advance(int(now // self.width))
+        return self.count, round(self.total, 2)
+
+
+class EntityState:
+    __slots__ = ("windows", "last_seen")
+
+    def __init__(self):
+        self.windows = {name: RingWindow(width, size) for name, (width, size) in WINDOWS.items()}
+        self.last_seen = 0.0
+
+
+class VelocityFeatureEngine:
+    """
+    Real-time count/sum features over 1m, 1h and 24h per customer, card and
+    device. Bounded by an LRU of entities; entities idle for longer than
+    the largest window are dropped since all their counters are zero.
+    """
+
+    def __init__(self, max_entities: int = 100_000, idle_seconds: int = 86_400):
+        self.max_entities = max_entities
+        self.idle_seconds = idle_seconds
+        self._entities: "OrderedDict[Tuple[str, str], EntityState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {"events": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    # ------------------------------
+    # Write path
+    # ------------------------------
+    def record(
+        self,
+        customer_id: str,
+        amount: float,
+        timestamp: Any = None,
+        card_id: Optional[str] = None,
+        device_id: Optional[str] = None,
+    ):
+        ts = epoch_seconds(timestamp)
+        with self._lock:
+            for kind, entity_id in (("customer", customer_id), ("card", card_id), ("device", device_id)):
+                if entity_id is None:
+                    continue
+                state = self._entities.get((kind, entity_id))
+                if state is None:
+                    state = self._entities[(kind, entity_id)] = EntityState()
+                else:
+                    self._entities.move_to_end((kind, entity_id))
+                for window in state.windows.values():
+                    window.add(ts, amount)
+                state.last_seen = max(state.last_seen, ts)
+            self.metrics["events"] += 1
+            self._evict(ts)
+
+    def record_many(self, txns: Iterable[Any]):
+        """Feed ORM rows, schemas or dicts (as produced by the ingest paths)."""
+        for txn in txns:
+            self.record(
+                _field(txn, "customer_id", "customerId"),
+                _field(txn, "amount") or 0.0,
+                _field(txn, "timestamp"),
+                card_id=_field(txn, "card_id", "cardId"),
+                device_id=_field(txn, "device_id", "deviceId"),
+            )
+
+    def _evict(self, now: float):
+        # Oldest entries sit at the front of the LRU
+        while self._entities:
+            key, state = next(iter(self._entities.items()))
+            if len(self._entities) <= self.max_entities and now - state.last_seen <= self.idle_seconds:
+                break
+            del self._entities[key]
+            self.metrics["evictions"] += 1
+
+    # ------------------------------
+    # Read path
+    # ------------------------------
+    def features(self, kind: str, entity_id: Optional[str], now: Any = None) -> Optional[Dict[str, Dict[str, float]]]:
+        """{"1m": {"count", "sum"}, "1h": ..., "24h": ...} or None when unknown."""
+        if entity_id is None:
+            return None
+        ts = epoch_seconds(now)
+        with self._lock:
+            state = self._entities.get((kind, entity_id))
+            if state is None:
+                self.metrics["misses"] += 1
+                return None
+            self.metrics["hits"] += 1
+            result = {}
+            for name, window in state.windows.items():
+                count, total = window.totals(ts)
+                result[name] = {"count": count, "sum": total}
+            return result
+
+    def get_status(self) -> dict:
+        with self._lock:
+            by_kind = {kind: 0 for kind in ENTITY_KINDS}
+            for kind, _ in self._entities:
+                by_kind[kind] += 1
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                "entities": len(self._entities),
+                "by_kind": by_kind,
+                "max_entities": self.max_entities,
+                "hit_rate": round(self.metrics["hits"] / lookups, 3) if lookups else None,
+                **self.metrics,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entities.clear()
+
+
+velocity_engine = VelocityFeatureEngine(
+    max_entities=settings.velocity_max_entities,
+    idle_seconds=settings.velocity_idle_seconds,
+)
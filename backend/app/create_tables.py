@@ -23,6 +23,7 @@ from app.models.fraud_alert import FraudAlert as _
 from app.models.insights import Insight as _
 from app.models.eval import EvalCase as _, EvalResult as _
 from app.models.kb import KBEntry as _
+from app.models.spend_aggregate import CustomerSpendAggregate as _
 # -----------------------------
 # Create all tables
 # -----------------------------
@@ -11,6 +11,8 @@ from app.api import (
     monitoring_router
 )
 from app.core.rate_limiter import rate_limit 
+from app.core.database import async_engine, partition_manager
+from app.core.sse import sse
 
 app = FastAPI(title=settings.app_name, debug=settings.debug)
 
@@ -39,6 +41,22 @@ app.include_router(kb_router.router, prefix="/kb", tags=["Knowledge Base"])
 app.include_router(eval_router.router, prefix="/evals", tags=["Evaluations"])
 app.include_router(monitoring_router.router, tags=["Monitoring"])
 
+# --- Background jobs ---
+@app.on_event("startup")
+async def startup():
+    # Pre-create upcoming monthly partitions off the write path
+    await partition_manager.start(["transactions"])
+    # Cross-worker SSE fan-out over Redis Streams
+    await sse.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await partition_manager.stop()
+    await sse.stop()
+    await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     return {
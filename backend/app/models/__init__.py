@@ -9,3 +9,6 @@ from .fraud_alert import *
 from .insights import *
 from .eval import *
 from .kb import *
+from .spend_aggregate import *
+from .fraud_metrics import *
+from .reason_code import *
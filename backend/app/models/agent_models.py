@@ -1,14 +1,20 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from app.core.database import Base
+from app.core.reasons import reason_codes
 
 class FraudAssessment(BaseModel):
     risk_score: float
-    reasons: List[str]
+    reason_codes: List[int]
     signals: Dict[str, float]
     timestamp: datetime = None
 
+    @computed_field
+    @property
+    def reasons(self) -> List[str]:
+        return reason_codes.texts(self.reason_codes)
+
 class RiskDecision(BaseModel):
     decision: str  # "approve", "verify", "review", "block"
     confidence: float
@@ -26,8 +26,9 @@
 
 
 from sqlalchemy import Column, String, Float, DateTime, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.core.database import Base
+from app.core.reasons import canonical_reasons, is_codes
 from datetime import datetime
 
 class FraudAlert(Base):
@@ -44,3 +45,8 @@ class FraudAlert(Base):
     # Relationships
     customer = relationship("Customer", back_populates="fraud_alerts")
     transaction = relationship("Transaction", primaryjoin="Transaction.txn_id==FraudAlert.txn_id", viewonly=True)
+
+    @validates("reasons")
+    def _canonical_reasons(self, key, value):
+        # Reason codes are stored as-is; text (pre-backfill writers) is kept canonical
+        return value if is_codes(value) else canonical_reasons(value)
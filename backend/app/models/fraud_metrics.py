@@ -0,0 +1,24 @@
+from sqlalchemy import Boolean, Column, String, Float, Integer, DateTime
+from app.core.database import Base
+from datetime import datetime
+
+class CustomerFraudMetrics(Base):
+    """
+    One row of running fraud counters per customer, maintained as
+    transactions and alerts are written. dirty rows are recomputed from
+    the source tables on the next read; version is bumped by every write
+    so a recompute that raced one does not clear dirty.
+    """
+    __tablename__ = "customer_fraud_metrics"
+
+    customer_id = Column(String, primary_key=True)
+    total_spend = Column(Float, nullable=False, default=0.0)
+    alert_count = Column(Integer, nullable=False, default=0)
+    high_risk_alerts = Column(Integer, nullable=False, default=0)
+    pending_alerts = Column(Integer, nullable=False, default=0)
+    dirty = Column(Boolean, nullable=False, default=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CustomerFraudMetrics(customer_id={self.customer_id}, alerts={self.alert_count}, dirty={self.dirty})>"
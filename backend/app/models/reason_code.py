@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Identity, Integer, String
+from app.core.database import Base
+from app.core.reasons import FIRST_DYNAMIC_CODE
+
+class FraudReasonCode(Base):
+    """
+    Interned alert reason text. fraud_alerts.reasons holds these codes;
+    codes below FIRST_DYNAMIC_CODE are the built-ins from app.core.reasons.
+    """
+    __tablename__ = "fraud_reason_codes"
+
+    code = Column(Integer, Identity(start=FIRST_DYNAMIC_CODE), primary_key=True)
+    text = Column(String, nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<FraudReasonCode(code={self.code}, text={self.text!r})>"
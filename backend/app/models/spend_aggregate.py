@@ -0,0 +1,22 @@
+# app/models/spend_aggregate.py
+from sqlalchemy import Column, String, Float, Integer, DateTime
+from app.core.database import Base
+from datetime import datetime
+
+class CustomerSpendAggregate(Base):
+    """
+    Running spend totals per customer x category and customer x merchant,
+    maintained at ingest time. month = YYYYMM, or 0 for the all-time total.
+    """
+    __tablename__ = "customer_spend_aggregates"
+
+    customer_id = Column(String, primary_key=True)
+    dimension = Column(String, primary_key=True)  # "category" | "merchant"
+    key = Column(String, primary_key=True)
+    month = Column(Integer, primary_key=True, default=0)
+    total = Column(Float, nullable=False, default=0.0)
+    txn_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CustomerSpendAggregate(customer_id={self.customer_id}, {self.dimension}={self.key}, total={self.total})>"
@@ -93,7 +93,7 @@
 #         return f"<Transaction(customer_id={self.customer_id}, txn_id={self.txn_id}, amount={self.amount})>"
 
 
-from sqlalchemy import Column, String, Float, DateTime, Index
+from sqlalchemy import Column, String, Float, DateTime, Index, JSON, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -103,6 +103,12 @@ class Transaction(Base):
     __table_args__ = (
         Index("idx_transactions_customer_id", "customer_id"),
         Index("idx_transactions_txn_id", "txn_id", "timestamp"),
+        # Per-customer listing, newest first; id breaks timestamp ties for keyset
+        # paging and the INCLUDE columns let the page be read from the index alone
+        Index(
+            "idx_transactions_customer_ts", "customer_id", text("timestamp DESC"), text("id DESC"),
+            postgresql_include=["txn_id", "merchant", "category", "amount", "currency", "mcc"]
+        ),
         {"postgresql_partition_by": "RANGE (timestamp)"}
     )
 
@@ -115,6 +121,7 @@ class Transaction(Base):
     currency = Column(String, default="USD", nullable=False)
     mcc = Column(String, nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
+    details = Column(JSON, nullable=True)  # ingest risk_level / fallbackUsed / duplicate_detected
 
     # Relationships
     customer = relationship("Customer", back_populates="transactions")
@@ -0,0 +1,30 @@
+# app/rebuild_spend_aggregates.py
+"""
+Backfill or rebuild customer spend aggregates from the transactions table.
+
+    python -m app.rebuild_spend_aggregates                    # rebuild everyone
+    python -m app.rebuild_spend_aggregates --customer-id c1   # rebuild one customer
+    python -m app.rebuild_spend_aggregates --backfill         # only customers with no aggregates yet
+"""
+import argparse
+from app.core.database import SessionLocal
+from app.services.spend_aggregate_service import SpendAggregateService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customer-id", help="Only rebuild this customer")
+    parser.add_argument("--backfill", action="store_true", help="Only fill customers missing aggregates")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        written = SpendAggregateService.rebuild(db, customer_id=args.customer_id, only_missing=args.backfill)
+    finally:
+        db.close()
+
+    print(f"✅ Wrote {written} spend aggregate rows")
+
+
+if __name__ == "__main__":
+    main()
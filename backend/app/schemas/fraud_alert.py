@@ -39,9 +39,10 @@
 
 
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, computed_field
 from typing import List, Optional
 from datetime import datetime
+from app.core.reasons import reason_codes
 
 class FraudAlertCreate(BaseModel):
     customer_id: str
@@ -56,10 +57,35 @@ class FraudAlertRead(BaseModel):
     customer_id: str
     txn_id: Optional[str] = None
     score: float
-    reasons: List[str] = Field(default_factory=list)  # default empty list
+    reason_codes: List[int] = Field(default_factory=list)  # default empty list
     action_taken: Optional[str] = None
     timestamp: datetime
+    # Text of a legacy row the backfill has not converted yet (reads never intern it)
+    _legacy_reasons: Optional[List[str]] = PrivateAttr(default=None)
+
+    @computed_field
+    @property
+    def reasons(self) -> List[str]:
+        # Expanded only when the alert is serialized for a response
+        if self._legacy_reasons is not None:
+            return self._legacy_reasons
+        return reason_codes.texts(self.reason_codes)
 
     model_config = {
         "from_attributes": True  # enables ORM-like parsing in Pydantic v2
     }
+
+class FraudAlertResponse(BaseModel):
+    """
+    FraudAlertRead as returned by the API after redaction. reasons is a plain
+    field here, so response validation keeps the redacted text instead of
+    expanding reason_codes again.
+    """
+    id: str
+    customer_id: str
+    txn_id: Optional[str] = None
+    score: float
+    reason_codes: List[int] = Field(default_factory=list)
+    reasons: List[str] = Field(default_factory=list)
+    action_taken: Optional[str] = None
+    timestamp: datetime
@@ -25,3 +25,4 @@ class KBSearchResult(BaseModel):
     title: str
     snippet: str
     anchors: Optional[List[str]] = None
+    score: Optional[float] = None
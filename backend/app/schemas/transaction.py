@@ -57,7 +57,7 @@
 
 # app/schemas/transaction.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class TransactionCreate(BaseModel):
@@ -101,3 +101,14 @@ class TransactionRead(BaseModel):
 
 # Alias used for ingestion endpoints
 TransactionIngest = TransactionCreate
+
+class CSVRowError(BaseModel):
+    line: int  # 1-based line number in the uploaded file
+    error: str
+
+class TransactionIngestSummary(BaseModel):
+    accepted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    batches: int = 0
+    errors: List[CSVRowError] = Field(default_factory=list)
@@ -7,6 +7,7 @@ from app.core.redactor import Redactor
 from app.core.sse import sse
 from app.services.kb_service import KBService
 from app.services.risk_service import RiskService
+from app.services.customer_snapshot_service import CustomerSnapshotService, DISPUTE_ACTION
 from datetime import datetime
 import uuid
 import asyncio
@@ -51,9 +52,12 @@ class ActionService:
             return ActionRead.from_orm(action)
 
         created = await asyncio.to_thread(_create)
+        if created.action_type == DISPUTE_ACTION:
+            # Disputes feed the customer's chargeback count
+            await CustomerSnapshotService.invalidate([created.customer_id])
 
         # SSE publish
-        await sse.publish(
+        sse.publish(
             {"event": "action_created", "action": created.dict()},
             type="action_created"
         )
@@ -128,7 +132,7 @@ class ActionService:
             fallback_used = True
             risk_level = "medium"
             reason += " (risk_unavailable, fallback applied)"
-            await sse.publish(
+            sse.publish(
                 {
                     "event": "fallback_triggered",
                     "customer_id": customer_id,
@@ -188,7 +192,7 @@ class ActionService:
 
         # SSE publish verification result
         event_type = "otp_verified" if verified else "otp_failed"
-        await sse.publish(
+        sse.publish(
             {
                 "event": event_type,
                 "customer_id": customer_id,
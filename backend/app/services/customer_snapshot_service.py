@@ -0,0 +1,75 @@
+# app/services/customer_snapshot_service.py
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.snapshot_cache import Snapshot, snapshot_cache
+from app.models.action import Action
+from app.models.transaction import Transaction
+from typing import Iterable
+
+DISPUTE_ACTION = "open_dispute"
+
+
+def _risk_level(chargeback_count: int) -> str:
+    if chargeback_count >= 2:
+        return "high"
+    return "medium" if chargeback_count == 1 else "low"
+
+
+class CustomerSnapshotService:
+    """
+    Feature snapshot per customer (profile, recent transactions, devices,
+    chargeback count) for the fraud pipeline, served from snapshot_cache.
+    Ingest and dispute paths call invalidate() for the customers they touch.
+    """
+
+    @staticmethod
+    async def get(customer_id: str) -> Snapshot:
+        return await snapshot_cache.get(customer_id, lambda: CustomerSnapshotService.load(customer_id))
+
+    @staticmethod
+    async def invalidate(customer_ids: Iterable[str]):
+        await snapshot_cache.invalidate(customer_ids)
+
+    @staticmethod
+    async def load(customer_id: str) -> Snapshot:
+        async with AsyncSessionLocal() as db:
+            total, avg_amount = (await db.execute(
+                select(func.count(), func.coalesce(func.avg(func.abs(Transaction.amount)), 0.0))
+                .where(Transaction.customer_id == customer_id)
+            )).one()
+            recent = (await db.execute(
+                select(Transaction.txn_id, Transaction.amount, Transaction.merchant,
+                       Transaction.category, Transaction.mcc, Transaction.timestamp)
+                .where(Transaction.customer_id == customer_id)
+                .order_by(Transaction.timestamp.desc())
+                .limit(settings.snapshot_recent_limit)
+            )).all()
+            chargeback_count = (await db.execute(
+                select(func.count())
+                .select_from(Action)
+                .where(Action.customer_id == customer_id, Action.action_type == DISPUTE_ACTION)
+            )).scalar_one()
+
+        return {
+            "profile": {
+                "customer_id": customer_id,
+                "risk_level": _risk_level(chargeback_count),
+                "total_transactions": total,
+                "chargeback_count": chargeback_count,
+                # Transactions don't record a device yet; filled once ingest carries one
+                "devices": [],
+                "avg_transaction_amount": round(float(avg_amount), 2),
+            },
+            "recent_transactions": [
+                {
+                    "id": row.txn_id,
+                    "amount": row.amount,
+                    "merchant": row.merchant,
+                    "category": row.category,
+                    "mcc": row.mcc,
+                    "timestamp": row.timestamp.isoformat(),
+                }
+                for row in recent
+            ],
+        }
@@ -43,7 +43,7 @@ class EvalService:
         # 🔔 SSE event for new evaluation result
         try:
             if sse:
-                await sse.publish(
+                sse.publish(
                     {
                         "event": "eval_case_completed",
                         "eval_case_id": result.eval_case_id,
@@ -76,7 +76,7 @@ class EvalService:
         # 🔔 SSE event for metrics update
         try:
             if sse:
-                await sse.publish(
+                sse.publish(
                     {
                         "event": "eval_metrics_updated",
                         "metrics": metrics.dict()
@@ -99,7 +99,7 @@ class EvalService:
         # 🔔 SSE event for results fetch
         try:
             if sse:
-                await sse.publish(
+                sse.publish(
                     {
                         "event": "eval_results_fetched",
                         "count": len(results)
@@ -0,0 +1,79 @@
+# app/services/fraud_batch_service.py
+from app.core.config import settings
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import time
+
+
+class FraudBatchService:
+    """
+    Runs orchestrator.execute_plan over a batch with bounded concurrency.
+    Customer lookups are done once per customer and shared by all of that
+    customer's transactions; results are yielded as they complete.
+    """
+
+    @staticmethod
+    def customer_id_for(transaction: Dict[str, Any]) -> str:
+        return (
+            transaction.get("customerId")
+            or transaction.get("customer_id")
+            or f"test_{transaction.get('id', 'unknown')}"
+        )
+
+    @staticmethod
+    async def iter_results(
+        orchestrator,
+        redactor,
+        transactions: List[Dict[str, Any]],
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        semaphore = asyncio.Semaphore(concurrency or settings.fraud_batch_concurrency)
+        contexts: Dict[str, asyncio.Task] = {}
+
+        def _context_for(customer_id: str) -> asyncio.Task:
+            task = contexts.get(customer_id)
+            if task is None:
+                task = contexts[customer_id] = asyncio.create_task(
+                    orchestrator.load_customer_context(customer_id)
+                )
+            return task
+
+        async def _assess(index: int, transaction: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    customer_id = FraudBatchService.customer_id_for(transaction)
+                    customer_context = await asyncio.shield(_context_for(customer_id))
+                    result = await orchestrator.execute_plan(customer_id, transaction, customer_context)
+                    redacted_resp = await redactor.redact_pii(result)
+                    redacted = redacted_resp.data if hasattr(redacted_resp, "data") else redacted_resp
+
+                    final_action = result.get("final_action", {}) if isinstance(result, dict) else {}
+                    normalized_action = {"action": final_action.get("action", "NO_ACTION"), "reason": final_action.get("reason", "unspecified")}
+
+                    return {
+                        "index": index,
+                        "transaction_id": transaction.get("id"),
+                        "status": "success" if result.get("success") else "error",
+                        "result": {"action": normalized_action, "details": redacted}
+                    }
+                except Exception as e:
+                    return {"index": index, "transaction_id": transaction.get("id"), "status": "error", "error": str(e)}
+
+        tasks = [asyncio.create_task(_assess(i, txn)) for i, txn in enumerate(transactions)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away mid-stream: stop the remaining work
+            for task in tasks + list(contexts.values()):
+                task.cancel()
+
+    @staticmethod
+    def summarize(results: List[Dict[str, Any]], start_time: float) -> Dict[str, Any]:
+        return {
+            "batch_id": f"batch_{int(start_time)}",
+            "processed": len(results),
+            "successful": sum(1 for r in results if r["status"] == "success"),
+            "failed": sum(1 for r in results if r["status"] == "error"),
+            "total_time": time.time() - start_time
+        }
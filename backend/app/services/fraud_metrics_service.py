@@ -0,0 +1,159 @@
+# app/services/fraud_metrics_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from app.core.database import engine
+from app.models.fraud_alert import FraudAlert
+from app.models.fraud_metrics import CustomerFraudMetrics
+from app.models.transaction import Transaction
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+HIGH_RISK_SCORE = 80
+PENDING_ACTION = "pending"
+COUNTERS = ("total_spend", "alert_count", "high_risk_alerts", "pending_alerts")
+
+metrics = {"hits": 0, "recomputes": 0, "recompute_races": 0}
+
+
+def _as_api(values: Dict[str, Any]) -> dict:
+    alert_count = values["alert_count"]
+    return {
+        "totalSpend": float(values["total_spend"] or 0),
+        "highRiskPct": float(values["high_risk_alerts"] / alert_count * 100) if alert_count else 0.0,
+        "disputesOpened": int(values["pending_alerts"] or 0),
+        # fraud_alerts has no resolved_at column, so there is nothing to time yet
+        "avgTriageTime": None,
+    }
+
+
+class FraudMetricsService:
+    """
+    Maintains CustomerFraudMetrics so /fraud/customer-metrics reads one row
+    instead of aggregating every transaction and alert per request.
+    """
+
+    # ------------------------------
+    # Write path (called inside the write transaction, caller commits)
+    # ------------------------------
+    @staticmethod
+    def apply_transactions(db: Session, txns: Iterable[Any]):
+        """Add transactions (ORM rows, TransactionRead or dicts) to total_spend"""
+        deltas: Dict[str, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        for txn in txns:
+            get = txn.get if isinstance(txn, dict) else lambda name: getattr(txn, name)
+            deltas[get("customer_id")]["total_spend"] += get("amount")
+        FraudMetricsService._apply(db, deltas)
+
+    @staticmethod
+    def apply_alert(db: Session, alert: FraudAlert):
+        delta = dict.fromkeys(COUNTERS, 0)
+        delta["alert_count"] = 1
+        delta["high_risk_alerts"] = int(alert.score >= HIGH_RISK_SCORE)
+        delta["pending_alerts"] = int(alert.action_taken == PENDING_ACTION)
+        FraudMetricsService._apply(db, {alert.customer_id: delta})
+
+    @staticmethod
+    def _apply(db: Session, deltas: Dict[str, Dict[str, float]]):
+        """
+        Increment existing rows. A customer without a row gets one holding
+        just this delta, flagged dirty so the first read rebuilds it.
+        """
+        if not deltas:
+            return
+
+        now = datetime.utcnow()
+        rows = [
+            {"customer_id": customer_id, **delta, "dirty": True, "version": 1, "updated_at": now}
+            for customer_id, delta in deltas.items()
+        ]
+
+        if engine.dialect.name == "postgresql":
+            agg = CustomerFraudMetrics
+            stmt = pg_insert(agg).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["customer_id"],
+                set_={
+                    **{name: getattr(agg, name) + getattr(stmt.excluded, name) for name in COUNTERS},
+                    "version": agg.version + 1,
+                    "updated_at": stmt.excluded.updated_at,
+                }
+            )
+            db.execute(stmt)
+        else:
+            for row in rows:
+                agg = db.get(CustomerFraudMetrics, row["customer_id"])
+                if agg:
+                    for name in COUNTERS:
+                        setattr(agg, name, getattr(agg, name) + row[name])
+                    agg.version += 1
+                else:
+                    db.add(CustomerFraudMetrics(**row))
+            db.flush()
+
+    # ------------------------------
+    # Read path
+    # ------------------------------
+    @staticmethod
+    async def get(db: AsyncSession, customer_id: str) -> dict:
+        row = (await db.execute(
+            select(CustomerFraudMetrics).where(CustomerFraudMetrics.customer_id == customer_id)
+        )).scalar_one_or_none()
+        if row is not None and not row.dirty:
+            metrics["hits"] += 1
+            return _as_api({name: getattr(row, name) for name in COUNTERS})
+        return await FraudMetricsService.recompute(db, customer_id, None if row is None else row.version)
+
+    @staticmethod
+    async def recompute(db: AsyncSession, customer_id: str, version: Optional[int] = None) -> dict:
+        """
+        Rebuild one customer's row from transactions and fraud_alerts.
+
+        The row is only marked clean if no write bumped its version while
+        the aggregates ran; otherwise the fresh values are still returned
+        and the row stays dirty for the next read.
+        """
+        metrics["recomputes"] += 1
+        total_spend = (await db.execute(
+            select(func.coalesce(func.sum(Transaction.amount), 0.0))
+            .where(Transaction.customer_id == customer_id)
+        )).scalar_one()
+        alert_count, high_risk_alerts, pending_alerts = (await db.execute(
+            select(
+                func.count(),
+                func.count().filter(FraudAlert.score >= HIGH_RISK_SCORE),
+                func.count().filter(FraudAlert.action_taken == PENDING_ACTION),
+            )
+            .select_from(FraudAlert)
+            .where(FraudAlert.customer_id == customer_id)
+        )).one()
+        values = {
+            "total_spend": float(total_spend),
+            "alert_count": alert_count,
+            "high_risk_alerts": high_risk_alerts,
+            "pending_alerts": pending_alerts,
+        }
+
+        try:
+            if version is None:
+                await db.execute(insert(CustomerFraudMetrics).values(
+                    customer_id=customer_id, **values, dirty=False, version=0, updated_at=datetime.utcnow()
+                ))
+            else:
+                result = await db.execute(
+                    update(CustomerFraudMetrics)
+                    .where(CustomerFraudMetrics.customer_id == customer_id, CustomerFraudMetrics.version == version)
+                    .values(**values, dirty=False, updated_at=datetime.utcnow())
+                )
+                if result.rowcount == 0:
+                    metrics["recompute_races"] += 1
+            await db.commit()
+        except IntegrityError:
+            # A writer created the row first; it is dirty and the next read rebuilds it
+            await db.rollback()
+            metrics["recompute_races"] += 1
+
+        return _as_api(values)
@@ -1,66 +1,87 @@
-import json
 import uuid
 import random
+import time
 import asyncio
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, func, select, update
 from app.models.fraud_alert import FraudAlert
 from app.schemas.fraud_alert import FraudAlertCreate, FraudAlertRead
+from app.core.reasons import canonical_reasons, is_codes, reason_codes
 from app.core.redactor import Redactor
 from app.core.sse import sse  # SSE manager
+from app.services.fraud_metrics_service import FraudMetricsService
+from app.services.reason_code_service import ReasonCodeService
 from app.models.transaction import Transaction  
 
 # In-memory metrics example
-metrics = {"alerts_created_total": 0}
+metrics = {"alerts_created_total": 0, "legacy_reason_reads": 0}
+
+ALERT_READ_COLUMNS = (
+    FraudAlert.id, FraudAlert.customer_id, FraudAlert.txn_id, FraudAlert.score,
+    FraudAlert.reasons, FraudAlert.action_taken, FraudAlert.timestamp,
+)
 
 
 class FraudService:
 
     @staticmethod
-    def normalize_reasons(raw_reasons) -> list[str]:
-        """Convert DB reasons column to list of strings"""
-        if raw_reasons is None:
-            return ["No specific reason provided"]
-        
-        reasons = []
-        
-        if isinstance(raw_reasons, list):
-            for item in raw_reasons:
-                if isinstance(item, dict):
-                    if "reason" in item:
-                        reasons.append(item["reason"])
-                    else:
-                        for value in item.values():
-                            if isinstance(value, str):
-                                reasons.append(value)
-                elif isinstance(item, str):
-                    reasons.append(item)
-        
-        elif isinstance(raw_reasons, dict):
-            if "reason" in raw_reasons:
-                reasons.append(raw_reasons["reason"])
-            else:
-                for value in raw_reasons.values():
-                    if isinstance(value, str):
-                        reasons.append(value)
-        
-        elif isinstance(raw_reasons, str):
-            try:
-                parsed = json.loads(raw_reasons)
-                if isinstance(parsed, list):
-                    for item in parsed:
-                        if isinstance(item, dict) and "reason" in item:
-                            reasons.append(item["reason"])
-                elif isinstance(parsed, dict) and "reason" in parsed:
-                    reasons.append(parsed["reason"])
-            except json.JSONDecodeError:
-                reasons.append(raw_reasons)
-        
-        if not reasons:
-            reasons.append("No specific reason provided")
-        
-        return reasons
+    def read_reason_codes(raw_reasons) -> list[int]:
+        """
+        Stored reasons are reason codes (create_alert interns them on write).
+        Rows the backfill has not reached yet only get codes for text that is
+        already known; reads never intern, that is left to backfill_reasons.
+        """
+        if is_codes(raw_reasons):
+            return raw_reasons
+        metrics["legacy_reason_reads"] += 1
+        codes = (reason_codes.code_for(text) for text in canonical_reasons(raw_reasons))
+        return [code for code in codes if code is not None]
+
+    @staticmethod
+    def read_reason_texts(raw_reasons) -> list[str]:
+        """Display text for stored reasons, codes or legacy text alike"""
+        if is_codes(raw_reasons):
+            return reason_codes.texts(raw_reasons)
+        return canonical_reasons(raw_reasons)
+
+    @staticmethod
+    def backfill_reasons(db: Session, batch_size: int = 1000, pause_seconds: float = 0.0) -> int:
+        """
+        Rewrite legacy reasons rows (text in any shape) into reason codes, one committed
+        batch at a time (keyset on id), so it can run against a live table.
+        Returns the number of rows rewritten.
+        """
+        rewritten = 0
+        last_id = ""
+        while True:
+            rows = db.execute(
+                select(FraudAlert.id, FraudAlert.reasons)
+                .where(FraudAlert.id > last_id)
+                .order_by(FraudAlert.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return rewritten
+            last_id = rows[-1].id
+
+            updates = []
+            for row in rows:
+                codes = ReasonCodeService.encode(row.reasons)
+                if codes != row.reasons:
+                    updates.append({"alert_id": row.id, "reasons": codes})
+            if updates:
+                db.execute(
+                    update(FraudAlert.__table__)
+                    .where(FraudAlert.__table__.c.id == bindparam("alert_id"))
+                    .values(reasons=bindparam("reasons")),
+                    updates
+                )
+                rewritten += len(updates)
+            db.commit()
+            if pause_seconds:
+                time.sleep(pause_seconds)
 
     @staticmethod
     async def create_alert(db: Session, alert_data: FraudAlertCreate) -> FraudAlertRead:
@@ -68,39 +89,31 @@ class FraudService:
             customer_id = Redactor.mask_pii(alert_data.customer_id)
             txn_id = Redactor.mask_pii(alert_data.txn_id) if alert_data.txn_id else None
 
-            db_reasons = []
-            for reason in alert_data.reasons:
-                if reason and reason != "No specific reason provided":
-                    db_reasons.append({"reason": reason})
-            if not db_reasons:
-                db_reasons = [{"reason": "No specific reason provided"}]
-
             alert = FraudAlert(
                 id=str(uuid.uuid4()),
                 customer_id=customer_id,
                 txn_id=txn_id,
                 score=alert_data.score,
-                reasons=db_reasons,
+                reasons=ReasonCodeService.encode(alert_data.reasons),
                 action_taken=alert_data.action_taken,
                 timestamp=alert_data.timestamp or datetime.utcnow()
             )
 
             db.add(alert)
+            FraudMetricsService.apply_alert(db, alert)
             db.commit()
             db.refresh(alert)
             metrics["alerts_created_total"] += 1
             return alert
 
         alert = await asyncio.to_thread(_create)
-        
-        alert_dict = alert.__dict__.copy()
-        alert_dict["reasons"] = FraudService.normalize_reasons(alert_dict.get("reasons"))
-        alert_read = FraudAlertRead.model_validate(alert_dict)
+        alert_read = FraudService._alert_from_row(alert)
 
         if sse:
             try:
-                await sse.publish(
-                    {"event": "fraud_alert_created", "alert": alert_read.model_dump()},
+                # Subscribers get the compact codes, not the expanded text
+                sse.publish(
+                    {"event": "fraud_alert_created", "alert": alert_read.model_dump(exclude={"reasons"})},
                     type="fraud"
                 )
             except Exception as e:
@@ -114,28 +127,33 @@ class FraudService:
     ) -> tuple[list[FraudAlertRead], int]:
 
         def _query():
-            query = db.query(FraudAlert).filter_by(customer_id=customer_id)
-            total = query.count()
-            alerts = (
-                query.order_by(FraudAlert.timestamp.desc())
+            # Page and total in one statement; plain row tuples, no ORM identity map
+            rows = db.execute(
+                select(*ALERT_READ_COLUMNS, func.count().over().label("total"))
+                .where(FraudAlert.customer_id == customer_id)
+                .order_by(FraudAlert.timestamp.desc())
                 .offset(offset)
                 .limit(limit)
-                .all()
-            )
+            ).all()
 
-            results = []
-            for alert in alerts:
-                alert_data = alert.__dict__.copy()
-                alert_data["reasons"] = FraudService.normalize_reasons(alert_data.get("reasons"))
-                results.append(FraudAlertRead.model_validate(alert_data))
+            if rows:
+                total = rows[0].total
+            else:
+                # Past the last page the window total has no row to ride on
+                total = db.execute(
+                    select(func.count()).select_from(FraudAlert).where(FraudAlert.customer_id == customer_id)
+                ).scalar_one() if offset else 0
 
+            # Columns come straight from the typed table, so skip validation
+            results = [FraudService._alert_from_row(row) for row in rows]
+            ReasonCodeService.ensure_loaded(code for alert in results for code in alert.reason_codes)
             return results, total
 
         results, total = await asyncio.to_thread(_query)
 
         if sse:
             try:
-                await sse.publish(
+                sse.publish(
                     {
                         "event": "fraud_alerts_fetched",
                         "customer_id": Redactor.mask_pii(customer_id),
@@ -148,16 +166,30 @@ class FraudService:
 
         return results, total
 
+    @staticmethod
+    def _alert_from_row(row) -> FraudAlertRead:
+        alert = FraudAlertRead.model_construct(
+            id=row.id,
+            customer_id=row.customer_id,
+            txn_id=row.txn_id,
+            score=row.score,
+            reason_codes=FraudService.read_reason_codes(row.reasons),
+            action_taken=row.action_taken,
+            timestamp=row.timestamp,
+        )
+        if not is_codes(row.reasons):
+            alert._legacy_reasons = canonical_reasons(row.reasons)
+        return alert
+
     @staticmethod
     async def get_alert(db: Session, alert_id: str) -> FraudAlertRead | None:
         def _query():
-            alert = db.query(FraudAlert).filter_by(id=alert_id).first()
-            if not alert:
+            row = db.execute(select(*ALERT_READ_COLUMNS).where(FraudAlert.id == alert_id)).first()
+            if not row:
                 return None
-            
-            alert_data = alert.__dict__.copy()
-            alert_data["reasons"] = FraudService.normalize_reasons(alert_data.get("reasons"))
-            return FraudAlertRead.model_validate(alert_data)
+            alert = FraudService._alert_from_row(row)
+            ReasonCodeService.ensure_loaded(alert.reason_codes)
+            return alert
 
         return await asyncio.to_thread(_query)
 
@@ -176,7 +208,7 @@ class FraudService:
 
         if sse:
             try:
-                await sse.publish(
+                sse.publish(
                     {
                         "event": "fraud_score_generated",
                         "customer_id": Redactor.mask_pii(customer_id),
@@ -211,57 +243,14 @@ class FraudService:
                     "customer_id": alert.customer_id,
                     "reasons_raw": alert.reasons,
                     "reasons_type": str(type(alert.reasons)),
-                    "normalized": FraudService.normalize_reasons(alert.reasons)
+                    "normalized": FraudService.read_reason_texts(alert.reasons),
+                    "codes": is_codes(alert.reasons)
                 })
             return result
         
         return await asyncio.to_thread(_query)
 
     @staticmethod
-    async def get_customer_metrics(db: Session, customer_id: str) -> dict:
-        # Total Spend
-        total_spend = db.execute(
-            text("SELECT COALESCE(SUM(amount),0) FROM transactions WHERE customer_id = :cust_id"),
-            {"cust_id": customer_id}
-        ).scalar()
-
-        # % High-Risk Alerts (score >= 80)
-        high_risk_count, total_alerts = db.execute(
-            text("""
-                SELECT 
-                    COUNT(*) FILTER (WHERE score >= 80),
-                    COUNT(*)
-                FROM fraud_alerts
-                WHERE customer_id = :cust_id
-            """),
-            {"cust_id": customer_id}
-        ).first()
-        high_risk_pct = (high_risk_count / total_alerts * 100) if total_alerts else 0
-
-        # Disputes Opened
-        disputes_opened = db.execute(
-            text("""
-                SELECT COUNT(*) FROM fraud_alerts 
-                WHERE customer_id = :cust_id AND action_taken = 'pending'
-            """),
-            {"cust_id": customer_id}
-        ).scalar()
-
-        # avgTriageTime - skip if resolved_at doesn't exist
-        avg_triage_seconds = None
-        if hasattr(FraudAlert, "resolved_at"):
-            avg_triage_seconds = db.execute(
-                text("""
-                    SELECT AVG(EXTRACT(EPOCH FROM (resolved_at - timestamp)))
-                    FROM fraud_alerts
-                    WHERE customer_id = :cust_id
-                """),
-                {"cust_id": customer_id}
-            ).scalar()
-
-        return {
-            "totalSpend": float(total_spend or 0),
-            "highRiskPct": float(high_risk_pct),
-            "disputesOpened": int(disputes_opened or 0),
-            "avgTriageTime": float(avg_triage_seconds) if avg_triage_seconds else None
-        }
+    async def get_customer_metrics(db: AsyncSession, customer_id: str) -> dict:
+        """totalSpend, highRiskPct, disputesOpened, avgTriageTime from the per-customer rollup"""
+        return await FraudMetricsService.get(db, customer_id)
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
-from app.models.transaction import Transaction
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.insights import Insight
-from collections import defaultdict
+from app.services.spend_aggregate_service import SpendAggregateService, ALL_TIME
 from typing import Dict, List, Any
 from datetime import datetime
 import uuid
@@ -12,26 +12,16 @@ from app.core.sse import sse  # ✅ SSE manager
 class InsightsService:
 
     @staticmethod
-    async def spend_categories(db: Session, customer_id: str) -> Dict[str, float]:
-        def _query():
-            txns: List[Transaction] = (
-                db.query(Transaction)
-                .filter_by(customer_id=customer_id)
-                .all()
-            )
-            categories: Dict[str, float] = defaultdict(float)
-            for txn in txns:
-                # ✅ Ensure category is always a string
-                category = (txn.category or "Uncategorized").strip()
-                categories[category] += txn.amount
-            return dict(categories)
-
-        categories = await asyncio.to_thread(_query)
+    async def spend_categories(db: AsyncSession, customer_id: str, month: int = ALL_TIME) -> Dict[str, float]:
+        # Served from the incrementally maintained aggregates (O(categories))
+        categories = dict(
+            await SpendAggregateService.get_totals(db, customer_id, "category", month=month)
+        )
 
         # 🔔 Push SSE safely
         if sse:
             try:
-                await sse.publish(
+                sse.publish(
                     {
                         "event": "spend_categories",
                         "customer_id": customer_id,
@@ -46,21 +36,17 @@ class InsightsService:
 
 
     @staticmethod
-    async def top_merchants(db: Session, customer_id: str, limit: int = 5) -> List[tuple[str, float]]:
-        def _query():
-            txns: List[Transaction] = db.query(Transaction).filter_by(customer_id=customer_id).all()
-            merchants: Dict[str, float] = defaultdict(float)
-            for txn in txns:
-                merchants[txn.merchant] += txn.amount
-            sorted_merchants = sorted(merchants.items(), key=lambda x: x[1], reverse=True)
-            return sorted_merchants[:limit]
-
-        sorted_merchants = await asyncio.to_thread(_query)
+    async def top_merchants(
+        db: AsyncSession, customer_id: str, limit: int = 5, month: int = ALL_TIME
+    ) -> List[tuple[str, float]]:
+        sorted_merchants = await SpendAggregateService.get_totals(
+            db, customer_id, "merchant", month=month, limit=limit
+        )
 
         # 🔔 Push SSE safely
         if sse:
             try:
-                await sse.publish(
+                sse.publish(
                     {
                         "event": "top_merchants",
                         "customer_id": customer_id,
@@ -93,7 +79,7 @@ class InsightsService:
         # 🔔 Push SSE safely
         if sse:
             try:
-                await sse.publish(
+                sse.publish(
                     {
                         "event": "insight_saved",
                         "customer_id": customer_id,
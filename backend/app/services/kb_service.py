@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.models.kb import KBEntry
 from app.schemas.kb_schema import KBEntryCreate, KBEntryRead, KBSearchResult
 from app.core.sse import sse  # ✅ SSE manager
+from app.core.kb_index import kb_index
 import asyncio
 
 class KBService:
@@ -17,9 +18,11 @@ class KBService:
             return KBEntryRead.from_orm(entry)
 
         entry_read = await asyncio.to_thread(_create)
+        if not kb_index.needs_load():
+            kb_index.add(entry_read)
 
         # 🔔 SSE event for frontend
-        await sse.publish(
+        sse.publish(
             {
                 "event": "kb_entry_created",
                 "entry": entry_read.dict()
@@ -30,30 +33,23 @@ class KBService:
         return entry_read
 
     @staticmethod
-    async def search_entries(db: Session, query: str) -> list["KBSearchResult"]:
+    async def search_entries(db: Session, query: str, limit: Optional[int] = None) -> list["KBSearchResult"]:
         """
-        Search KB entries for a query.
+        Search KB entries for a query, best BM25 match first.
+        Served from the in-memory index, loaded on first use and refreshed
+        every KB_INDEX_REFRESH_SECONDS to pick up other workers' writes.
         Returns an empty list if no entries found or DB is empty.
         """
-        def _search():
-            results = []
-            try:
-                entries = db.query(KBEntry).all()
-                query_lower = query.lower()
-                for entry in entries:
-                    anchors = entry.anchors or []
-                    if (query_lower in entry.title.lower() or
-                        query_lower in entry.snippet.lower() or
-                        any(query_lower in str(a).lower() for a in anchors)):
-                        results.append(KBSearchResult(
-                            id=entry.id,
-                            title=entry.title,
-                            snippet=entry.snippet,
-                            anchors=anchors
-                        ))
-            except Exception:
-                # Any DB errors are ignored
-                pass
-            return results
-
-        return await asyncio.to_thread(_search)
+        if kb_index.needs_load():
+            await asyncio.to_thread(KBService._load_index, db)
+
+        return [KBSearchResult(**hit) for hit in kb_index.search(query, limit)]
+
+    @staticmethod
+    def _load_index(db: Session):
+        """(Re)build the in-memory index from kb_entries; DB errors leave it as is."""
+        try:
+            kb_index.load(db.query(KBEntry).all())
+        except Exception:
+            # Any DB errors are ignored
+            pass
@@ -1,6 +1,14 @@
 # app/services/monitoring_service.py
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from sqlalchemy import text
+from app.core.database import SessionLocal, async_engine
+from app.core.velocity import velocity_engine
+from app.core.kb_index import kb_index
+from app.core.rate_limiter import rate_limiter
+from app.core.sse import sse
+from app.core.snapshot_cache import snapshot_cache
+from app.core.reasons import reason_codes
+from app.services.fraud_metrics_service import metrics as fraud_metrics_rollup
 from app.models.transaction import Transaction
 from app.models.fraud_alert import FraudAlert
 from app.models.eval import EvalResult
@@ -12,18 +20,14 @@ class MonitoringService:
     async def health() -> dict:
         """
         Async service health check.
-        Verifies DB connectivity.
+        Verifies DB connectivity over the async pool.
         """
-        def _check_db():
-            try:
-                db: Session = SessionLocal()
-                db.execute("SELECT 1")
-                db.close()
-                return {"status": "ok", "db": "connected"}
-            except Exception:
-                return {"status": "error", "db": "disconnected"}
-
-        return await asyncio.to_thread(_check_db)
+        try:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return {"status": "ok", "db": "connected"}
+        except Exception:
+            return {"status": "error", "db": "disconnected"}
 
     @staticmethod
     async def metrics() -> dict:
@@ -46,7 +50,14 @@ class MonitoringService:
                         "total": total_eval_results,
                         "passed": passed_eval_results,
                         "success_rate": round(success_rate, 2)
-                    }
+                    },
+                    "velocity_engine": velocity_engine.get_status(),
+                    "kb_index": kb_index.get_status(),
+                    "rate_limiter": rate_limiter.get_status(),
+                    "sse": sse.get_status(),
+                    "snapshot_cache": snapshot_cache.get_status(),
+                    "fraud_metrics_rollup": dict(fraud_metrics_rollup),
+                    "reason_codes": reason_codes.get_status()
                 }
             finally:
                 db.close()
@@ -0,0 +1,67 @@
+# app/services/reason_code_service.py
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.database import SessionLocal, engine
+from app.core.reasons import FIRST_DYNAMIC_CODE, canonical_reasons, is_codes, reason_codes
+from app.models.reason_code import FraudReasonCode
+from typing import Any, Iterable, List, Set
+
+
+class ReasonCodeService:
+    """
+    Interns alert reason text into fraud_reason_codes and keeps the
+    in-process registry (app.core.reasons.reason_codes) filled. Built-in
+    reasons never touch the database.
+    """
+
+    @staticmethod
+    def encode(raw_reasons: Any) -> List[int]:
+        """Codes for any reasons value (codes pass through, text is canonicalized and interned)"""
+        if is_codes(raw_reasons):
+            return raw_reasons
+        texts = canonical_reasons(raw_reasons)
+        unknown = {text for text in texts if reason_codes.code_for(text) is None}
+        if unknown:
+            ReasonCodeService._intern(unknown)
+        return [reason_codes.code_for(text) for text in texts]
+
+    @staticmethod
+    def ensure_loaded(codes: Iterable[int]):
+        """Load codes interned by other workers before their text is needed"""
+        missing = reason_codes.missing(codes)
+        if not missing:
+            return
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(FraudReasonCode.code, FraudReasonCode.text).where(FraudReasonCode.code.in_(missing))
+            ).all()
+        finally:
+            db.close()
+        reason_codes.remember(rows)
+
+    @staticmethod
+    def _intern(texts: Set[str]):
+        # Own short transaction: a code is valid whether or not the caller's write commits
+        db = SessionLocal()
+        try:
+            if engine.dialect.name == "postgresql":
+                db.execute(
+                    pg_insert(FraudReasonCode)
+                    .values([{"text": text} for text in texts])
+                    .on_conflict_do_nothing(index_elements=["text"])
+                )
+            else:
+                # No identity start to rely on here, so keep clear of the built-in range explicitly
+                existing = set(db.scalars(select(FraudReasonCode.text).where(FraudReasonCode.text.in_(texts))))
+                next_code = max(db.scalar(select(func.max(FraudReasonCode.code))) or 0, FIRST_DYNAMIC_CODE - 1) + 1
+                db.add_all(
+                    FraudReasonCode(code=next_code + i, text=text) for i, text in enumerate(sorted(texts - existing))
+                )
+            db.commit()
+            rows = db.execute(
+                select(FraudReasonCode.code, FraudReasonCode.text).where(FraudReasonCode.text.in_(texts))
+            ).all()
+        finally:
+            db.close()
+        reason_codes.remember(rows)
@@ -0,0 +1,173 @@
+# app/services/spend_aggregate_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Integer, cast, delete, extract, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.database import engine
+from app.models.spend_aggregate import CustomerSpendAggregate
+from app.models.transaction import Transaction
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ALL_TIME = 0  # month value of the all-time rollup rows
+DIMENSIONS = ("category", "merchant")
+
+
+def _category_key(category: Optional[str]) -> str:
+    return (category or "Uncategorized").strip()
+
+
+def _month_key(ts: datetime) -> int:
+    return ts.year * 100 + ts.month
+
+
+class SpendAggregateService:
+    """
+    Maintains CustomerSpendAggregate rows so insights endpoints read
+    O(categories) rows instead of summing every transaction per request.
+    """
+
+    # ------------------------------
+    # Write path (called inside the ingest transaction, caller commits)
+    # ------------------------------
+    @staticmethod
+    def apply(db: Session, txns: Iterable[Any]):
+        """
+        Add transactions (ORM rows, TransactionRead or dicts) to the running
+        totals: all-time and per-month, for both dimensions.
+        """
+        deltas: Dict[Tuple[str, str, str, int], List[float]] = defaultdict(lambda: [0.0, 0])
+        for txn in txns:
+            get = txn.get if isinstance(txn, dict) else lambda name: getattr(txn, name)
+            customer_id, amount, ts = get("customer_id"), get("amount"), get("timestamp")
+            for dimension, key in (("category", _category_key(get("category"))), ("merchant", get("merchant"))):
+                for month in (ALL_TIME, _month_key(ts)):
+                    delta = deltas[(customer_id, dimension, key, month)]
+                    delta[0] += amount
+                    delta[1] += 1
+
+        if not deltas:
+            return
+
+        rows = [
+            {"customer_id": c, "dimension": d, "key": k, "month": m,
+             "total": total, "txn_count": count, "updated_at": datetime.utcnow()}
+            for (c, d, k, m), (total, count) in deltas.items()
+        ]
+
+        if engine.dialect.name == "postgresql":
+            stmt = pg_insert(CustomerSpendAggregate).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["customer_id", "dimension", "key", "month"],
+                set_={
+                    "total": CustomerSpendAggregate.total + stmt.excluded.total,
+                    "txn_count": CustomerSpendAggregate.txn_count + stmt.excluded.txn_count,
+                    "updated_at": stmt.excluded.updated_at,
+                }
+            )
+            db.execute(stmt)
+        else:
+            for row in rows:
+                agg = db.get(CustomerSpendAggregate, (row["customer_id"], row["dimension"], row["key"], row["month"]))
+                if agg:
+                    agg.total += row["total"]
+                    agg.txn_count += row["txn_count"]
+                else:
+                    db.add(CustomerSpendAggregate(**row))
+            db.flush()
+
+    # ------------------------------
+    # Read path
+    # ------------------------------
+    @staticmethod
+    async def get_totals(
+        db: AsyncSession,
+        customer_id: str,
+        dimension: str,
+        month: int = ALL_TIME,
+        limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """(key, total) pairs for one customer/dimension, largest first."""
+        query = (
+            select(CustomerSpendAggregate.key, CustomerSpendAggregate.total)
+            .where(
+                CustomerSpendAggregate.customer_id == customer_id,
+                CustomerSpendAggregate.dimension == dimension,
+                CustomerSpendAggregate.month == month
+            )
+            .order_by(CustomerSpendAggregate.total.desc())
+        )
+        if limit:
+            query = query.limit(limit)
+        result = await db.execute(query)
+        return [(key, total) for key, total in result.all()]
+
+    # ------------------------------
+    # Backfill / rebuild
+    # ------------------------------
+    @staticmethod
+    def rebuild(db: Session, customer_id: Optional[str] = None, only_missing: bool = False) -> int:
+        """
+        Recompute aggregates from the transactions table with set-based
+        INSERT ... SELECT ... GROUP BY statements.
+
+        - customer_id: limit to one customer (default: everyone)
+        - only_missing: backfill customers that have no aggregate rows yet
+          instead of replacing existing ones
+        Returns the number of aggregate rows written.
+        """
+        agg = CustomerSpendAggregate
+        customer_filter = []
+        if customer_id:
+            customer_filter.append(Transaction.customer_id == customer_id)
+        if only_missing:
+            # Resolve the set once: the first INSERT below would otherwise
+            # make every later statement see these customers as covered
+            missing = db.execute(
+                select(Transaction.customer_id).distinct()
+                .where(*customer_filter, Transaction.customer_id.not_in(select(agg.customer_id)))
+            ).scalars().all()
+            if not missing:
+                return 0
+            customer_filter = [Transaction.customer_id.in_(missing)]
+        else:
+            stmt = delete(agg)
+            if customer_id:
+                stmt = stmt.where(agg.customer_id == customer_id)
+            db.execute(stmt)
+
+        month_expr = cast(extract("year", Transaction.timestamp) * 100 + extract("month", Transaction.timestamp), Integer)
+        key_exprs = {
+            "category": func.trim(func.coalesce(func.nullif(Transaction.category, ""), "Uncategorized")),
+            "merchant": Transaction.merchant,
+        }
+
+        written = 0
+        for dimension in DIMENSIONS:
+            key_expr = key_exprs[dimension]
+            for month in (None, month_expr):
+                group_by = [Transaction.customer_id, key_expr] + ([month] if month is not None else [])
+                source = (
+                    select(
+                        Transaction.customer_id,
+                        literal(dimension),
+                        key_expr,
+                        month if month is not None else literal(ALL_TIME, Integer),
+                        func.sum(Transaction.amount),
+                        func.count(),
+                        literal(datetime.utcnow()),
+                    )
+                    .where(*customer_filter)
+                    .group_by(*group_by)
+                )
+                result = db.execute(
+                    insert(agg).from_select(
+                        ["customer_id", "dimension", "key", "month", "total", "txn_count", "updated_at"],
+                        source
+                    )
+                )
+                written += result.rowcount or 0
+
+        db.commit()
+        return written
@@ -104,7 +104,7 @@
 #             txn_obj = await asyncio.to_thread(_ingest_sync_partial, record)
 #             # Risk evaluation only if not duplicate
 #             if not txn_obj.details.get("duplicate_detected", False):
-#                 risk_level, fallback_used = await _evaluate_risk(record.customer_id, record.txn_id)
+#                 risk_level, fallback_used = await TransactionService._evaluate_risk(record.customer_id, record.txn_id)
 #                 details = dict(txn_obj.details or {})
 #                 details.update({"risk_level": risk_level, "fallbackUsed": fallback_used})
 #                 txn_obj.details = details
@@ -131,14 +131,64 @@
 #         return await asyncio.to_thread(_fetch_sync)
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.transaction import Transaction
-from app.schemas.transaction import TransactionCreate, TransactionRead
-from typing import List
-from datetime import datetime, timedelta
-from app.core.database import engine, create_month_partition
+from app.schemas.transaction import (
+    TransactionCreate, TransactionRead, TransactionIngestSummary, CSVRowError
+)
+from collections import defaultdict, deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from app.core.database import engine, partition_manager
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.redis import get_redis_client
 from app.services.risk_service import RiskService  # hypothetical risk service
+from app.services.spend_aggregate_service import SpendAggregateService
+from app.services.fraud_metrics_service import FraudMetricsService
+from app.services.customer_snapshot_service import CustomerSnapshotService
+from app.core.velocity import velocity_engine
 from app.core.sse import sse  # SSE manager
 import asyncio
+import codecs
+import csv
+import uuid
+
+# Key and INCLUDE columns of idx_transactions_customer_ts (TransactionRead's
+# fields), so the 90-day listing stays an index-only scan; details is not in it.
+LISTING_COLUMNS = (
+    Transaction.id, Transaction.customer_id, Transaction.txn_id, Transaction.amount,
+    Transaction.currency, Transaction.merchant, Transaction.category, Transaction.mcc,
+    Transaction.timestamp,
+)
+
+
+# Merged into a transaction's details when a later record duplicates it (preauth vs capture)
+DUPLICATE_DETAILS = {"risk_level": "low", "duplicate_detected": True}
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    """The timestamp column is timezone-naive UTC; normalize aware inputs to match."""
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+class _DequeIterator:
+    """Line source for a long-lived csv.reader; refilled between reads."""
+
+    def __init__(self, feed: Deque[str]):
+        self.feed = feed
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.feed:
+            raise StopIteration
+        return self.feed.popleft()
 
 
 class TransactionService:
@@ -153,17 +203,21 @@ class TransactionService:
             if existing_txn:
                 return TransactionRead.from_orm(existing_txn)
 
-            if engine.dialect.name == "postgresql":
-                ts = txn_data.timestamp or datetime.utcnow()
-                create_month_partition("transactions", ts.year, ts.month)
+            partition_manager.ensure_partition("transactions", txn_data.timestamp or datetime.utcnow())
 
             txn = Transaction(**txn_data.dict())
             db.add(txn)
+            db.flush()
+            SpendAggregateService.apply(db, [txn])
+            FraudMetricsService.apply_transactions(db, [txn])
             db.commit()
             db.refresh(txn)
+            velocity_engine.record_many([txn])
             return TransactionRead.from_orm(txn)
 
-        return await asyncio.to_thread(_create_sync)
+        created = await asyncio.to_thread(_create_sync)
+        await CustomerSnapshotService.invalidate([created.customer_id])
+        return created
 
     @staticmethod
     async def get_transactions_by_customer(db: Session, customer_id: str) -> List[TransactionRead]:
@@ -183,21 +237,22 @@ class TransactionService:
         return await asyncio.to_thread(_fetch_sync)
 
     @staticmethod
-    async def ingest_transactions(db: Session, records: List[TransactionCreate]) -> List[TransactionRead]:
+    async def _evaluate_risk(customer_id: str, txn_id: str):
+        try:
+            risk_level = await asyncio.wait_for(
+                RiskService.evaluate(customer_id, txn_id), timeout=2.0
+            )
+            return risk_level, False
+        except Exception:
+            # Fallback case
+            sse.publish(
+                {"customer_id": customer_id, "txn_id": txn_id},
+                type="fallback_triggered"
+            )
+            return "medium", True
 
-        async def _evaluate_risk(customer_id: str, txn_id: str):
-            try:
-                risk_level = await asyncio.wait_for(
-                    RiskService.evaluate(customer_id, txn_id), timeout=2.0
-                )
-                return risk_level, False
-            except Exception:
-                # Fallback case
-                await sse.publish(
-                    {"customer_id": customer_id, "txn_id": txn_id},
-                    type="fallback_triggered"
-                )
-                return "medium", True
+    @staticmethod
+    async def ingest_transactions(db: Session, records: List[TransactionCreate]) -> List[TransactionRead]:
 
         def _ingest_sync_partial(record: TransactionCreate):
             now = record.timestamp or datetime.utcnow()
@@ -214,21 +269,20 @@ class TransactionService:
             if duplicate_txn:
                 txn = duplicate_txn
                 # Add KB explanation via SSE
-                asyncio.create_task(sse.publish({
+                sse.publish({
                     "customer_id": record.customer_id,
                     "txn_id": txn.txn_id,
                     "explanation": "Duplicate detected: preauth vs capture",
                     "kb_agent": "KB Agent"
-                }, type="kb_explanation"))
-                # Downgrade risk
-                txn.details = txn.details or {}
-                txn.details.update(
-                    {"risk_level": "low", "duplicate_detected": True})
+                }, type="kb_explanation")
+                # Downgrade risk (reassigned: JSON columns don't track in-place updates)
+                txn.details = {**(txn.details or {}), **DUPLICATE_DETAILS}
             else:
-                if engine.dialect.name == "postgresql":
-                    create_month_partition("transactions", now.year, now.month)
+                partition_manager.ensure_partition("transactions", now)
                 txn = Transaction(**record.dict())
                 db.add(txn)
+                SpendAggregateService.apply(db, [record.dict() | {"timestamp": now}])
+                FraudMetricsService.apply_transactions(db, [record.dict()])
 
             return txn
 
@@ -237,8 +291,9 @@ class TransactionService:
         for record in records:
             txn_obj = await asyncio.to_thread(_ingest_sync_partial, record)
             # Risk evaluation only if not duplicate
-            if not txn_obj.details.get("duplicate_detected", False):
-                risk_level, fallback_used = await _evaluate_risk(record.customer_id, record.txn_id)
+            if not (txn_obj.details or {}).get("duplicate_detected", False):
+                velocity_engine.record_many([txn_obj])
+                risk_level, fallback_used = await TransactionService._evaluate_risk(record.customer_id, record.txn_id)
                 details = dict(txn_obj.details or {})
                 details.update({"risk_level": risk_level,
                                "fallbackUsed": fallback_used})
@@ -249,8 +304,300 @@ class TransactionService:
             db.refresh(txn_obj)
             results.append(TransactionRead.from_orm(txn_obj))
 
+        await CustomerSnapshotService.invalidate({txn.customer_id for txn in results})
         return results
 
+    # -----------------------------------------
+    # Bulk (set-based) ingest
+    # -----------------------------------------
+    @staticmethod
+    def _plan_batch_sync(
+        db: Session, records: List[TransactionCreate]
+    ) -> Tuple[List[TransactionRead | str], List[dict], List[TransactionRead], Dict[str, dict]]:
+        """
+        Sort one batch into duplicates and new rows with a single duplicate lookup.
+
+        Duplicated transactions get DUPLICATE_DETAILS like in ingest_transactions:
+        new rows carry it in their details, existing rows are returned as
+        {id: merged details} for the write step.
+
+        Returns (one slot per record: the existing duplicate or the new row's
+        id, new rows to insert, duplicates, details updates for existing rows).
+        """
+        if not records:
+            return [], [], [], {}
+
+        now = datetime.utcnow()
+        timestamps = [
+            _naive_utc(record.timestamp) if record.timestamp else now
+            for record in records
+        ]
+        window = timedelta(hours=24)
+
+        # One set-based query for every (customer, merchant, amount) in the batch
+        keys = {(r.customer_id, r.merchant, r.amount) for r in records}
+        candidates = db.query(Transaction).filter(
+            tuple_(Transaction.customer_id, Transaction.merchant, Transaction.amount).in_(list(keys)),
+            Transaction.timestamp >= min(timestamps) - window
+        ).all()
+
+        seen: Dict[tuple, List[TransactionRead]] = defaultdict(list)
+        existing_details = {}
+        for txn in candidates:
+            seen[(txn.customer_id, txn.merchant, txn.amount)].append(TransactionRead.from_orm(txn))
+            existing_details[txn.id] = txn.details
+
+        # Each slot holds either an existing duplicate or the id of a new row
+        slots: List[TransactionRead | str] = []
+        rows: List[dict] = []
+        rows_by_id: Dict[str, dict] = {}
+        duplicates: List[TransactionRead] = []
+        marked: Dict[str, dict] = {}
+
+        for record, ts in zip(records, timestamps):
+            key = (record.customer_id, record.merchant, record.amount)
+            duplicate_txn = next(
+                (txn for txn in seen[key] if txn.timestamp >= ts - window), None
+            )
+            if duplicate_txn:
+                slots.append(duplicate_txn)
+                duplicates.append(duplicate_txn)
+                if duplicate_txn.id in rows_by_id:
+                    rows_by_id[duplicate_txn.id]["details"] = dict(DUPLICATE_DETAILS)
+                else:
+                    marked[duplicate_txn.id] = {**(existing_details[duplicate_txn.id] or {}), **DUPLICATE_DETAILS}
+                continue
+
+            row = {**record.dict(), "id": str(uuid.uuid4()), "timestamp": ts}
+            rows.append(row)
+            rows_by_id[row["id"]] = row
+            slots.append(row["id"])
+            # Later records in the same batch must see this one, exactly as
+            # they would after the per-record path commits it.
+            seen[key].append(TransactionRead(**row))
+
+        return slots, rows, duplicates, marked
+
+    @staticmethod
+    def _write_batch_sync(
+        db: Session, slots: List[TransactionRead | str], rows: List[dict], marked: Dict[str, dict]
+    ) -> Tuple[List[TransactionRead], List[TransactionRead]]:
+        """
+        Insert a planned batch with a single multi-row INSERT ... ON CONFLICT
+        DO NOTHING, mark the duplicated existing rows, and commit once.
+
+        Returns (results in input order, newly inserted rows).
+        """
+        if marked:
+            transactions = Transaction.__table__
+            db.execute(
+                update(transactions)
+                .where(transactions.c.id == bindparam("txn_pk"))
+                .values(details=bindparam("details")),
+                [{"txn_pk": txn_pk, "details": details} for txn_pk, details in marked.items()]
+            )
+
+        inserted: Dict[str, TransactionRead] = {}
+        if rows:
+            for row in rows:
+                partition_manager.ensure_partition("transactions", row["timestamp"])
+
+            if engine.dialect.name == "postgresql":
+                stmt = (
+                    pg_insert(Transaction)
+                    .values(rows)
+                    .on_conflict_do_nothing()
+                    .returning(*Transaction.__table__.columns)
+                )
+                for row in db.execute(stmt).mappings():
+                    inserted[row["id"]] = TransactionRead(**row)
+            else:
+                db.execute(insert(Transaction), rows)
+                inserted = {row["id"]: TransactionRead(**row) for row in rows}
+
+            SpendAggregateService.apply(db, inserted.values())
+            FraudMetricsService.apply_transactions(db, inserted.values())
+
+        db.commit()
+
+        # Rows skipped by ON CONFLICT are dropped from the results
+        results = [
+            slot if isinstance(slot, TransactionRead) else inserted[slot]
+            for slot in slots
+            if isinstance(slot, TransactionRead) or slot in inserted
+        ]
+        return results, list(inserted.values())
+
+    @staticmethod
+    async def _ingest_batch(
+        db: Session, batch: List[TransactionCreate]
+    ) -> Tuple[List[TransactionRead], List[TransactionRead], List[TransactionRead]]:
+        """
+        Ingest one batch: one duplicate lookup, risk evaluation for the new
+        rows (concurrently, stored in details like the per-record path), then
+        one INSERT and one commit.
+
+        Returns (results in input order, duplicates, newly inserted rows).
+        """
+        slots, rows, duplicates, marked = await asyncio.to_thread(TransactionService._plan_batch_sync, db, batch)
+
+        # Risk evaluation only for new rows, concurrently instead of one by one
+        risks = await asyncio.gather(*(
+            TransactionService._evaluate_risk(row["customer_id"], row["txn_id"])
+            for row in rows
+        ))
+        for row, (risk_level, fallback_used) in zip(rows, risks):
+            # A duplicate later in the batch downgrades it afterwards, as in the per-record path
+            row["details"] = {"risk_level": risk_level, "fallbackUsed": fallback_used, **row.get("details", {})}
+
+        batch_results, inserted = await asyncio.to_thread(
+            TransactionService._write_batch_sync, db, slots, rows, marked
+        )
+        velocity_engine.record_many(inserted)
+        await CustomerSnapshotService.invalidate({txn.customer_id for txn in inserted})
+
+        for txn in duplicates:
+            sse.publish({
+                "customer_id": txn.customer_id,
+                "txn_id": txn.txn_id,
+                "explanation": "Duplicate detected: preauth vs capture",
+                "kb_agent": "KB Agent"
+            }, type="kb_explanation")
+
+        return batch_results, duplicates, inserted
+
+    @staticmethod
+    async def ingest_transactions_bulk(
+        db: Session, records: List[TransactionCreate], batch_size: int = 500
+    ) -> List[TransactionRead]:
+        """
+        Set-based alternative to ingest_transactions for large payloads and
+        backfills. Commits once per batch of `batch_size` records.
+        """
+        results: List[TransactionRead] = []
+
+        for start in range(0, len(records), batch_size):
+            batch_results, _, _ = await TransactionService._ingest_batch(
+                db, records[start:start + batch_size]
+            )
+            results.extend(batch_results)
+
+        return results
+
+    # -----------------------------------------
+    # Streaming CSV ingest
+    # -----------------------------------------
+    @staticmethod
+    def parse_csv_row(row: Dict[str, str]) -> TransactionCreate:
+        """Map a CSV row (snake_case or camelCase headers) to TransactionCreate."""
+        timestamp_str = row.get("timestamp")
+        return TransactionCreate(
+            customer_id=row.get("customer_id") or row.get("customerId"),
+            txn_id=row.get("txn_id") or row.get("txnId"),
+            merchant=row.get("merchant"),
+            category=row.get("category") or None,
+            amount=float(row.get("amount")),
+            currency=row.get("currency") or "USD",
+            mcc=row.get("mcc") or None,
+            timestamp=datetime.fromisoformat(timestamp_str) if timestamp_str else None
+        )
+
+    @staticmethod
+    async def _iter_csv_records(file, chunk_size: int) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yield (starting line number, record text) from an async file-like
+        object, reading `chunk_size` bytes at a time. A record spans several
+        physical lines when a quoted field contains newlines.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        pending = ""
+        record = ""
+        line_no = 0
+        record_start = 1
+
+        while True:
+            chunk = await file.read(chunk_size)
+            final = not chunk
+            pending += decoder.decode(chunk or b"", final=final)
+            *lines, pending = pending.split("\n")
+            if final and pending:
+                lines.append(pending)
+                pending = ""
+
+            for line in lines:
+                line_no += 1
+                if not record:
+                    record_start = line_no
+                record += line + "\n"
+                # Balanced quotes => the record is complete
+                if record.count('"') % 2 == 0:
+                    yield record_start, record
+                    record = ""
+
+            if final:
+                break
+
+        if record:
+            yield record_start, record
+
+    @staticmethod
+    async def ingest_csv_stream(
+        db: Session, file, batch_size: int = 500,
+        chunk_size: int = 64 * 1024, max_errors: int = 100
+    ) -> TransactionIngestSummary:
+        """
+        Parse a CSV upload incrementally and flush fixed-size batches through
+        the bulk ingest path. Only the current batch is held in memory.
+        Rejected rows are reported by line number (first `max_errors` kept).
+        """
+        summary = TransactionIngestSummary()
+        feed: Deque[str] = deque()
+        reader = csv.reader(_DequeIterator(feed))
+        header: List[str] | None = None
+        batch: List[TransactionCreate] = []
+
+        async def _flush():
+            _, duplicates, inserted = await TransactionService._ingest_batch(db, batch)
+            summary.batches += 1
+            summary.accepted += len(inserted)
+            # Rows dropped by ON CONFLICT were already ingested as well
+            summary.duplicates += len(batch) - len(inserted)
+            batch.clear()
+
+        async for line_no, text in TransactionService._iter_csv_records(file, chunk_size):
+            feed.append(text)
+            values = next(reader, None)
+            if not values or not any(v.strip() for v in values):
+                continue
+            if header is None:
+                header = [h.strip() for h in values]
+                missing = [
+                    col for col, alias in (("customer_id", "customerId"), ("txn_id", "txnId"),
+                                           ("merchant", None), ("amount", None))
+                    if col not in header and alias not in header
+                ]
+                if missing:
+                    raise ValueError(f"CSV header is missing required columns: {', '.join(missing)}")
+                continue
+
+            try:
+                if len(values) > len(header):
+                    raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+                batch.append(TransactionService.parse_csv_row(dict(zip(header, values))))
+            except Exception as e:
+                summary.rejected += 1
+                if len(summary.errors) < max_errors:
+                    summary.errors.append(CSVRowError(line=line_no, error=str(e)))
+                continue
+
+            if len(batch) >= batch_size:
+                await _flush()
+
+        if batch:
+            await _flush()
+
+        return summary
+
     # -----------------------------------------
     # Old (non-paginated) implementation
     # -----------------------------------------
@@ -280,36 +627,77 @@ class TransactionService:
     # New (paginated) implementation
     # -----------------------------------------
     @staticmethod
-    async def get_transactions_by_customer_last_90d(
-        db, customer_id: str, skip: int = 0, limit: int = 10
-    ) -> List[TransactionRead]:
-        def _fetch_sync():
-            end = datetime.utcnow()
-            start = end - timedelta(days=90)
-
-            txns = (
-                db.query(Transaction)
-                .filter(
-                    Transaction.customer_id == customer_id,
-                    Transaction.timestamp >= start,
-                    Transaction.timestamp <= end
-                )
-                .order_by(Transaction.timestamp.desc())  # newest first
-                .offset(skip)
-                .limit(limit)
-                .all()
-            )
-
-            transactions_data = []
-            for txn in txns:
-                txn_dict = {col.name: getattr(txn, col.name)
-                            for col in txn.__table__.columns}
-                txn_dict.pop("_sa_instance_state", None)
-                transactions_data.append(TransactionRead(**txn_dict))
+    def _last_90d_filter(customer_id: str):
+        end = datetime.utcnow()
+        return (
+            Transaction.customer_id == customer_id,
+            Transaction.timestamp >= end - timedelta(days=90),
+            Transaction.timestamp <= end,
+        )
 
-            return transactions_data
+    @staticmethod
+    async def get_transactions_by_customer_last_90d(
+        db: AsyncSession, customer_id: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None
+    ) -> Tuple[List[TransactionRead], Optional[str]]:
+        """
+        One page of the customer's last 90 days, newest first, plus the cursor
+        for the next page (None on the last page).
+
+        With a cursor the page starts right after the (timestamp, id) it encodes,
+        an index range scan on idx_transactions_customer_ts however deep the
+        page is; skip (OFFSET) is kept for older clients and ignored then.
+        """
+        query = (
+            select(*LISTING_COLUMNS)
+            .where(*TransactionService._last_90d_filter(customer_id))
+            .order_by(Transaction.timestamp.desc(), Transaction.id.desc())  # newest first
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            after_timestamp, after_id = decode_cursor(cursor)
+            query = query.where(tuple_(Transaction.timestamp, Transaction.id) < tuple_(after_timestamp, after_id))
+        elif skip:
+            query = query.offset(skip)
+
+        rows = (await db.execute(query)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+        return [TransactionRead.model_validate(txn) for txn in rows], next_cursor
 
-        return await asyncio.to_thread(_fetch_sync)
+    @staticmethod
+    async def count_transactions_by_customer_last_90d(
+        db: AsyncSession, customer_id: str, mode: str = "exact"
+    ) -> Optional[int]:
+        """Total for the 90-day window per pagination.COUNT_MODES"""
+        if mode == "none":
+            return None
+
+        cache_key = f"txns_count_90d:{customer_id}"
+        if mode == "cached":
+            try:
+                redis_client = await get_redis_client()
+                cached = await redis_client.get(cache_key)
+                if cached is not None:
+                    return int(cached)
+            except Exception as e:
+                print(f"[TransactionService] count cache read failed: {e}")
+
+        result = await db.execute(
+            select(func.count())
+            .select_from(Transaction)
+            .where(*TransactionService._last_90d_filter(customer_id))
+        )
+        total = result.scalar_one()
+
+        if mode == "cached":
+            try:
+                redis_client = await get_redis_client()
+                await redis_client.set(cache_key, total, ex=settings.txn_count_cache_ttl_seconds)
+            except Exception as e:
+                print(f"[TransactionService] count cache write failed: {e}")
+        return total
 
 
 
@@ -451,7 +839,7 @@ class TransactionService:
 #             txn_obj, is_duplicate = await asyncio.to_thread(_ingest_sync_partial, record)
 
 #             if not is_duplicate:
-#                 risk_level, fallback_used = await _evaluate_risk(record.customer_id, record.txn_id)
+#                 risk_level, fallback_used = await TransactionService._evaluate_risk(record.customer_id, record.txn_id)
 #                 details = txn_obj.details or {}
 #                 details.update({"risk_level": risk_level, "fallbackUsed": fallback_used})
 #                 txn_obj.details = details
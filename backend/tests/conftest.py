@@ -168,6 +168,11 @@ class FakeRedis:
     async def ttl(self, key):
         return 0
 
+    def register_script(self, script):
+        async def _allow(keys=None, args=None):
+            return [1, 0, int(args[0]) - 1]  # always allowed
+        return _allow
+
 @pytest_asyncio.fixture
 async def async_client():
     # Patch rate_limit to be a no-op decorator
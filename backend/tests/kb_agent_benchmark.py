@@ -0,0 +1,74 @@
+# tests/kb_agent_benchmark.py
+# Micro-benchmark: legacy per-call scan vs the precompiled keyword index
+# in KBAgent._find_rules_by_keyword. Run from backend/:
+#   python -m tests.kb_agent_benchmark
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app.agents.kb_agent import KBAgent
+
+RULES = 10_000
+LOOKUPS = 200
+KEYWORD_SETS = [["amount", "large"], ["ATM", "withdrawal"], ["device", "suspicious"]]
+WORDS = ["verify", "customer", "merchant", "transfer", "limit", "review", "card", "online",
+         "amount", "large", "atm", "withdrawal", "device", "suspicious", "refund", "dispute"]
+
+
+def make_rules(n: int):
+    rng = random.Random(42)
+    return [
+        {
+            "title": f"Rule {i} {rng.choice(WORDS)}",
+            "anchor": f"rule_{i}",
+            "chunks": [" ".join(rng.choices(WORDS, k=8)) for _ in range(3)],
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_find(kb_data, keywords):
+    results = []
+    for rule in kb_data:
+        content = ' '.join(rule.get('chunks', [])).lower()
+        title = rule.get('title', '').lower()
+        for keyword in keywords:
+            if keyword.lower() in content or keyword.lower() in title:
+                results.append(rule)
+                break
+    return results
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        fn(KEYWORD_SETS[i % len(KEYWORD_SETS)])
+    return (time.perf_counter() - start) * 1000 / LOOKUPS
+
+
+def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "kb_docs.json"
+        path.write_text(json.dumps(make_rules(RULES)), encoding="utf-8")
+
+        start = time.perf_counter()
+        agent = KBAgent(kb_path=path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        for keywords in KEYWORD_SETS:
+            assert agent._find_rules_by_keyword(keywords) == legacy_find(agent.kb_data, keywords)
+
+        legacy_ms = timed(lambda keywords: legacy_find(agent.kb_data, keywords))
+        indexed_ms = timed(agent._find_rules_by_keyword)
+
+    print(f"Rules: {RULES}, lookups: {LOOKUPS}")
+    print(f"Load + index build: {load_ms:.2f} ms")
+    print(f"Legacy scan: {legacy_ms:.3f} ms/lookup")
+    print(f"Keyword index: {indexed_ms:.3f} ms/lookup")
+    print(f"Speedup: {legacy_ms / indexed_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,66 @@
+from unittest.mock import patch
+from app.core.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+
+
+def _breaker(**overrides):
+    options = dict(window_seconds=10, buckets=10, min_calls=4, error_rate_threshold=0.5,
+                   slow_call_seconds=1.0, slow_call_rate_threshold=0.75, recovery_timeout=5, half_open_probes=2)
+    options.update(overrides)
+    return CircuitBreaker(name="dep", **options)
+
+
+def test_opens_on_error_rate_only_after_min_calls():
+    with patch("app.core.circuit_breaker.time.time", return_value=1000.0):
+        breaker = _breaker()
+        breaker.on_failure()
+        breaker.on_failure()
+        assert breaker.state == "closed"  # 2 calls < min_calls
+        breaker.on_success()
+        breaker.on_failure()
+        assert breaker.state == "open" and not breaker.allow_request()
+
+
+def test_old_buckets_roll_out_of_the_window():
+    breaker = _breaker()
+    with patch("app.core.circuit_breaker.time.time", return_value=1000.0):
+        for _ in range(3):
+            breaker.on_failure()
+    with patch("app.core.circuit_breaker.time.time", return_value=1011.0):
+        breaker.on_failure()
+        assert breaker.state == "closed"
+        assert breaker.get_status()["window_calls"] == 1
+
+
+def test_slow_calls_trip_the_breaker():
+    with patch("app.core.circuit_breaker.time.time", return_value=1000.0):
+        breaker = _breaker()
+        for _ in range(4):
+            breaker.on_success(duration=2.0)
+        assert breaker.state == "open"
+
+
+def test_half_open_admits_limited_probes():
+    breaker = _breaker()
+    with patch("app.core.circuit_breaker.time.time", return_value=1000.0):
+        for _ in range(4):
+            breaker.on_failure()
+    with patch("app.core.circuit_breaker.time.time", return_value=1006.0):
+        assert [breaker.allow_request() for _ in range(4)] == [True, True, False, False]
+        assert breaker.state == "half-open"
+        breaker.on_success()
+        breaker.on_failure()
+        assert breaker.state == "open"
+    with patch("app.core.circuit_breaker.time.time", return_value=1012.0):
+        assert breaker.allow_request() and breaker.allow_request()
+        breaker.on_success()
+        breaker.on_success()
+        assert breaker.state == "closed" and breaker.get_status()["window_calls"] == 0
+
+
+def test_registry_shares_breakers_by_name():
+    registry = CircuitBreakerRegistry()
+    assert registry.get("fraud_agent") is registry.get("fraud_agent")
+    registry.get("kb_agent").on_failure()
+    assert set(registry.get_status()) == {"fraud_agent", "kb_agent"}
+    registry.reset_all()
+    assert registry.get_status()["kb_agent"]["last_failure"] is None
@@ -229,6 +229,18 @@ class FakeRedis:
     async def ttl(self, key):
         return 60  # Mock 60 seconds remaining
 
+    def register_script(self, script):
+        # Stand-in for the GCRA script: grants tokens until the limit is used up
+        async def _gcra(keys, args):
+            limit, cost = int(args[0]), int(args[2])
+            used = self.store.get(keys[0], 0)
+            granted = min(cost, limit - used)
+            if granted < 1:
+                return [0, 60000, 0]
+            self.store[keys[0]] = used + granted
+            return [granted, 0, limit - used - granted]
+        return _gcra
+
 # Create a single shared FakeRedis instance
 fake_redis_instance = FakeRedis()
 
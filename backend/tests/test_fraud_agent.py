@@ -0,0 +1,44 @@
+import pytest
+
+from app.agents.fraud_agent import FraudAgent
+from app.core.reasons import CHARGEBACK_HISTORY, DEVICE_CHANGE, UNUSUAL_MCC
+from app.models.agent_models import CustomerProfile
+
+
+def _profile(chargeback_count=0, devices=(), risk_level="low"):
+    return CustomerProfile(
+        customer_id="c1", risk_level=risk_level, total_transactions=10,
+        chargeback_count=chargeback_count, devices=list(devices), avg_transaction_amount=20.0,
+    )
+
+
+GROCERY_HISTORY = [{"mcc": "5411"} for _ in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_signals_come_from_profile_and_history():
+    agent = FraudAgent()
+    transaction = {"customerId": "fraud-agent-test", "mcc": "6011", "deviceId": "d9"}
+    response = await agent.assess_risk(
+        "fraud-agent-test", transaction, GROCERY_HISTORY, _profile(chargeback_count=2, devices=["d1"])
+    )
+
+    assessment = response.data
+    assert assessment.signals == {"velocity_risk": 0.0, "device_risk": 1.0, "mcc_risk": 1.0, "chargeback_risk": 1.0}
+    assert assessment.risk_score == 0.75
+    assert assessment.reason_codes == [DEVICE_CHANGE, UNUSUAL_MCC, CHARGEBACK_HISTORY]
+
+
+@pytest.mark.asyncio
+async def test_signals_without_data_are_left_out_of_the_score():
+    agent = FraudAgent()
+    transaction = {"customerId": "fraud-agent-test", "mcc": "5411"}
+    response = await agent.assess_risk("fraud-agent-test", transaction, GROCERY_HISTORY[:2], None)
+    assert response.data.signals == {"velocity_risk": 0.0}
+
+    # The orchestrator's placeholder profile says nothing about chargebacks
+    response = await agent.assess_risk(
+        "fraud-agent-test", transaction, GROCERY_HISTORY, _profile(risk_level="unknown")
+    )
+    assert response.data.signals == {"velocity_risk": 0.0, "mcc_risk": 0.0}
+    assert response.data.risk_score == 0.0
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.agents.base_agent import AgentResponse
+from app.services.fraud_batch_service import FraudBatchService
+
+
+class FakeOrchestrator:
+    """execute_plan sleeps per transaction so they finish out of order"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.context_loads = []
+        self.running = 0
+        self.max_running = 0
+
+    async def load_customer_context(self, customer_id):
+        self.context_loads.append(customer_id)
+        await asyncio.sleep(0.01)
+        return {"customer": customer_id}
+
+    async def execute_plan(self, customer_id, transaction, customer_context):
+        assert customer_context == {"customer": customer_id}
+        delay = self.delays[transaction["id"]]
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(delay)
+        self.running -= 1
+        return {"success": True, "final_action": {"action": "approve", "reason": transaction["id"]}}
+
+
+class PassThroughRedactor:
+    async def redact_pii(self, data):
+        return AgentResponse(success=True, data=data)
+
+
+TRANSACTIONS = [
+    {"id": "t0", "customerId": "c1"},
+    {"id": "t1", "customerId": "c2"},
+    {"id": "t2", "customerId": "c1"},
+    {"id": "t3", "customerId": "c1"},
+]
+
+
+async def _run(orchestrator, concurrency):
+    return [
+        item async for item in FraudBatchService.iter_results(
+            orchestrator, PassThroughRedactor(), TRANSACTIONS, concurrency=concurrency
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_results_stream_in_completion_order_with_shared_customer_context():
+    orchestrator = FakeOrchestrator({"t0": 0.12, "t1": 0.01, "t2": 0.08, "t3": 0.04})
+    results = await _run(orchestrator, concurrency=4)
+
+    # Each line goes out as soon as its transaction finishes, tagged with its input index
+    assert [(r["index"], r["transaction_id"]) for r in results] == [(1, "t1"), (3, "t3"), (2, "t2"), (0, "t0")]
+    assert all(r["status"] == "success" for r in results)
+    assert [r["result"]["action"]["reason"] for r in results] == ["t1", "t3", "t2", "t0"]
+    # c1's three transactions share one context load
+    assert sorted(orchestrator.context_loads) == ["c1", "c2"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_per_transaction_errors():
+    orchestrator = FakeOrchestrator({"t0": 0.02, "t1": 0.02, "t2": 0.02})  # t3 has no delay -> KeyError
+    results = await _run(orchestrator, concurrency=2)
+
+    assert orchestrator.max_running == 2
+    assert len(results) == 4
+    failed = [r for r in results if r["status"] == "error"]
+    assert [r["transaction_id"] for r in failed] == ["t3"] and "error" in failed[0]
+    assert sorted(orchestrator.context_loads) == ["c1", "c2"]
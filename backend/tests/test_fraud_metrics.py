@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services.fraud_metrics_service import FraudMetricsService, _as_api
+
+
+def test_transactions_are_summed_per_customer():
+    with patch.object(FraudMetricsService, "_apply") as apply:
+        FraudMetricsService.apply_transactions(None, [
+            {"customer_id": "c1", "amount": 10.0},
+            {"customer_id": "c1", "amount": -2.5},
+            SimpleNamespace(customer_id="c2", amount=4.0),
+        ])
+    deltas = apply.call_args.args[1]
+    assert deltas["c1"] == {"total_spend": 7.5, "alert_count": 0, "high_risk_alerts": 0, "pending_alerts": 0}
+    assert deltas["c2"]["total_spend"] == 4.0
+
+
+def test_alert_delta_counts_high_risk_and_pending():
+    with patch.object(FraudMetricsService, "_apply") as apply:
+        FraudMetricsService.apply_alert(None, SimpleNamespace(customer_id="c1", score=85, action_taken="pending"))
+        FraudMetricsService.apply_alert(None, SimpleNamespace(customer_id="c1", score=40, action_taken=None))
+    first, second = (call.args[1]["c1"] for call in apply.call_args_list)
+    assert first == {"total_spend": 0, "alert_count": 1, "high_risk_alerts": 1, "pending_alerts": 1}
+    assert second == {"total_spend": 0, "alert_count": 1, "high_risk_alerts": 0, "pending_alerts": 0}
+
+
+def test_api_shape():
+    values = {"total_spend": 12.5, "alert_count": 4, "high_risk_alerts": 1, "pending_alerts": 2}
+    assert _as_api(values) == {"totalSpend": 12.5, "highRiskPct": 25.0, "disputesOpened": 2, "avgTriageTime": None}
+    assert _as_api({**values, "alert_count": 0, "high_risk_alerts": 0})["highRiskPct"] == 0.0
@@ -0,0 +1,66 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.database import get_db
+from app.core.reasons import reason_codes
+from app.main import app
+from app.schemas.fraud_alert import FraudAlertRead
+from app.services.fraud_service import FraudService
+
+CARD_REASON_CODE = 4711
+
+
+@pytest.fixture
+def alert():
+    reason_codes.remember([(CARD_REASON_CODE, "card 4111111111111111 reported")])
+    return FraudAlertRead(
+        id="a1", customer_id="c1", txn_id="t1", score=90.0,
+        reason_codes=[CARD_REASON_CODE], timestamp=datetime(2026, 3, 1),
+    )
+
+
+@pytest.fixture
+def allow_requests():
+    with patch("app.core.rate_limiter.rate_limiter.check", AsyncMock(return_value=(True, 0))):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_create_and_get_alert_return_redacted_reasons(alert, allow_requests):
+    with patch.object(FraudService, "create_alert", AsyncMock(return_value=alert)), \
+            patch.object(FraudService, "get_alert", AsyncMock(return_value=alert)):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            created = await client.post("/fraud/", json={"customer_id": "c1", "score": 90.0, "reasons": ["x"]})
+            fetched = await client.get("/fraud/a1")
+
+    for response in (created, fetched):
+        assert response.status_code == 200
+        body = response.json()
+        assert body["reason_codes"] == [CARD_REASON_CODE]
+        assert len(body["reasons"]) == 1
+        assert "4111111111111111" not in body["reasons"][0]
+        assert "REDACTED" in body["reasons"][0]
+
+
+@pytest.mark.asyncio
+async def test_score_and_alert_listing_publish_their_event_once(allow_requests):
+    from app.core.sse import sse
+
+    # A customer with no alerts: the page query comes back empty
+    empty_db = SimpleNamespace(execute=lambda statement: SimpleNamespace(all=lambda: []))
+    app.dependency_overrides[get_db] = lambda: empty_db
+    try:
+        with patch.object(sse, "publish") as publish:
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                assert (await client.get("/fraud/score/c1")).status_code == 200
+                assert (await client.get("/fraud/customer/c1")).status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    events = [call.args[0]["event"] for call in publish.call_args_list]
+    assert events.count("fraud_score_generated") == 1
+    assert events.count("fraud_alerts_fetched") == 1
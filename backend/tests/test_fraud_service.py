@@ -0,0 +1,48 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.core.reasons import DEVICE_CHANGE, HIGH_VELOCITY, NO_REASON, NO_REASON_CODE, canonical_reasons, reason_codes
+from app.services.fraud_service import FraudService
+from app.services.reason_code_service import ReasonCodeService
+
+
+def test_stored_codes_pass_through_unchanged():
+    stored = [HIGH_VELOCITY, DEVICE_CHANGE]
+    assert FraudService.read_reason_codes(stored) is stored
+
+
+def test_legacy_builtin_reasons_map_to_codes_without_the_database():
+    assert FraudService.read_reason_codes([{"reason": "Suspicious device change"}]) == [DEVICE_CHANGE]
+    assert FraudService.read_reason_codes('[{"reason": "High transaction velocity detected"}]') == [HIGH_VELOCITY]
+    assert FraudService.read_reason_codes([]) == [NO_REASON_CODE]
+    assert FraudService.read_reason_codes(None) == [NO_REASON_CODE]
+
+
+def test_canonical_form_is_stripped_and_deduplicated():
+    assert canonical_reasons([" velocity ", "velocity", "", NO_REASON, {"a": "geo", "b": 1}]) == ["velocity", "geo"]
+    assert canonical_reasons('["velocity", "geo"]') == ["velocity", "geo"]
+    assert canonical_reasons("plain text reason") == ["plain text reason"]
+    assert canonical_reasons([NO_REASON]) == [NO_REASON]
+
+
+def test_registry_expands_codes_and_marks_unknown_ones():
+    reason_codes.remember([(4242, "Interned elsewhere")])
+    assert reason_codes.texts([HIGH_VELOCITY, 4242, 9999]) == [
+        "High transaction velocity detected", "Interned elsewhere", "reason:9999",
+    ]
+    assert reason_codes.missing([HIGH_VELOCITY, 9999]) == {9999}
+
+
+def test_legacy_rows_are_read_without_interning():
+    row = SimpleNamespace(
+        id="a1", customer_id="c1", txn_id=None, score=50.0, action_taken=None, timestamp=datetime(2026, 3, 1),
+        reasons=[{"reason": "Suspicious device change"}, {"reason": "Never interned before"}],
+    )
+    with patch.object(ReasonCodeService, "_intern", side_effect=AssertionError("read path interned")):
+        alert = FraudService._alert_from_row(row)
+        assert FraudService.read_reason_texts(row.reasons) == ["Suspicious device change", "Never interned before"]
+
+    assert alert.reason_codes == [DEVICE_CHANGE]
+    assert alert.reasons == ["Suspicious device change", "Never interned before"]
+    assert alert.model_dump()["reasons"] == alert.reasons
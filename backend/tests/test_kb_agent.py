@@ -0,0 +1,28 @@
+import json
+import os
+
+from app.agents.kb_agent import KBAgent
+
+
+def _write(path, content, mtime):
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_corrupt_reload_keeps_previous_rules_and_retries(tmp_path):
+    path = tmp_path / "kb_docs.json"
+    _write(path, json.dumps([{"title": "Large amount", "chunks": ["large amount review"]}]), 1000)
+    agent = KBAgent(kb_path=path)
+    agent.reload_check_interval = 0
+
+    _write(path, '[{"title": "Device', 2000)  # truncated mid-write
+    agent._maybe_reload()
+    assert agent.kb_data == [{"title": "Large amount", "chunks": ["large amount review"]}]
+    assert agent._rule_ids_for("amount") == [0]
+    assert agent._kb_mtime == 1000
+
+    _write(path, json.dumps([{"title": "Device change", "chunks": ["suspicious device"]}]), 3000)
+    agent._maybe_reload()
+    assert agent.kb_data[0]["title"] == "Device change"
+    assert agent._rule_ids_for("device") == [0] and agent._rule_ids_for("amount") == []
+    assert agent._kb_mtime == 3000
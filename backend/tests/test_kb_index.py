@@ -0,0 +1,30 @@
+from app.core.kb_index import KBSearchIndex
+
+
+def _index():
+    index = KBSearchIndex()
+    index.load([
+        {"id": "1", "title": "How disputes work", "snippet": "Open a dispute within 60 days.", "anchors": ["disputes"]},
+        {"id": "2", "title": "Card blocked", "snippet": "We block cards on suspicious activity.", "anchors": ["fraud"]},
+        {"id": "3", "title": "Fees", "snippet": "Dispute fees are waived for fraud.", "anchors": None},
+    ])
+    return index
+
+
+def test_ranked_and_prefix_search():
+    index = _index()
+    hits = index.search("How disputes work")
+    assert [hit["id"] for hit in hits][:1] == ["1"]
+    assert {hit["id"] for hit in index.search("disp")} == {"1", "3"}
+    assert index.search("nothing matches") == []
+    assert len(index.search("fraud", limit=1)) == 1
+
+
+def test_incremental_add_and_reindex():
+    index = _index()
+    index.add({"id": "4", "title": "Chargebacks", "snippet": "Chargeback timelines", "anchors": []})
+    assert [hit["id"] for hit in index.search("chargeback")] == ["4"]
+
+    index.add({"id": "4", "title": "Refunds", "snippet": "Refund timelines", "anchors": []})
+    assert index.search("chargeback") == []
+    assert index.get_status()["documents"] == 4
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.agents.base_agent import AgentResponse
+from app.agents.orchestrator import FRAUD_ASSESSMENT_PLAN, Orchestrator
+from app.core.circuit_breaker import CircuitBreaker
+from app.models.agent_models import CustomerProfile, FraudAssessment
+
+CUSTOMER = CustomerProfile(
+    customer_id="c1", risk_level="low", total_transactions=0,
+    chargeback_count=0, devices=[], avg_transaction_amount=0.0,
+)
+
+
+def _orchestrator(step_timeout=1.0, plan_timeout=2.0):
+    orchestrator = Orchestrator()
+    orchestrator.circuit_breaker = CircuitBreaker("test_orchestrator")
+    orchestrator.step_timeout = step_timeout
+    orchestrator.plan_timeout = plan_timeout
+    return orchestrator
+
+
+def _context():
+    return {"query": "test", "customer": CUSTOMER, "transaction": {}, "results": {}}
+
+
+def _fake_steps(events, delays=None, failing=()):
+    async def run_step(step, context):
+        events.append(("start", step))
+        await asyncio.sleep((delays or {}).get(step, 0.01))
+        events.append(("end", step))
+        if step in failing:
+            return AgentResponse(success=False, error=f"{step} failed")
+        return AgentResponse(success=True, data=step)
+    return run_step
+
+
+@pytest.mark.asyncio
+async def test_steps_start_after_their_dependencies_and_independent_steps_overlap():
+    orchestrator = _orchestrator()
+    events = []
+    with patch.object(orchestrator, "_run_step", side_effect=_fake_steps(events)):
+        result = await orchestrator._execute_plan_steps(["insights", *FRAUD_ASSESSMENT_PLAN], _context())
+
+    assert result["success"]
+    order = events.index
+    assert order(("end", "fraud")) < order(("start", "kb"))
+    assert order(("end", "kb")) < order(("start", "decide"))
+    assert order(("end", "decide")) < order(("start", "compliance"))
+    # insights depends on nothing, so it runs alongside fraud
+    assert order(("start", "insights")) < order(("end", "fraud"))
+
+
+@pytest.mark.asyncio
+async def test_failed_dependency_skips_dependents_only():
+    orchestrator = _orchestrator()
+    events = []
+    with patch.object(orchestrator, "_run_step", side_effect=_fake_steps(events, failing={"kb"})):
+        result = await orchestrator._execute_plan_steps(["insights", *FRAUD_ASSESSMENT_PLAN], _context())
+
+    assert not result["success"] and result["failed_step"] == "kb"
+    assert result["step_errors"] == {
+        "kb": "kb failed",
+        "decide": "skipped: dependency failed",
+        "compliance": "skipped: dependency failed",
+    }
+    assert {step for kind, step in events if kind == "start"} == {"insights", "fraud", "kb"}
+    assert set(result["results"]) == {"insights", "fraud"}
+
+
+@pytest.mark.asyncio
+async def test_step_timeout_and_plan_timeout():
+    orchestrator = _orchestrator(step_timeout=0.05)
+    with patch.object(orchestrator, "_run_step", side_effect=_fake_steps([], delays={"kb": 1.0})):
+        result = await orchestrator._execute_plan_steps(FRAUD_ASSESSMENT_PLAN, _context())
+    assert result["step_errors"]["kb"] == "timed out"
+    assert result["timings_ms"]["kb"] < 500
+
+    # Each step fits its own timeout, but fraud + kb overrun the plan
+    orchestrator = _orchestrator(step_timeout=1.0, plan_timeout=0.1)
+    with patch.object(orchestrator, "_run_step", side_effect=_fake_steps([], delays={"fraud": 0.07, "kb": 0.07})):
+        result = await orchestrator._execute_plan_steps(FRAUD_ASSESSMENT_PLAN, _context())
+    assert result["failed_step"] == "kb" and result["step_errors"]["kb"] == "timed out"
+    assert result["total_ms"] < 500
+
+
+@pytest.mark.asyncio
+async def test_decision_cites_the_kb_rules_found():
+    orchestrator = _orchestrator()
+    assessment = FraudAssessment(risk_score=0.9, reason_codes=[], signals={})
+    rules = [{"title": "Large amount review"}, {"title": "Suspicious device"}]
+    with patch.object(orchestrator.fraud_agent, "assess_risk", AsyncMock(return_value=AgentResponse(success=True, data=assessment))), \
+            patch.object(orchestrator.kb_agent, "lookup_relevant_rules", AsyncMock(return_value=AgentResponse(success=True, data=rules))):
+        result = await orchestrator.execute_plan(
+            "c1", {"id": "t1", "customerId": "c1", "amount": 9000},
+            customer_context={"profile": CUSTOMER, "recent_transactions": []},
+        )
+
+    assert result["success"]
+    assert result["results"]["decide"]["decision"]["rules_applied"] == ["Large amount review", "Suspicious device"]
+    assert result["final_action"]["action"] in ("block_transaction", "flag_for_review")
@@ -0,0 +1,36 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.transaction import Transaction
+from app.services.transaction_service import TransactionService
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(timestamp, "txn-42")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, "txn-42")
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "WyJ4Il0", "eyJhIjogMX0"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_listing_selects_only_columns_the_covering_index_holds():
+    queries = []
+
+    async def execute(query):
+        queries.append(query)
+        return SimpleNamespace(all=lambda: [])
+
+    await TransactionService.get_transactions_by_customer_last_90d(SimpleNamespace(execute=execute), "c1")
+
+    index = next(i for i in Transaction.__table__.indexes if i.name == "idx_transactions_customer_ts")
+    covered = {"customer_id", "timestamp", "id", *index.dialect_options["postgresql"]["include"]}
+    assert {column.name for column in queries[0].selected_columns} <= covered
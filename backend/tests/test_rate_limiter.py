@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core.rate_limiter import RateLimiter
+
+
+class CountingRedis:
+    """Grants up to `limit` tokens in total, like one GCRA window"""
+    def __init__(self):
+        self.calls = 0
+        self.used = 0
+
+    def register_script(self, script):
+        async def _gcra(keys=None, args=None):
+            limit, cost = int(args[0]), int(args[2])
+            self.calls += 1
+            granted = min(cost, limit - self.used)
+            if granted < 1:
+                return [0, 1500, 0]
+            self.used += granted
+            return [granted, 0, limit - self.used]
+        return _gcra
+
+
+@pytest.mark.asyncio
+async def test_single_call_per_check_without_lease():
+    redis = CountingRedis()
+    limiter = RateLimiter()
+    with patch("app.core.rate_limiter.get_redis_client", AsyncMock(return_value=redis)):
+        results = [await limiter.check("k", 3, 60) for _ in range(4)]
+    assert results == [(True, 0), (True, 0), (True, 0), (False, 1500)]
+    assert redis.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_local_lease_absorbs_checks_and_never_overshoots():
+    redis = CountingRedis()
+    limiter = RateLimiter(lease_fraction=0.1)
+    with patch("app.core.rate_limiter.get_redis_client", AsyncMock(return_value=redis)):
+        allowed = [(await limiter.check("k", 100, 60))[0] for _ in range(120)]
+    assert sum(allowed) == 100
+    assert redis.calls == 30
+    assert limiter.get_status()["local_hits"] == 90
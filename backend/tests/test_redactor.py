@@ -0,0 +1,74 @@
+import re
+import pytest
+from app.core.redactor import AGENT_RULES, Redactor, pii_engine
+
+
+def _legacy(text):
+    for pattern, replacement in AGENT_RULES.values():
+        text = re.sub(pattern, replacement, text)
+    return text
+
+
+SAMPLES = [
+    "card 4111111111111111 on file",
+    "aadhaar 1234 5678 9012, pan ABCDE1234F",
+    "call +91 9876543210 or 8123456789",
+    "nothing sensitive here, amount 1500.00",
+]
+
+
+def test_single_scan_matches_sequential_rules():
+    for text in SAMPLES:
+        assert pii_engine.redact_text(text) == _legacy(text)
+
+
+def test_walks_containers_and_skips_safe_keys():
+    data = {
+        "status": "9876543210",
+        "score": 0.9,
+        "note": "phone 9876543210",
+        "action": {"action": "FREEZE_CARD", "reason": "pan ABCDE1234F"},
+        "items": ["4111111111111111", 42, None],
+    }
+    assert pii_engine.redact(data) == {
+        "status": "9876543210",
+        "score": 0.9,
+        "note": "phone ****REDACTED****",
+        "action": {"action": "FREEZE_CARD", "reason": "pan ****REDACTED****"},
+        "items": ["****REDACTED****", 42, None],
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_entry_point_offloads_large_payloads():
+    text = "4111111111111111 " * 5000
+    assert await pii_engine.aredact([text]) == [pii_engine.redact_text(text)]
+
+
+def test_mask_pii_labels_card_and_email():
+    masked = Redactor.mask_pii("4111 1111 1111 1111 / jo@example.com")
+    assert masked == "****REDACTED_CARD**** / ****REDACTED_EMAIL****"
+
+
+def test_model_plan_only_scans_text_fields():
+    from datetime import datetime
+    from app.core.redactor import GENERIC, SAFE, TEXT
+    from app.schemas.fraud_alert import FraudAlertRead
+
+    from app.core.reasons import reason_codes
+
+    reason_codes.remember([(4111, "card 4111111111111111")])
+    alert = FraudAlertRead(
+        id="a1", customer_id="cust 9876543210", txn_id=None, score=0.8,
+        reason_codes=[4111], action_taken="flagged", timestamp=datetime(2024, 1, 1),
+    )
+    plan = dict(pii_engine.plan_for(FraudAlertRead))
+    assert plan["score"] == SAFE and plan["timestamp"] == SAFE and plan["reason_codes"] == SAFE
+    assert plan["customer_id"] == TEXT and plan["txn_id"] == TEXT and plan["reasons"] == GENERIC
+    assert pii_engine.plan_for(FraudAlertRead) is pii_engine.plan_for(FraudAlertRead)
+
+    assert pii_engine.redact([alert]) == [{
+        **alert.model_dump(),
+        "customer_id": "cust ****REDACTED****",
+        "reasons": ["card ****REDACTED****"],
+    }]
@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from app.core.retry import RetryBudget, call_with_retries, deadline, remaining
+
+
+@pytest.mark.asyncio
+async def test_attempts_are_sized_to_the_remaining_deadline():
+    calls = []
+
+    async def slow():
+        calls.append(remaining())
+        await asyncio.sleep(1)
+
+    with deadline(0.2):
+        with pytest.raises(TimeoutError):
+            await call_with_retries(slow, attempts=3, attempt_timeout=1.0, base_delay=0.05)
+    assert calls and all(left <= 0.2 for left in calls)
+    assert remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_nested_deadline_never_extends_outer_one():
+    with deadline(0.1):
+        with deadline(5):
+            assert remaining() <= 0.1
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_stops_retry_storms():
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1)
+    attempts = 0
+
+    async def failing():
+        nonlocal attempts
+        attempts += 1
+        raise ConnectionError("down")
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await call_with_retries(failing, attempts=3, base_delay=0, budget=budget)
+    # One token: a single retry across all three calls
+    assert attempts == 4
+    assert budget.get_status()["exhausted"] == 3
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_when_first_attempt_stalls():
+    started = 0
+
+    async def sometimes_stalls():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(10 if started == 1 else 0)
+        return started
+
+    budget = RetryBudget()
+    assert await call_with_retries(sometimes_stalls, attempt_timeout=1.0, hedge_after=0.05, budget=budget) == 2
+    assert budget.get_status()["hedges"] == 1
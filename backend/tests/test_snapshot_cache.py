@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core.snapshot_cache import INVALIDATE_LUA, SET_IF_GENERATION_LUA, CustomerSnapshotCache
+
+
+class DictRedis:
+    """Redis stand-in shared by every cache instance (one per simulated worker)"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    def register_script(self, source):
+        # Python equivalents of the cache's Lua scripts
+        def set_if_generation(keys, args):
+            if self.data.get(keys[1], "0") != args[0]:
+                return 0
+            self.data[keys[0]] = args[1]
+            return 1
+
+        def invalidate(keys, args):
+            for key, generation_key in zip(keys[::2], keys[1::2]):
+                self.data.pop(key, None)
+                self.data[generation_key] = str(int(self.data.get(generation_key, "0")) + 1)
+            return len(keys) // 2
+
+        run = {SET_IF_GENERATION_LUA: set_if_generation, INVALIDATE_LUA: invalidate}[source]
+
+        async def script(keys=None, args=None):
+            return run(keys, args)
+        return script
+
+
+@pytest.fixture
+def redis():
+    redis = DictRedis()
+    with patch("app.core.snapshot_cache.get_redis_client", AsyncMock(return_value=redis)):
+        yield redis
+
+
+def _loader(calls):
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"profile": {"customer_id": "c1"}, "recent_transactions": []}
+    return load
+
+
+@pytest.mark.asyncio
+async def test_tiers_and_single_flight(redis):
+    cache = CustomerSnapshotCache(max_entries=10)
+    calls = []
+    await asyncio.gather(*(cache.get("c1", _loader(calls)) for _ in range(5)))
+    assert len(calls) == 1  # concurrent misses share one load
+
+    await cache.get("c1", _loader(calls))
+    cache.clear()
+    await cache.get("c1", _loader(calls))  # served from Redis
+    status = cache.get_status()
+    assert len(calls) == 1
+    assert (status["local_hits"], status["redis_hits"], status["misses"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_both_tiers_and_racing_loads(redis):
+    cache = CustomerSnapshotCache()
+    calls = []
+    await cache.get("c1", _loader(calls))
+    await cache.invalidate(["c1"])
+    assert "snapshot:c1" not in redis.data and cache.get_status()["entries"] == 0
+
+    # An ingest landing mid-load must not leave the pre-ingest snapshot cached
+    loading = asyncio.ensure_future(cache.get("c1", _loader(calls)))
+    await asyncio.sleep(0)
+    await cache.invalidate(["c1"])
+    await loading
+    assert "snapshot:c1" not in redis.data and cache.get_status()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl(redis):
+    cache = CustomerSnapshotCache(max_entries=2, local_ttl=0)
+    for customer_id in ("a", "b", "c"):
+        await cache.get(customer_id, _loader([]))
+    assert cache.get_status()["evictions"] == 1
+    redis.data.clear()
+    await cache.get("c", _loader([]))
+    assert cache.get_status()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_owner_fails_waiters_with_an_ordinary_error(redis):
+    cache = CustomerSnapshotCache()
+    calls = []
+    owner = asyncio.ensure_future(cache.get("c1", _loader(calls)))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(cache.get("c1", _loader(calls)))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    owner_result, waiter_result = await asyncio.gather(owner, waiter, return_exceptions=True)
+    assert isinstance(owner_result, asyncio.CancelledError)
+    # Caught by the waiter's `except Exception` fallback, unlike CancelledError
+    assert isinstance(waiter_result, TimeoutError)
+    assert len(calls) == 1
+
+    # Nothing is left behind: the next read loads normally
+    assert await cache.get("c1", _loader(calls)) == {"profile": {"customer_id": "c1"}, "recent_transactions": []}
+
+
+@pytest.mark.asyncio
+async def test_load_invalidated_by_another_worker_is_not_written_to_redis(redis):
+    worker_a, worker_b = CustomerSnapshotCache(), CustomerSnapshotCache()
+    calls = []
+    loading = asyncio.ensure_future(worker_a.get("c1", _loader(calls)))
+    await asyncio.sleep(0)
+    await worker_b.invalidate(["c1"])  # ingest handled by the other worker mid-load
+    await loading
+
+    assert "snapshot:c1" not in redis.data
+    assert worker_a.get_status()["stale_writes_skipped"] == 1
+
+    # The next load starts from the new generation and is cached again
+    await worker_b.get("c1", _loader(calls))
+    assert "snapshot:c1" in redis.data
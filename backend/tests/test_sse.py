@@ -0,0 +1,124 @@
+import asyncio
+import json
+import pytest
+from app.core.sse import SSEManager
+
+
+def _frames(subscriber):
+    return [json.loads(frame.split("data: ", 1)[1]) for _, _, frame in subscriber.buffer]
+
+
+@pytest.mark.asyncio
+async def test_filters_and_overflow_policies():
+    manager = SSEManager(max_queue=2)
+    await manager.subscribe(types=["fraud"], customer_id="c1")
+    await manager.subscribe(policy="drop_newest")
+    await manager.subscribe(policy="coalesce")
+    filtered, newest, coalesce = manager._subscribers
+
+    manager.publish({"customer_id": "c1", "n": 1}, type="fraud")
+    manager.publish({"customer_id": "c2", "n": 2}, type="fraud")
+    manager.publish({"n": 3}, type="kb")
+    manager.publish({"customer_id": "c2", "n": 4}, type="fraud")
+    await manager.flush()
+
+    assert [f["n"] for f in _frames(filtered)] == [1]
+    assert [f["n"] for f in _frames(newest)] == [1, 2]
+    # Full buffer: no queued kb frame, so the oldest goes; the c2 fraud frame is replaced in place
+    assert [f["n"] for f in _frames(coalesce)] == [4, 3]
+    assert manager.get_status()["dropped"] == 4
+
+@pytest.mark.asyncio
+async def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        await SSEManager().subscribe(policy="block")
+
+
+class ReplayBus:
+    running = True
+
+    async def replay(self, last_event_id, count):
+        return [("5-0", "fraud", "c1", '{"n":5}'), ("6-0", "kb", None, '{"n":6}')]
+
+
+@pytest.mark.asyncio
+async def test_last_event_id_replay_is_filtered_and_deduped():
+    manager = SSEManager(bus=ReplayBus(), heartbeat_seconds=1)
+    response = await manager.subscribe(types=["fraud"], last_event_id="4-0")
+    subscriber = manager._subscribers[0]
+    # Live copy of the replayed event arrives too; the stream sends it once
+    manager._fan_out(("5-0", "fraud", "c1", '{"n":5}'))
+    manager._fan_out(("7-0", "fraud", "c1", '{"n":7}'))
+    assert [event_id for _, event_id, _ in subscriber.buffer] == ["5-0", "5-0", "7-0"]
+
+    stream = response.body_iterator
+    frames = [await stream.__anext__() for _ in range(2)]
+    await stream.aclose()
+    assert [frame.split("\n")[0] for frame in frames] == ["id: 5-0", "id: 7-0"]
+
+
+@pytest.mark.asyncio
+async def test_publish_only_enqueues_and_dispatcher_dedupes():
+    manager = SSEManager()
+    await manager.subscribe()
+    subscriber = manager._subscribers[0]
+
+    manager.publish({"customer_id": "c1", "n": 1}, type="fraud")
+    manager.publish({"customer_id": "c1", "n": 1}, type="fraud")
+    manager.publish({"customer_id": "c1", "n": 2}, type="fraud")
+    assert not subscriber.buffer  # nothing dispatched on the caller's path
+
+    await asyncio.sleep(0)  # let the background dispatcher run
+    assert [f["n"] for f in _frames(subscriber)] == [1, 2]
+    status = manager.get_status()
+    assert status["enqueued"] == 3 and status["deduplicated"] == 1 and status["delivered"] == 2
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_ring_overflow_and_thread_publish():
+    manager = SSEManager(ring_size=2)
+    await manager.subscribe()
+    subscriber = manager._subscribers[0]
+
+    for n in range(3):
+        manager.publish({"n": n})
+    await asyncio.to_thread(manager.publish, {"n": 3})
+    await manager.flush()
+
+    assert [f["n"] for f in _frames(subscriber)] == [2, 3]
+    assert manager.get_status()["ring_dropped"] == 2
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_live_frames_are_not_dropped_after_replay():
+    manager = SSEManager(bus=ReplayBus(), max_queue=3, heartbeat_seconds=1)
+    response = await manager.subscribe(types=["fraud"], policy="coalesce", last_event_id="4-0")
+    subscriber = manager._subscribers[0]
+    manager._fan_out(("5-0", "fraud", "c1", '{"n":5}'))  # live copy of the replayed event
+    manager._fan_out(("8-0", "fraud", "c2", '{"n":8}'))
+    # Buffer full: the newer c1 frame takes the older c1 frame's slot, ahead of 8-0
+    manager._fan_out(("9-0", "fraud", "c1", '{"n":9}'))
+    assert [event_id for _, event_id, _ in subscriber.buffer] == ["9-0", "5-0", "8-0"]
+
+    stream = response.body_iterator
+    frames = [await stream.__anext__() for _ in range(3)]
+    await stream.aclose()
+    assert [frame.split("\n")[0] for frame in frames] == ["id: 9-0", "id: 5-0", "id: 8-0"]
+
+
+@pytest.mark.asyncio
+async def test_out_of_order_buffer_without_replay_sends_every_frame():
+    manager = SSEManager(max_queue=2, heartbeat_seconds=1)
+    response = await manager.subscribe(policy="coalesce")
+    subscriber = manager._subscribers[0]
+    manager._fan_out(("2", "fraud", "c1", '{"n":2}'))
+    manager._fan_out(("3", "fraud", "c2", '{"n":3}'))
+    manager._fan_out(("4", "fraud", "c1", '{"n":4}'))
+    assert [event_id for _, event_id, _ in subscriber.buffer] == ["4", "3"]
+
+    stream = response.body_iterator
+    frames = [await stream.__anext__() for _ in range(2)]
+    await stream.aclose()
+    assert [frame.split("\n")[0] for frame in frames] == ["id: 4", "id: 3"]
@@ -0,0 +1,200 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.schemas.transaction import TransactionCreate
+from app.services.transaction_service import TransactionService
+
+
+def _record(txn_id, customer_id="c1"):
+    return TransactionCreate(
+        customer_id=customer_id, txn_id=txn_id, merchant="m1",
+        amount=10.0, timestamp=datetime(2026, 3, 1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_ingest_stores_risk_results_before_the_write():
+    rows = [{"id": "r1", "customer_id": "c1", "txn_id": "t1"}, {"id": "r2", "customer_id": "c2", "txn_id": "t2"}]
+    written = []
+
+    def fake_write(db, slots, rows, marked):
+        # details must already be on the rows that go into the single INSERT
+        written.extend(dict(row) for row in rows)
+        return [], []
+
+    async def fake_risk(customer_id, txn_id):
+        return ("high", False) if txn_id == "t1" else ("medium", True)
+
+    with patch.object(TransactionService, "_plan_batch_sync", return_value=(["r1", "r2"], rows, [], {})), \
+            patch.object(TransactionService, "_write_batch_sync", side_effect=fake_write), \
+            patch.object(TransactionService, "_evaluate_risk", side_effect=fake_risk), \
+            patch("app.services.transaction_service.CustomerSnapshotService.invalidate", new=AsyncMock()):
+        await TransactionService._ingest_batch(None, [_record("t1"), _record("t2", "c2")])
+
+    assert [row["details"] for row in written] == [
+        {"risk_level": "high", "fallbackUsed": False},
+        {"risk_level": "medium", "fallbackUsed": True},
+    ]
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session whose duplicate lookups always find `existing`; writes are recorded"""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.executed = []
+
+    def query(self, model):
+        return FakeQuery([self.existing])
+
+    def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+
+    def add(self, obj):
+        pass
+
+    def commit(self):
+        pass
+
+    def refresh(self, obj):
+        pass
+
+
+def _existing_txn():
+    return SimpleNamespace(
+        id="r0", customer_id="c1", txn_id="t0", merchant="m1", amount=10.0, currency="USD",
+        category=None, mcc=None, timestamp=datetime(2026, 3, 1), details={"risk_level": "high", "fallbackUsed": False},
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_and_per_record_paths_mark_duplicates_the_same_way():
+    record = _record("t1")
+    with patch("app.services.transaction_service.sse.publish"), \
+            patch("app.services.transaction_service.CustomerSnapshotService.invalidate", new=AsyncMock()):
+        per_record_db = FakeSession(_existing_txn())
+        per_record = await TransactionService.ingest_transactions(per_record_db, [record])
+
+        bulk_db = FakeSession(_existing_txn())
+        bulk = await TransactionService.ingest_transactions_bulk(bulk_db, [record])
+
+    expected = {"risk_level": "low", "fallbackUsed": False, "duplicate_detected": True}
+    assert per_record_db.existing.details == expected
+    [(_, params)] = bulk_db.executed
+    assert params == [{"txn_pk": "r0", "details": expected}]
+    assert bulk == per_record
+
+
+@pytest.mark.asyncio
+async def test_bulk_duplicate_within_a_batch_downgrades_the_new_row():
+    rows = []
+
+    def fake_write(db, slots, planned_rows, marked):
+        rows.extend(planned_rows)
+        return [], []
+
+    async def fake_risk(customer_id, txn_id):
+        return "high", False
+
+    db = FakeSession(None)
+    db.query = lambda model: FakeQuery([])
+    with patch.object(TransactionService, "_write_batch_sync", side_effect=fake_write), \
+            patch.object(TransactionService, "_evaluate_risk", side_effect=fake_risk), \
+            patch("app.services.transaction_service.sse.publish"), \
+            patch("app.services.transaction_service.CustomerSnapshotService.invalidate", new=AsyncMock()):
+        await TransactionService._ingest_batch(db, [_record("t1"), _record("t2")])
+
+    assert [row["txn_id"] for row in rows] == ["t1"]
+    assert rows[0]["details"] == {"risk_level": "low", "fallbackUsed": False, "duplicate_detected": True}
+
+
+class BytesFile:
+    """Async upload stand-in that hands out at most `n` bytes per read"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def read(self, n):
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+
+async def _records(data: bytes, chunk_size=3):
+    return [record async for record in TransactionService._iter_csv_records(BytesFile(data), chunk_size)]
+
+
+@pytest.mark.asyncio
+async def test_csv_records_keep_quoted_newlines_and_line_numbers():
+    data = 'a,b\n1,"two\nlines"\n3,x'.encode()
+    assert await _records(data) == [(1, "a,b\n"), (2, '1,"two\nlines"\n'), (4, "3,x\n")]
+
+
+@pytest.mark.asyncio
+async def test_csv_records_strip_bom_and_survive_crlf_split_across_chunks():
+    data = '\ufeffa,b\r\n1,"x\r\ny"\r\n'.encode()
+    for chunk_size in (1, 2, 5, 1024):
+        records = await _records(data, chunk_size)
+        assert records == [(1, "a,b\r\n"), (2, '1,"x\r\ny"\r\n')]
+
+
+async def _ingest_csv(text, **kwargs):
+    batches = []
+
+    async def fake_ingest_batch(db, batch):
+        batches.append([record.txn_id for record in batch])
+        return list(batch), [], list(batch)
+
+    with patch.object(TransactionService, "_ingest_batch", side_effect=fake_ingest_batch):
+        summary = await TransactionService.ingest_csv_stream(None, BytesFile(text.encode("utf-8-sig")), **kwargs)
+    return summary, batches
+
+
+@pytest.mark.asyncio
+async def test_csv_stream_reports_bad_rows_without_aborting():
+    text = (
+        "customerId,txnId,merchant,amount,timestamp\r\n"
+        "c1,t1,\"ACME\r\nStore\",10.5,2026-03-01T10:00:00\r\n"
+        "c1,t2,ACME,not-a-number,\r\n"
+        "c1,t3,ACME,1,2026-03-01,extra\r\n"
+        "\r\n"
+        "c2,t4,Cafe,3,\r\n"
+    )
+    summary, batches = await _ingest_csv(text, chunk_size=7)
+
+    assert batches == [["t1", "t4"]]
+    assert (summary.accepted, summary.rejected, summary.batches) == (2, 2, 1)
+    assert [error.line for error in summary.errors] == [4, 5]
+    assert "columns" in summary.errors[1].error
+
+
+@pytest.mark.asyncio
+async def test_csv_stream_flushes_fixed_size_batches_and_caps_errors():
+    rows = "".join(f"c1,t{n},m,{'x' if n % 4 == 0 else n}\n" for n in range(1, 11))
+    summary, batches = await _ingest_csv("customer_id,txn_id,merchant,amount\n" + rows, batch_size=3, max_errors=1)
+
+    assert batches == [["t1", "t2", "t3"], ["t5", "t6", "t7"], ["t9", "t10"]]
+    assert (summary.accepted, summary.rejected, summary.batches) == (8, 2, 3)
+    assert [error.line for error in summary.errors] == [5]
+
+
+@pytest.mark.asyncio
+async def test_csv_stream_rejects_a_header_without_required_columns():
+    with pytest.raises(ValueError, match="merchant"):
+        await _ingest_csv("customer_id,txn_id,amount\nc1,t1,1\n")
@@ -0,0 +1,36 @@
+from app.core.velocity import VelocityFeatureEngine
+
+
+def test_sliding_windows_expire_old_buckets():
+    engine = VelocityFeatureEngine()
+    t0 = 1_700_000_000
+    engine.record("c1", 10.0, t0, device_id="d1")
+    engine.record("c1", 5.0, t0 + 45)
+    engine.record("c1", 1.0, t0 + 90)
+
+    features = engine.features("customer", "c1", now=t0 + 90)
+    assert features["1m"] == {"count": 2, "sum": 6.0}
+    assert features["1h"] == {"count": 3, "sum": 16.0}
+
+    features = engine.features("customer", "c1", now=t0 + 2 * 3600)
+    assert features["1m"]["count"] == 0
+    assert features["1h"]["count"] == 0
+    assert features["24h"] == {"count": 3, "sum": 16.0}
+
+    assert engine.features("device", "d1", now=t0)["1m"]["count"] == 1
+    assert engine.features("customer", "unknown") is None
+    assert engine.get_status()["misses"] == 1
+
+
+def test_lru_and_idle_eviction():
+    engine = VelocityFeatureEngine(max_entities=2, idle_seconds=3600)
+    t0 = 1_700_000_000
+    engine.record("c1", 1.0, t0)
+    engine.record("c2", 1.0, t0)
+    engine.record("c3", 1.0, t0)
+    assert engine.features("customer", "c1", now=t0) is None
+
+    engine.record("c4", 1.0, t0 + 7200)
+    status = engine.get_status()
+    assert status["entities"] == 1
+    assert status["evictions"] == 3